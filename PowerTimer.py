@@ -13,6 +13,7 @@ from Screens.MessageBox import MessageBox
 import Screens.Standby
 from Tools import Directories, Notifications
 from Tools.XMLTools import stringToXML
+from Tools.TimerStore import TimerStore
 import timer
 import NavigationInstance
 
@@ -402,11 +403,7 @@ def createTimer(xml):
 	else:
 		entry.repeated = int(repeated)
 
-	for l in xml.findall("log"):
-		ltime = int(l.get("time"))
-		lcode = int(l.get("code"))
-		msg = l.text.strip().encode("utf-8")
-		entry.log_entries.append((ltime, lcode, msg))
+	entry.log_entries.setElements(xml.findall("log"))
 
 	return entry
 
@@ -415,6 +412,7 @@ class PowerTimer(timer.Timer):
 		timer.Timer.__init__(self)
 
 		self.Filename = Directories.resolveFilename(Directories.SCOPE_CONFIG, "pm_timers.xml")
+		self.timerStore = TimerStore(self.Filename)
 
 		try:
 			self.loadTimer()
@@ -466,9 +464,7 @@ class PowerTimer(timer.Timer):
 		if not Directories.fileExists(self.Filename):
 			return
 		try:
-			file = open(self.Filename, 'r')
-			doc = xml.etree.cElementTree.parse(file)
-			file.close()
+			timers = self.timerStore.load()
 		except SyntaxError:
 			from Tools.Notifications import AddPopup
 
@@ -484,23 +480,21 @@ class PowerTimer(timer.Timer):
 			print("[PowerTimer] pm_timers.xml not found!")
 			return
 
-		root = doc.getroot()
-
 		# put out a message when at least one timer overlaps
 		checkit = True
-		for timer in root.findall("timer"):
+		for timer in timers:
 			newTimer = createTimer(timer)
 			if (self.record(newTimer, True, dosave=False) is not None) and (checkit == True):
 				from Tools.Notifications import AddPopup
 				AddPopup(_("Timer overlap in pm_timers.xml detected!\nPlease recheck it!"), type = MessageBox.TYPE_ERROR, timeout = 0, id = "TimerLoadFailed")
 				checkit = False # at moment it is enough when the message is displayed one time
 
-	def saveTimer(self):
-		list = ['<?xml version="1.0" ?>\n', '<timers>\n']
+	def saveTimer(self, compact=False):
+		records = []
 		for timer in self.timer_list + self.processed_timers:
 			if timer.dontSave:
 				continue
-			list.append('<timer')
+			list = ['<timer']
 			list.append(' timertype="' + str(stringToXML({
 				TIMERTYPE.WAKEUP: "wakeup",
 				TIMERTYPE.WAKEUPTOSTANDBY: "wakeuptostandby",
@@ -546,17 +540,9 @@ class PowerTimer(timer.Timer):
 				list.append('</log>\n')
 
 			list.append('</timer>\n')
+			records.append((timer, ''.join(list)))
 
-		list.append('</timers>\n')
-
-		file = open(self.Filename + ".writing", "w")
-		for x in list:
-			file.write(x)
-		file.flush()
-
-		os.fsync(file.fileno())
-		file.close()
-		os.rename(self.Filename + ".writing", self.Filename)
+		self.timerStore.save(records, journal=config.recording.timers_journal.value, compact=compact)
 
 	def getNextZapTime(self):
 		now = time()
@@ -635,4 +621,4 @@ class PowerTimer(timer.Timer):
 		self.saveTimer()
 
 	def shutdown(self):
-		self.saveTimer()
+		self.saveTimer(compact=True)
@@ -8,7 +8,7 @@ from enigma import eEPGCache, getBestPlayableServiceReference, eStreamServer, eS
 from Components.config import config
 from Components.UsageConfig import defaultMoviePath
 from Components.SystemInfo import SystemInfo
-from Components.TimerSanityCheck import TimerSanityCheck
+from Components.TimerSanityCheck import TimerSanityCheck, TimerOverlapIndex
 
 from Screens.MessageBox import MessageBox
 from Screens.PictureInPicture import PictureInPicture
@@ -17,6 +17,7 @@ import Screens.InfoBar
 import Components.ParentalControl
 from Tools import Directories, Notifications, ASCIItranslit, Trashcan
 from Tools.XMLTools import stringToXML
+from Tools.TimerStore import TimerStore
 from Tools.Alternatives import ResolveCiAlternative
 from Tools.CIHelper import cihelper
 
@@ -634,6 +635,7 @@ class RecordTimerEntry(timer.TimerEntry, object):
 					self.do_backoff()
 					# retry
 					self.begin = time() + self.backoff
+					self.windowChanged()
 					return False
 
 				# Tell the trashcan we started recording. The trashcan gets events,
@@ -679,7 +681,7 @@ class RecordTimerEntry(timer.TimerEntry, object):
 
 		dummyentry = RecordTimerEntry(self.service_ref, self.begin, new_end, self.name, self.description, self.eit, disabled=True, justplay = self.justplay, afterEvent = self.afterEvent, dirname = self.dirname, tags = self.tags)
 		dummyentry.disabled = self.disabled
-		timersanitycheck = TimerSanityCheck(NavigationInstance.instance.RecordTimer.timer_list, dummyentry)
+		timersanitycheck = TimerSanityCheck(NavigationInstance.instance.RecordTimer.timer_list, dummyentry, NavigationInstance.instance.RecordTimer.conflict_index)
 		if not timersanitycheck.check():
 			simulTimerList = timersanitycheck.getSimulTimerList()
 			if simulTimerList is not None and len(simulTimerList) > 1:
@@ -688,6 +690,7 @@ class RecordTimerEntry(timer.TimerEntry, object):
 		if new_end <= time():
 			return False
 		self.end = new_end
+		self.windowChanged()
 		return True
 
 	def setRecordingPreferredTuner(self, setdefault=False):
@@ -749,6 +752,7 @@ class RecordTimerEntry(timer.TimerEntry, object):
 					elif choice == "continue":
 						if self.justplay:
 							self.end = self.begin
+							self.windowChanged()
 						start_zap = False
 						self.log(8, "zap canceled by the user")
 				if start_zap:
@@ -808,6 +812,12 @@ class RecordTimerEntry(timer.TimerEntry, object):
 		tuner_info = fedata and "tuner_number" in fedata and chr(ord('A') + fedata.get("tuner_number")) or "(fallback) stream"
 		self.log(level, "%s recording on tuner: %s" % (state, tuner_info))
 
+	def windowChanged(self):
+		# begin or end were changed while the timer is running, without
+		# RecordTimer.timeChanged()
+		if NavigationInstance.instance and getattr(NavigationInstance.instance, "RecordTimer", None):
+			NavigationInstance.instance.RecordTimer.reindex(self)
+
 	def timeChanged(self):
 		old_prepare = self.start_prepare
 		self.start_prepare = self.begin - self.prepare_time
@@ -907,20 +917,66 @@ def createTimer(xml):
 	if flags:
 		entry.flags = set(flags.encode("utf-8").split(' '))
 
-	for l in xml.findall("log"):
-		time = int(l.get("time"))
-		code = int(l.get("code"))
-		msg = l.text.strip().encode("utf-8")
-		entry.log_entries.append((time, code, msg))
+	entry.log_entries.setElements(xml.findall("log"))
 
 	return entry
 
+# Per service index of record timers, used by isInTimer() so the EPG lists
+# only look at the timers of the service being drawn. Repeating timers are
+# matched on time of day by isInTimer() itself.
+class ServiceTimerIndex:
+	def __init__(self, timers=()):
+		self.services = {}  # service -> TimerOverlapIndex
+		self.keys = {}  # id(entry) -> service
+		for entry in timers:
+			self.add(entry)
+
+	def add(self, entry):
+		if id(entry) in self.keys:
+			self.remove(entry)
+		if not entry.service_ref:
+			return
+		service = ':'.join(entry.service_ref.ref.toString().split(':')[:11])
+		index = self.services.get(service)
+		if index is None:
+			index = self.services[service] = TimerOverlapIndex()
+		index.add(entry)
+		self.keys[id(entry)] = service
+
+	def remove(self, entry):
+		service = self.keys.pop(id(entry), None)
+		if service is None:
+			return
+		index = self.services[service]
+		index.remove(entry)
+		if not index:
+			del self.services[service]
+
+	def update(self, entry):
+		self.add(entry)
+
+	def lookup(self, service, begin, end, margin=120):
+		# returns the repeating timers and the non repeating timers which
+		# (including a margin for the isInTimer() corrections) overlap begin..end
+		index = self.services.get(service)
+		if index is None:
+			return []
+		return index.getOverlapping(begin, end, margin) + index.repeated
+
 class RecordTimer(timer.Timer):
 	def __init__(self):
 		timer.Timer.__init__(self)
 
 		self.Filename = Directories.resolveFilename(Directories.SCOPE_CONFIG, "timers.xml")
+		self.timerStore = TimerStore(self.Filename)
 		self.fallback_timer_list = []
+		self.fallback_timer_positions = {}
+		self.timer_index = ServiceTimerIndex()
+		self.conflict_index = TimerOverlapIndex()
+		self.fallback_timer_index = ServiceTimerIndex()
+		# bumped on every change of a timer, the EPG lists use it to tell
+		# whether their cached rows (with the timer icons) are still valid
+		self.generation = 0
 
 		try:
 			self.loadTimer()
@@ -986,7 +1042,7 @@ class RecordTimer(timer.Timer):
 # justLoad is passed on to record()
 	def loadTimer(self, justLoad=False):
 		try:
-			doc = xml.etree.cElementTree.parse(self.Filename)
+			timers = self.timerStore.load()
 		except SyntaxError:
 			from Tools.Notifications import AddPopup
 			from Screens.MessageBox import MessageBox
@@ -1003,11 +1059,9 @@ class RecordTimer(timer.Timer):
 			print("[RecordTimer] timers.xml not found!")
 			return
 
-		root = doc.getroot()
-
 		checkit = False
 		timer_text = ""
-		for timer in root.findall("timer"):
+		for timer in timers:
 			newTimer = createTimer(timer)
 			conflict_list = self.record(newTimer, ignoreTSC=True, dosave=False, loadtimer=True, justLoad=justLoad)
 			if conflict_list:
@@ -1020,7 +1074,7 @@ class RecordTimer(timer.Timer):
 			AddPopup(_("Timer overlap in timers.xml detected!\nPlease recheck it!") + timer_text, type = MessageBox.TYPE_ERROR, timeout = 0, id = "TimerLoadFailed")
 
 
-	def saveTimer(self):
+	def saveTimer(self, compact=False):
 		#root_element = xml.etree.cElementTree.Element('timers')
 		#root_element.text = "\n"
 
@@ -1060,15 +1114,13 @@ class RecordTimer(timer.Timer):
 		#doc = xml.etree.cElementTree.ElementTree(root_element)
 		#doc.write(self.Filename)
 
-		list = []
-
-		list.append('<?xml version="1.0" ?>\n')
-		list.append('<timers>\n')
+		records = []
 
 		for timer in self.timer_list + self.processed_timers:
 			if timer.dontSave:
 				continue
 
+			list = []
 			list.append('<timer')
 			list.append(' begin="' + str(int(timer.begin)) + '"')
 			list.append(' end="' + str(int(timer.end)) + '"')
@@ -1113,8 +1165,7 @@ class RecordTimer(timer.Timer):
 					list.append('</log>\n')
 
 			list.append('</timer>\n')
-
-		list.append('</timers>\n')
+			records.append((timer, ''.join(list)))
 
 # We have to run this section with a lock.
 #  Imagine setting a timer manually while the (background) AutoTimer
@@ -1134,14 +1185,7 @@ class RecordTimer(timer.Timer):
 # list-creating loop under the lock.
 #
 		with write_lock:
-			file = open(self.Filename + ".writing", "w")
-			for x in list:
-				file.write(x)
-			file.flush()
-
-			os.fsync(file.fileno())
-			file.close()
-			os.rename(self.Filename + ".writing", self.Filename)
+			self.timerStore.save(records, journal=config.recording.timers_journal.value, compact=compact)
 
 	def getNextZapTime(self, isWakeup=False):
 		now = time()
@@ -1189,7 +1233,7 @@ class RecordTimer(timer.Timer):
 		if justLoad:
 			entry.conflict_detection = False
 		check_timer_list = self.timer_list[:]
-		timersanitycheck = TimerSanityCheck(check_timer_list, entry)
+		timersanitycheck = TimerSanityCheck(check_timer_list, entry, self.conflict_index)
 		answer = None
 		if not timersanitycheck.check():
 			if not ignoreTSC:
@@ -1217,10 +1261,35 @@ class RecordTimer(timer.Timer):
 		print("[RecordTimer] Record " + str(entry))
 		entry.Timer = self
 		self.addTimerEntry(entry)
+		self.timer_index.add(entry)
+		self.conflict_index.add(entry)
+		self.generation += 1
 		if dosave:
 			self.saveTimer()
 		return answer
 
+	def rebuildTimerIndex(self):
+		timers = self.timer_list + self.processed_timers
+		self.timer_index = ServiceTimerIndex(timers)
+		self.conflict_index = TimerOverlapIndex(timers)
+		self.generation += 1
+
+	def stateChanged(self, entry):
+		self.generation += 1
+		timer.Timer.stateChanged(self, entry)
+
+	def timeChanged(self, entry):
+		timer.Timer.timeChanged(self, entry)
+		self.reindex(entry)
+
+	def reindex(self, entry):
+		# begin or end of entry changed
+		self.generation += 1
+		if id(entry) in self.timer_index.keys:
+			self.timer_index.update(entry)
+		if entry in self.conflict_index:
+			self.conflict_index.add(entry)
+
 	def isInRepeatTimer(self, timer, event):
 		time_match = 0
 		is_editable = False
@@ -1322,6 +1391,20 @@ class RecordTimer(timer.Timer):
 
 	def setFallbackTimerList(self, list):
 		self.fallback_timer_list = [timer for timer in list if timer.state != 3]
+		self.fallback_timer_index = ServiceTimerIndex(self.fallback_timer_list)
+		self.fallback_timer_positions = {}
+		for index, timer in enumerate(self.fallback_timer_list):
+			self.fallback_timer_positions.setdefault(id(timer), index)
+		self.generation += 1
+
+	def getTimersForService(self, service, begin, end):
+		# all timers of getAllTimersList() on service which may overlap begin..end,
+		# in the order of getAllTimersList() (isInTimer() depends on it)
+		timers = [x for x in self.timer_index.lookup(service, begin, end) if x in self.timer_list]
+		timers.sort(key=self.timer_list.position)
+		fallback = self.fallback_timer_index.lookup(service, begin, end)
+		fallback.sort(key=lambda x: self.fallback_timer_positions[id(x)])
+		return timers + fallback
 
 	def getAllTimersList(self):
 		return self.timer_list + self.fallback_timer_list
@@ -1334,93 +1417,70 @@ class RecordTimer(timer.Timer):
 		check_offset_time = not config.recording.margin_before.value and not config.recording.margin_after.value
 		end = begin + duration
 		refstr = ':'.join(service.split(':')[:11])
-		for x in self.getAllTimersList():
-			check = ':'.join(x.service_ref.ref.toString().split(':')[:11]) == refstr
-			if check:
-				timer_end = x.end
-				timer_begin = x.begin
-				type_offset = 0
-				if not x.repeated and check_offset_time:
-					if 0 < end - timer_end <= 59:
-						timer_end = end
-					elif 0 < timer_begin - begin <= 59:
-						timer_begin = begin
-				if x.justplay:
-					type_offset = 5
-					if (timer_end - x.begin) <= 1:
-						timer_end += 60
-					if x.pipzap:
-						type_offset = 30
-				if x.always_zap:
-					type_offset = 10
-
-				timer_repeat = x.repeated
-				# if set 'don't stop current event but disable coming events' for repeat timer
-				running_only_curevent = x.disabled and x.isRunning() and timer_repeat
-				if running_only_curevent:
-					timer_repeat = 0
-					type_offset += 15
-
-				if timer_repeat != 0:
-					type_offset += 15
-					if bt is None:
-						bt = localtime(begin)
-						bday = bt.tm_wday
-						begin2 = 1440 + bt.tm_hour * 60 + bt.tm_min
-						end2 = begin2 + duration / 60
-					xbt = localtime(x.begin)
-					xet = localtime(timer_end)
-					offset_day = False
-					checking_time = x.begin < begin or begin <= x.begin <= end
-					if xbt.tm_yday != xet.tm_yday:
-						oday = bday - 1
-						if oday == -1: oday = 6
-						offset_day = x.repeated & (1 << oday)
-					xbegin = 1440 + xbt.tm_hour * 60 + xbt.tm_min
-					xend = xbegin + ((timer_end - x.begin) / 60)
-					if xend < xbegin:
-						xend += 1440
-					if x.repeated & (1 << bday) and checking_time:
-						if begin2 < xbegin <= end2:
-							if xend < end2:
-								# recording within event
-								time_match = (xend - xbegin) * 60
-								type = type_offset + 3
-							else:
-								# recording last part of event
-								time_match = (end2 - xbegin) * 60
-								type = type_offset + 1
-						elif xbegin <= begin2 <= xend:
-							if xend < end2:
-								# recording first part of event
-								time_match = (xend - begin2) * 60
-								type = type_offset + 4
-							else:
-								# recording whole event
-								time_match = (end2 - begin2) * 60
-								type = type_offset + 2
-						elif offset_day:
-							xbegin -= 1440
-							xend -= 1440
-							if begin2 < xbegin <= end2:
-								if xend < end2:
-									# recording within event
-									time_match = (xend - xbegin) * 60
-									type = type_offset + 3
-								else:
-									# recording last part of event
-									time_match = (end2 - xbegin) * 60
-									type = type_offset + 1
-							elif xbegin <= begin2 <= xend:
-								if xend < end2:
-									# recording first part of event
-									time_match = (xend - begin2) * 60
-									type = type_offset + 4
-								else:
-									# recording whole event
-									time_match = (end2 - begin2) * 60
-									type = type_offset + 2
-					elif offset_day and checking_time:
+		for x in self.getTimersForService(refstr, begin, end):
+			timer_end = x.end
+			timer_begin = x.begin
+			type_offset = 0
+			if not x.repeated and check_offset_time:
+				if 0 < end - timer_end <= 59:
+					timer_end = end
+				elif 0 < timer_begin - begin <= 59:
+					timer_begin = begin
+			if x.justplay:
+				type_offset = 5
+				if (timer_end - x.begin) <= 1:
+					timer_end += 60
+				if x.pipzap:
+					type_offset = 30
+			if x.always_zap:
+				type_offset = 10
+
+			timer_repeat = x.repeated
+			# if set 'don't stop current event but disable coming events' for repeat timer
+			running_only_curevent = x.disabled and x.isRunning() and timer_repeat
+			if running_only_curevent:
+				timer_repeat = 0
+				type_offset += 15
+
+			if timer_repeat != 0:
+				type_offset += 15
+				if bt is None:
+					bt = localtime(begin)
+					bday = bt.tm_wday
+					begin2 = 1440 + bt.tm_hour * 60 + bt.tm_min
+					end2 = begin2 + duration / 60
+				xbt = localtime(x.begin)
+				xet = localtime(timer_end)
+				offset_day = False
+				checking_time = x.begin < begin or begin <= x.begin <= end
+				if xbt.tm_yday != xet.tm_yday:
+					oday = bday - 1
+					if oday == -1: oday = 6
+					offset_day = x.repeated & (1 << oday)
+				xbegin = 1440 + xbt.tm_hour * 60 + xbt.tm_min
+				xend = xbegin + ((timer_end - x.begin) / 60)
+				if xend < xbegin:
+					xend += 1440
+				if x.repeated & (1 << bday) and checking_time:
+					if begin2 < xbegin <= end2:
+						if xend < end2:
+							# recording within event
+							time_match = (xend - xbegin) * 60
+							type = type_offset + 3
+						else:
+							# recording last part of event
+							time_match = (end2 - xbegin) * 60
+							type = type_offset + 1
+					elif xbegin <= begin2 <= xend:
+						if xend < end2:
+							# recording first part of event
+							time_match = (xend - begin2) * 60
+							type = type_offset + 4
+						else:
+							# recording whole event
+							time_match = (end2 - begin2) * 60
+							type = type_offset + 2
+					elif offset_day:
 						xbegin -= 1440
 						xend -= 1440
 						if begin2 < xbegin <= end2:
@@ -1441,35 +1501,56 @@ class RecordTimer(timer.Timer):
 								# recording whole event
 								time_match = (end2 - begin2) * 60
 								type = type_offset + 2
-				else:
-					if begin < timer_begin <= end:
-						if timer_end < end:
+				elif offset_day and checking_time:
+					xbegin -= 1440
+					xend -= 1440
+					if begin2 < xbegin <= end2:
+						if xend < end2:
 							# recording within event
-							time_match = timer_end - timer_begin
+							time_match = (xend - xbegin) * 60
 							type = type_offset + 3
 						else:
 							# recording last part of event
-							time_match = end - timer_begin
+							time_match = (end2 - xbegin) * 60
 							type = type_offset + 1
-					elif timer_begin <= begin <= timer_end:
-						if timer_end < end:
+					elif xbegin <= begin2 <= xend:
+						if xend < end2:
 							# recording first part of event
-							time_match = timer_end - begin
+							time_match = (xend - begin2) * 60
 							type = type_offset + 4
 						else:
 							# recording whole event
-							time_match = end - begin
+							time_match = (end2 - begin2) * 60
 							type = type_offset + 2
-				if time_match:
-					if type in (2, 7, 12, 17, 22, 27, 32):
-						# When full recording do not look further
-						returnValue = (time_match, [type])
-						break
-					elif returnValue:
-						if type not in returnValue[1]:
-							returnValue[1].append(type)
+			else:
+				if begin < timer_begin <= end:
+					if timer_end < end:
+						# recording within event
+						time_match = timer_end - timer_begin
+						type = type_offset + 3
 					else:
-						returnValue = (time_match, [type])
+						# recording last part of event
+						time_match = end - timer_begin
+						type = type_offset + 1
+				elif timer_begin <= begin <= timer_end:
+					if timer_end < end:
+						# recording first part of event
+						time_match = timer_end - begin
+						type = type_offset + 4
+					else:
+						# recording whole event
+						time_match = end - begin
+						type = type_offset + 2
+			if time_match:
+				if type in (2, 7, 12, 17, 22, 27, 32):
+					# When full recording do not look further
+					returnValue = (time_match, [type])
+					break
+				elif returnValue:
+					if type not in returnValue[1]:
+						returnValue[1].append(type)
+				else:
+					returnValue = (time_match, [type])
 
 		return returnValue
 
@@ -1498,15 +1579,20 @@ class RecordTimer(timer.Timer):
 		if entry in self.processed_timers:
 			# now the timer should be in the processed_timers list. remove it from there.
 			self.processed_timers.remove(entry)
+		self.timer_index.remove(entry)
+		self.conflict_index.remove(entry)
+		self.generation += 1
 		self.saveTimer()
 
 	def shutdown(self):
-		self.saveTimer()
+		self.saveTimer(compact=True)
 
 	def cleanup(self):
 		timer.Timer.cleanup(self)
+		self.rebuildTimerIndex()
 		self.saveTimer()
 
 	def cleanupDaily(self, days):
 		timer.Timer.cleanupDaily(self, days)
+		self.rebuildTimerIndex()
 		self.saveTimer()
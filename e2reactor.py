@@ -11,6 +11,7 @@ Maintainer: U{Felix Domke<mailto:tmbinc@elitedvb.net>}
 
 # System imports
 import select, errno, sys
+from time import time
 
 # Twisted imports
 from twisted.python import log, failure
@@ -30,37 +31,91 @@ class E2SharedPoll:
 	def __init__(self):
 		self.dict = { }
 		self.eApp = getApplication()
+		self.polling = False
+		self.interrupted = False
+		# counters, see getStats()
+		self.registrations = 0
+		self.interrupts = 0
+		self.coalesced = 0
+		self.statsTime = time()
+		self.statsLast = (0, 0, 0)
 
 	def register(self, fd, eventmask = select.POLLIN | select.POLLERR | select.POLLOUT):
 		self.dict[fd] = eventmask
+		self.registrations += 1
 
 	def unregister(self, fd):
 		del self.dict[fd]
+		self.registrations += 1
+
+	def interrupt(self, batched = True):
+		# The fds are only handed to the main loop when poll() is entered, so
+		# changes made while the reactor dispatches poll results need no
+		# interrupt at all, and while polling one interrupt per loop iteration
+		# is enough for the main loop to pick up all changes.
+		if batched and (not self.polling or self.interrupted):
+			self.coalesced += 1
+			return
+		self.interrupted = True
+		self.interrupts += 1
+		self.eApp.interruptPoll()
 
 	def poll(self, timeout = None):
+		self.polling = True
+		self.interrupted = False
 		try:
 			r = self.eApp.poll(timeout, self.dict)
 		except KeyboardInterrupt:
 			return None
+		finally:
+			self.polling = False
 		return r
 
+	def getStats(self):
+		# Returns the counters, with per second rates since the last call.
+		now = time()
+		elapsed = max(now - self.statsTime, 0.001)
+		current = (self.registrations, self.interrupts, self.coalesced)
+		rates = [(x - y) / elapsed for (x, y) in zip(current, self.statsLast)]
+		self.statsTime = now
+		self.statsLast = current
+		return {
+			"fds": len(self.dict),
+			"registrations": self.registrations,
+			"interrupts": self.interrupts,
+			"coalesced": self.coalesced,
+			"registrations_per_second": rates[0],
+			"interrupts_per_second": rates[1],
+			"coalesced_per_second": rates[2],
+		}
+
 poller = E2SharedPoll()
 
 class PollReactor(posixbase.PosixReactorBase):
 	"""A reactor that uses poll(2)."""
 
+	# Coalesce the main loop interrupts caused by interest changes (and
+	# callLater) to at most one per loop iteration, and skip fds whose mask
+	# did not change. When False every change interrupts the main loop.
+	batchRegistrations = True
+
 	def _updateRegistration(self, fd):
 		"""Register/unregister an fd with the poller."""
-		try:
-			poller.unregister(fd)
-		except KeyError:
-			pass
-
 		mask = 0
 		if fd in reads:
 			mask = mask | select.POLLIN
 		if fd in writes:
 			mask = mask | select.POLLOUT
+		if self.batchRegistrations and poller.dict.get(fd, 0) == mask:
+			if mask == 0 and fd in selectables:
+				del selectables[fd]
+			return
+
+		try:
+			poller.unregister(fd)
+		except KeyError:
+			pass
+
 		if mask != 0:
 			poller.register(fd, mask)
 		else:
@@ -68,7 +123,7 @@ class PollReactor(posixbase.PosixReactorBase):
 				del selectables[fd]
 
 
-		poller.eApp.interruptPoll()
+		poller.interrupt(self.batchRegistrations)
 
 	def _dictRemove(self, selectable, mdict):
 		try:
@@ -207,7 +262,7 @@ class PollReactor(posixbase.PosixReactorBase):
 				pass
 
 	def callLater(self, *args, **kwargs):
-		poller.eApp.interruptPoll()
+		poller.interrupt(self.batchRegistrations)
 		return posixbase.PosixReactorBase.callLater(self, *args, **kwargs)
 
 def install():
@@ -0,0 +1,112 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+from enigma import eServiceCenter, eServiceReference
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
+
+# Channel numbers and bouquet membership of the services below a bouquet root.
+#
+# Finding a channel number used to mean listing every bouquet and calling
+# getChannelNum() on every entry until one matched, and finding the bouquet of
+# a service meant entering every bouquet in the service list. channelNumbers
+# lists the bouquets of a root once and keeps, per bouquet, the number ->
+# service map and the number offset, and for the whole root the first visible
+# bouquet and service of every number and the visible bouquets of every
+# service.
+#
+# The index is dropped when the bouquets are edited (ChannelSelectionEdit), the
+# service list is refreshed after a reload or a numbering mode change, and when
+# the modification time of the settings directory changes, which catches
+# bouquet files and lamedb written by scans, imports and plugins.
+
+class BouquetNumbers:
+	def __init__(self, bouquet, visible, services, offset):
+		self.bouquet = bouquet
+		self.visible = visible
+		self.services = services  # channel number -> service, the first one wins
+		self.offset = offset
+
+class ChannelNumberIndex:
+	def __init__(self, directory=None):
+		self.directory = directory or resolveFilename(SCOPE_CONFIG)
+		self.roots = {}  # root -> (bouquets, {bouquet: BouquetNumbers}, {number: (bouquet, service)}, {service: [bouquet, ...]})
+		self.mtime = None
+		self.builds = 0
+
+	def invalidate(self):
+		self.roots.clear()
+
+	def check(self):
+		try:
+			mtime = os.stat(self.directory).st_mtime
+		except OSError:
+			mtime = None
+		if mtime != self.mtime:
+			self.mtime = mtime
+			self.roots.clear()
+
+	def build(self, root):
+		serviceHandler = eServiceCenter.getInstance()
+		bouquets = []
+		byBouquet = {}
+		numbers = {}
+		containing = {}
+		bouquetlist = serviceHandler.list(root)
+		if bouquetlist:
+			bouquet = bouquetlist.getNext()
+			while bouquet.valid():
+				if bouquet.flags & eServiceReference.isDirectory:
+					services = {}
+					offset = None
+					servicelist = serviceHandler.list(bouquet)
+					if servicelist:
+						service = servicelist.getNext()
+						while service.valid():
+							if not bouquet.flags & eServiceReference.isInvisible:
+								containing.setdefault(service.toCompareString(), [])
+								if bouquet not in containing[service.toCompareString()]:
+									containing[service.toCompareString()].append(bouquet)
+							number = service.getChannelNum()
+							if number > 0:
+								if number not in services:
+									services[number] = service
+								if offset is None:
+									offset = number - 1
+							service = servicelist.getNext()
+					entry = BouquetNumbers(bouquet, not bouquet.flags & eServiceReference.isInvisible, services, offset or 0)
+					bouquets.append(entry)
+					byBouquet[bouquet.toCompareString()] = entry
+					if entry.visible:
+						for (number, service) in services.items():
+							if number not in numbers:
+								numbers[number] = (bouquet, service)
+				bouquet = bouquetlist.getNext()
+		self.builds += 1
+		return (bouquets, byBouquet, numbers, containing)
+
+	def getRoot(self, root):
+		self.check()
+		key = root.toCompareString()
+		entry = self.roots.get(key)
+		if entry is None:
+			entry = self.roots[key] = self.build(root)
+		return entry
+
+	def getBouquets(self, root):
+		# Returns the BouquetNumbers of all bouquets below root, in order.
+		return self.getRoot(root)[0]
+
+	def getBouquet(self, root, bouquet):
+		# Returns the BouquetNumbers of bouquet or None if it is not below root.
+		return self.getRoot(root)[1].get(bouquet.toCompareString())
+
+	def getService(self, root, number):
+		# Returns (bouquet, service) of number in the first visible bouquet
+		# below root that has it, or None.
+		return self.getRoot(root)[2].get(number)
+
+	def getServiceBouquets(self, root, service):
+		# Returns the visible bouquets below root that contain service, in order.
+		return self.getRoot(root)[3].get(service.toCompareString(), [])
+
+channelNumbers = ChannelNumberIndex()
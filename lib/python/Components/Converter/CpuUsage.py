@@ -3,6 +3,7 @@
 from Components.Converter.Converter import Converter
 from Components.Converter.Poll import Poll
 from Components.Element import cached
+from Components.SystemState import systemState
 
 
 class CpuUsage(Converter, object):
@@ -85,28 +86,17 @@ class CpuUsageMonitor(Poll, object):
 		return len(self.__curr_info) - 1
 
 	def getCpusInfo(self):
-		res = []
+		# [cpu, total, busy] per cpu, shared with the other /proc/stat readers
 		try:
-			fd = open("/proc/stat", "r")
-			for l in fd:
-				if l.find("cpu") == 0:
-					total = busy = 0
-					# tmp = [cpu, usr, nic, sys, idle, iowait, irq, softirq, steal]
-					tmp = l.split()
-					for i in range(1, len(tmp)):
-						tmp[i] = int(tmp[i])
-						total += tmp[i]
-					# busy = total - idle - iowait
-					busy = total - tmp[4] - tmp[5]
-					# append [cpu, total, busy]
-					res.append([tmp[0], total, busy])
-			fd.close()
+			return systemState.getCpuTimes()
 		except:
-			pass
-		return res
+			return []
 
 	def poll(self):
-		prev_info, self.__curr_info = self.__curr_info, self.getCpusInfo()
+		info = self.getCpusInfo()
+		if info is self.__curr_info:
+			return # Same snapshot as the last poll
+		prev_info, self.__curr_info = self.__curr_info, info
 		if len(self.__callbacks):
 			info = [ ]
 			for i in range(len(self.__curr_info)):
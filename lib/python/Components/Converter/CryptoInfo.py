@@ -3,22 +3,23 @@
 from Components.Converter.Converter import Converter
 from Components.Element import cached
 from Components.config import config
-from Tools.GetEcmInfo import GetEcmInfo
-from Components.Converter.Poll import Poll
+from Tools.GetEcmInfo import GetEcmInfo, EcmPoll
 
 
-class CryptoInfo(Poll, Converter, object):
+class CryptoInfo(EcmPoll, Converter, object):
 	def __init__(self, type):
 		Converter.__init__(self, type)
-		Poll.__init__(self)
+		EcmPoll.__init__(self)
 
 		self.type = type
 		self.active = False
 		self.visible = config.usage.show_cryptoinfo.value
 		self.textvalue = ""
-		self.poll_interval = 1000
-		self.poll_enabled = True
 		self.ecmdata = GetEcmInfo()
+		# Changes of the ECM info are pushed by ecmWatcher, only the time since
+		# the last ECM has to be polled.
+		self.poll_interval = 1000
+		self.poll_enabled = type == "ecminterval0"
 
 	@cached
 	def getText(self):
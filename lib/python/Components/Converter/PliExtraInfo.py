@@ -7,9 +7,8 @@ from Components.Converter.Converter import Converter
 from Components.Element import cached
 from Components.config import config
 from Tools.Transponder import ConvertToHumanReadable
-from Tools.GetEcmInfo import GetEcmInfo
+from Tools.GetEcmInfo import GetEcmInfo, EcmPoll
 from Tools.Hex2strColor import Hex2strColor
-from Components.Converter.Poll import Poll
 from skin import parameters
 import os
 
@@ -64,10 +63,10 @@ def addspace(text):
 		text += " "
 	return text
 
-class PliExtraInfo(Poll, Converter):
+class PliExtraInfo(EcmPoll, Converter):
 	def __init__(self, type):
 		Converter.__init__(self, type)
-		Poll.__init__(self)
+		EcmPoll.__init__(self)
 		self.type = type
 		self.poll_interval = 1000
 		self.poll_enabled = True
@@ -1,20 +1,122 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+from __future__ import print_function
+import time
+import traceback
+import weakref
 from enigma import eTimer
 
+# All pollers share the timer of pollScheduler. Intervals are rounded up to a
+# multiple of PollScheduler.Tick and due times are aligned to multiples of the
+# interval, so pollers with the same (or a multiple of the same) interval run
+# in the same pass and the main loop wakes up once for all of them.
+#
+# Converters whose renderers are all hidden are skipped. The time spent in
+# poll() is counted per class, see getPollStats(); polls taking longer than
+# SLOW_POLL seconds are logged. A poll that raises an exception is logged and
+# does not keep the other pollers from running.
+
+SLOW_POLL = 0.1
+
+class PollScheduler(object):
+	Tick = 100  # ms
+
+	def __init__(self):
+		self.timer = None
+		self.pollers = {}  # id(poller) -> [weak reference, interval, due time]
+		self.stats = {}  # class name -> [polls, total time, longest time]
+		self.passes = 0
+		self.skipped = 0
+
+	def now(self):
+		return int(time.time() * 1000)
+
+	def align(self, now, interval):
+		# The first multiple of interval at least half an interval away.
+		return ((now + interval // 2) // interval + 1) * interval
+
+	def add(self, poller, interval):
+		interval = max(self.Tick, (int(interval) + self.Tick - 1) // self.Tick * self.Tick)
+		now = self.now()
+		self.pollers[id(poller)] = [weakref.ref(poller), interval, self.align(now, interval)]
+		self.schedule(now)
+
+	def remove(self, poller):
+		# The timer is left running, a pass with nothing due only reschedules.
+		self.pollers.pop(id(poller), None)
+
+	def schedule(self, now):
+		if self.timer is None:
+			self.timer = eTimer()
+			self.timer.callback.append(self.run)
+		if self.pollers:
+			due = min([x[2] for x in self.pollers.values()])
+			self.timer.start(max(0, due - now), True)
+		else:
+			self.timer.stop()
+
+	def run(self):
+		now = self.now()
+		self.passes += 1
+		try:
+			for (key, entry) in list(self.pollers.items()):
+				if self.pollers.get(key) is not entry:
+					continue  # Removed or changed by an earlier poll in this pass.
+				(ref, interval, due) = entry
+				if due > now + self.Tick // 2:
+					if due - now > 2 * interval:  # The clock was set back.
+						entry[2] = self.align(now, interval)
+					continue
+				poller = ref()
+				if poller is None:
+					del self.pollers[key]
+					continue
+				entry[2] = (now // interval + 1) * interval
+				try:
+					if poller.pollSuspended():
+						self.skipped += 1
+						continue
+					self.call(poller)
+				except Exception:
+					print("[Poll] Error: Poll of '%s' failed!" % poller.__class__.__name__)
+					traceback.print_exc()
+		finally:
+			self.schedule(self.now())
+
+	def call(self, poller):
+		start = time.time()
+		try:
+			poller.poll()
+		finally:
+			elapsed = time.time() - start
+			name = poller.__class__.__name__
+			stats = self.stats.get(name)
+			if stats is None:
+				stats = self.stats[name] = [0, 0.0, 0.0]
+			stats[0] += 1
+			stats[1] += elapsed
+			if elapsed > stats[2]:
+				stats[2] = elapsed
+			if elapsed > SLOW_POLL:
+				print("[Poll] Warning: Poll of '%s' took %.3fs!" % (name, elapsed))
+
+pollScheduler = PollScheduler()
+
+def getPollStats():
+	"""Returns (name, polls, total time, longest time) for all polled classes, the most expensive first."""
+	return sorted([(name, stats[0], stats[1], stats[2]) for (name, stats) in pollScheduler.stats.items()], key=lambda x: -x[2])
+
 class Poll(object):
 	def __init__(self):
-		self.__poll_timer = eTimer()
-		self.__poll_timer.callback.append(self.poll)
 		self.__interval = 1000
 		self.__enabled = False
 
 	def __setInterval(self, interval):
 		self.__interval = interval
 		if self.__enabled:
-			self.__poll_timer.start(self.__interval)
+			pollScheduler.add(self, self.__interval)
 		else:
-			self.__poll_timer.stop()
+			pollScheduler.remove(self)
 
 	def __setEnable(self, enabled):
 		self.__enabled = enabled
@@ -26,13 +128,17 @@ class Poll(object):
 	def poll(self):
 		self.changed((self.CHANGED_POLL,))
 
+	def pollSuspended(self):
+		# Converters whose renderers are all hidden are not polled.
+		return bool(getattr(self, "downstream_elements", None)) and self.suspended
+
 	def doSuspend(self, suspended):
 		if self.__enabled:
 			if suspended:
-				self.__poll_timer.stop()
+				pollScheduler.remove(self)
 			else:
 				self.poll()
 				self.poll_enabled = True
 
 	def destroy(self):
-		self.__poll_timer.callback.remove(self.poll)
+		pollScheduler.remove(self)
@@ -3,6 +3,7 @@
 from Components.Converter.Converter import Converter
 from Components.Element import cached
 from Components.Converter.Poll import Poll
+from Components.SystemState import systemState
 from os import popen, statvfs
 
 SIZE_UNITS = ['B',
@@ -136,7 +137,7 @@ class ProgressDiskSpaceInfo(Poll, Converter):
 		textvalue = 'No info'
 		info = '0'
 		try:
-			out_line = popen('cat /proc/loadavg').readline()
+			out_line = systemState.getLoadAvg()
 			info = 'loadavg:' + out_line[:15]
 			textvalue = info
 		except:
@@ -150,22 +151,12 @@ class ProgressDiskSpaceInfo(Poll, Converter):
 		0,
 		0]
 		try:
-			check = 0
-			fd = open('/proc/meminfo')
-			for line in fd:
-				if value + 'Total' in line:
-					check += 1
-					result[0] = int(line.split()[1]) * 1024
-				elif value + 'Free' in line:
-					check += 1
-					result[2] = int(line.split()[1]) * 1024
-				if check > 1:
-					if result[0] > 0:
-						result[1] = result[0] - result[2]
-						result[3] = result[1] * 100 / result[0]
-					break
-
-			fd.close()
+			meminfo = systemState.getMemInfo()
+			result[0] = meminfo[value + 'Total'] * 1024
+			result[2] = meminfo[value + 'Free'] * 1024
+			if result[0] > 0:
+				result[1] = result[0] - result[2]
+				result[3] = result[1] * 100 / result[0]
 		except:
 			pass
 
@@ -175,13 +166,9 @@ class ProgressDiskSpaceInfo(Poll, Converter):
 
 		def isMountPoint():
 			try:
-				fd = open('/proc/mounts', 'r')
-				for line in fd:
-					l = line.split()
-					if len(l) > 1 and l[1] == path:
+				for l in systemState.getMounts():
+					if l[1] == path:
 						return True
-
-				fd.close()
 			except:
 				return None
 
@@ -4,6 +4,7 @@ from Components.Label import Label
 from Components.Converter.Converter import Converter
 from Components.Element import cached
 from Components.Converter.Poll import Poll
+from Components.SystemState import systemState
 
 class VNetSpeedInfo(Poll, Converter, object):
 	RCL = 0
@@ -137,12 +138,12 @@ class VNetSpeedInfo(Poll, Converter, object):
 	def updateNetSpeedInfoStatus(self):
 		flaglan = 0
 		flagwlan = 0
-		bwm = open('/proc/net/dev')
-		bw = bwm.readline()
-		bw = bwm.readline()
+		bwm = iter(systemState.read('/proc/net/dev').splitlines(True))
+		bw = next(bwm, '')
+		bw = next(bwm, '')
 		sp = []
 		while bw:
-			bw = bwm.readline()
+			bw = next(bwm, '')
 			while bw.find('  ') is not -1:
 				bw = bw.replace('  ', ' ')
 
@@ -223,7 +224,6 @@ class VNetSpeedInfo(Poll, Converter, object):
 				self.wlantransmittotal = newwlantransmit
 				self.wlantransmittotalout = newwlantransmit / 1024
 
-		bwm.close()
 		if flaglan == 1:
 			self.receive = self.lanreceive
 			self.transmit = self.lantransmit
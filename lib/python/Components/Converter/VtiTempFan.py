@@ -3,6 +3,7 @@
 from Components.Converter.Converter import Converter
 from Components.Element import cached
 from Components.Converter.Poll import Poll
+from Components.SystemState import systemState
 
 class VtiTempFan(Poll, Converter, object):
 	TEMPINFO = 1
@@ -37,8 +38,8 @@ class VtiTempFan(Poll, Converter, object):
 		temp = ''
 		unit = ''
 		try:
-			temp = open("/proc/stb/sensors/temp0/value", "rb").readline().strip()
-			unit = open("/proc/stb/sensors/temp0/unit", "rb").readline().strip()
+			temp = systemState.readValue("/proc/stb/sensors/temp0/value")
+			unit = systemState.readValue("/proc/stb/sensors/temp0/unit")
 			tempinfo = 'TEMP: ' + str(temp) + ' \xc2\xb0' + str(unit)
 			return tempinfo
 		except:
@@ -47,7 +48,7 @@ class VtiTempFan(Poll, Converter, object):
 	def fanfile(self):
 		fan = ''
 		try:
-			fan = open("/proc/stb/fp/fan_speed", "rb").readline().strip()
+			fan = systemState.readValue("/proc/stb/fp/fan_speed")
 			faninfo = 'FAN: ' + str(fan)
 			return faninfo
 		except:
@@ -7,8 +7,9 @@ from enigma import eEPGCache, eListbox, eListboxPythonMultiContent, gFont, RT_HA
 
 from Tools.Alternatives import CompareWithAlternatives
 from Tools.LoadPixmap import LoadPixmap
+from Tools.RenderCache import RenderCache, formatTime
 
-from time import localtime, time, strftime
+from time import time
 from Components.config import config
 from ServiceReference import ServiceReference
 from Tools.Directories import resolveFilename, SCOPE_CURRENT_SKIN
@@ -56,6 +57,7 @@ class EPGList(GUIComponent):
 		self.skinColumns = False
 		self.tw = 120
 		self.dy = 0
+		self.entries = RenderCache()  # built rows, cleared when the layout changes
 
 		if type is EPG_TYPE_SINGLE:
 			self.l.setBuildFunc(self.buildSingleEntry)
@@ -165,6 +167,7 @@ class EPGList(GUIComponent):
 		instance.setContent(None)
 
 	def recalcEntrySize(self):
+		self.entries.clear()
 		esize = self.l.getItemSize()
 		width = esize.width()
 		height = esize.height()
@@ -233,18 +236,20 @@ class EPGList(GUIComponent):
 			return None
 
 	def buildSingleEntry(self, service, eventId, beginTime, duration, EventName):
+		key = (service, eventId, beginTime, duration, EventName, self.timer.generation)
+		res = self.entries.get(key)
+		if res is not None:
+			return res
 		clock_types = self.getClockTypesForEntry(service, eventId, beginTime, duration)
 		r1=self.weekday_rect
 		r2=self.datetime_rect
 		r3=self.descr_rect
 		split = int(r2.w * 0.55)
-		t = localtime(beginTime)
-		et = localtime(beginTime + duration)
 		res = [
 			None, # no private data needed
-			(eListboxPythonMultiContent.TYPE_TEXT, r1.x, r1.y, r1.w, r1.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, strftime(config.usage.date.dayshort.value, t)),
-			(eListboxPythonMultiContent.TYPE_TEXT, r2.x, r2.y, split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, strftime(config.usage.time.short.value + " -", t)),
-			(eListboxPythonMultiContent.TYPE_TEXT, r2.x + split, r2.y, r2.w - split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, strftime(config.usage.time.short.value, et))
+			(eListboxPythonMultiContent.TYPE_TEXT, r1.x, r1.y, r1.w, r1.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, formatTime(beginTime, config.usage.date.dayshort.value)),
+			(eListboxPythonMultiContent.TYPE_TEXT, r2.x, r2.y, split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, formatTime(beginTime, config.usage.time.short.value + " -")),
+			(eListboxPythonMultiContent.TYPE_TEXT, r2.x + split, r2.y, r2.w - split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, formatTime(beginTime + duration, config.usage.time.short.value))
 		]
 		if clock_types:
 			for i in range(len(clock_types)):
@@ -252,21 +257,23 @@ class EPGList(GUIComponent):
 			res.append((eListboxPythonMultiContent.TYPE_TEXT, r3.x + (i + 1) * self.space, r3.y, r3.w, r3.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, EventName))
 		else:
 			res.append((eListboxPythonMultiContent.TYPE_TEXT, r3.x, r3.y, r3.w, r3.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, EventName))
-		return res
+		return self.entries.put(key, res)
 
 	def buildSimilarEntry(self, service, eventId, beginTime, service_name, duration):
+		key = (service, eventId, beginTime, duration, service_name, self.timer.generation)
+		res = self.entries.get(key)
+		if res is not None:
+			return res
 		clock_types = self.getClockTypesForEntry(service, eventId, beginTime, duration)
 		r1=self.weekday_rect
 		r2=self.datetime_rect
 		r3=self.service_rect
 		split = int(r2.w * 0.55)
-		t = localtime(beginTime)
-		et = localtime(beginTime + duration)
 		res = [
 			None,  # no private data needed
-			(eListboxPythonMultiContent.TYPE_TEXT, r1.x, r1.y, r1.w, r1.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, strftime(config.usage.date.dayshort.value, t)),
-			(eListboxPythonMultiContent.TYPE_TEXT, r2.x, r2.y, split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, strftime(config.usage.time.short.value + " -", t)),
-			(eListboxPythonMultiContent.TYPE_TEXT, r2.x + split, r2.y, r2.w - split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, strftime(config.usage.time.short.value, et))
+			(eListboxPythonMultiContent.TYPE_TEXT, r1.x, r1.y, r1.w, r1.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, formatTime(beginTime, config.usage.date.dayshort.value)),
+			(eListboxPythonMultiContent.TYPE_TEXT, r2.x, r2.y, split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, formatTime(beginTime, config.usage.time.short.value + " -")),
+			(eListboxPythonMultiContent.TYPE_TEXT, r2.x + split, r2.y, r2.w - split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, formatTime(beginTime + duration, config.usage.time.short.value))
 		]
 		if clock_types:
 			for i in range(len(clock_types)):
@@ -274,9 +281,15 @@ class EPGList(GUIComponent):
 			res.append((eListboxPythonMultiContent.TYPE_TEXT, r3.x + (i + 1) * self.space, r3.y, r3.w, r3.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, service_name))
 		else:
 			res.append((eListboxPythonMultiContent.TYPE_TEXT, r3.x, r3.y, r3.w, r3.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, service_name))
-		return res
+		return self.entries.put(key, res)
 
 	def buildMultiEntry(self, changecount, service, eventId, beginTime, duration, EventName, nowTime, service_name):
+		# running events show the remaining minutes, which are part of the key
+		remaining = beginTime is not None and nowTime >= beginTime and ((beginTime+duration) - int(time())) / 60
+		key = (service, eventId, beginTime, duration, EventName, nowTime, service_name, remaining, self.timer.generation)
+		res = self.entries.get(key)
+		if res is not None:
+			return res
 		clock_types = self.getClockTypesForEntry(service, eventId, beginTime, duration)
 		r1=self.service_rect
 		r2=self.progress_rect
@@ -290,18 +303,15 @@ class EPGList(GUIComponent):
 			res.append((eListboxPythonMultiContent.TYPE_TEXT, r1.x, r1.y, r1.w, r1.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, service_name))
 		if beginTime is not None:
 			if nowTime < beginTime:
-				begin = localtime(beginTime)
-				end = localtime(beginTime+duration)
 				split = int(r2.w * 0.55)
 				res.extend((
-					(eListboxPythonMultiContent.TYPE_TEXT, r2.x, r2.y, split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, strftime(config.usage.time.short.value + "- ", begin)),
-					(eListboxPythonMultiContent.TYPE_TEXT, r2.x + split, r2.y, r2.w - split, r2.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, strftime(config.usage.time.short.value, end)),
+					(eListboxPythonMultiContent.TYPE_TEXT, r2.x, r2.y, split, r2.h, 0, RT_HALIGN_RIGHT|RT_VALIGN_CENTER, formatTime(beginTime, config.usage.time.short.value + "- ")),
+					(eListboxPythonMultiContent.TYPE_TEXT, r2.x + split, r2.y, r2.w - split, r2.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, formatTime(beginTime+duration, config.usage.time.short.value)),
 					(eListboxPythonMultiContent.TYPE_TEXT, r3.x + self.tw, r3.y, r3.w, r3.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, EventName)
 				))
 			else:
 				percent = (nowTime - beginTime) * 100 / duration
 				prefix = "+"
-				remaining = ((beginTime+duration) - int(time())) / 60
 				if remaining <= 0:
 					prefix = ""
 				res.extend((
@@ -309,7 +319,7 @@ class EPGList(GUIComponent):
 					(eListboxPythonMultiContent.TYPE_TEXT, r3.x, r3.y, self.gap(self.tw), r3.h, 1, RT_HALIGN_CENTER, _("%s%d min") % (prefix, remaining)),
 					(eListboxPythonMultiContent.TYPE_TEXT, r3.x + self.tw, r3.y, r3.w, r3.h, 0, RT_HALIGN_LEFT|RT_VALIGN_CENTER, EventName)
 				))
-		return res
+		return self.entries.put(key, res)
 
 	def queryEPG(self, list, buildFunc=None):
 		if self.epgcache is not None:
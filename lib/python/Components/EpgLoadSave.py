@@ -43,7 +43,7 @@ class EpgCacheLoadCheckPoller:
 		Components.Task.job_manager.AddJob(self.createLoadCheckJob())
 
 	def createLoadCheckJob(self):
-		job = Components.Task.Job(_("EPG Cache Check"))
+		job = Components.Task.Job(_("EPG Cache Check"), resource=Components.Task.RESOURCE_CPU, priority=Components.Task.Job.PRIORITY_HIGH)
 		if config.epg.cacheloadsched.value:
 			task = Components.Task.PythonTask(job, _("Reloading EPG Cache..."))
 			task.work = self.JobEpgCacheLoad
@@ -82,7 +82,7 @@ class EpgCacheSaveCheckPoller:
 		Components.Task.job_manager.AddJob(self.createSaveCheckJob())
 
 	def createSaveCheckJob(self):
-		job = Components.Task.Job(_("EPG Cache Check"))
+		job = Components.Task.Job(_("EPG Cache Check"), resource=Components.Task.RESOURCE_CPU, priority=Components.Task.Job.PRIORITY_HIGH)
 		if config.epg.cachesavesched.value:
 			task = Components.Task.PythonTask(job, _("Saving EPG Cache..."))
 			task.work = self.JobEpgCacheSave
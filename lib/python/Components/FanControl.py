@@ -4,6 +4,7 @@ from __future__ import print_function
 import os
 
 from Components.config import config, ConfigSubList, ConfigSubsection, ConfigSlider
+from Components.SystemState import systemState
 from Tools.BoundFunction import boundFunction
 
 import NavigationInstance
@@ -102,7 +103,7 @@ class FanControl:
 		return os.path.exists("/proc/stb/fp/fan_vlt") or os.path.exists("/proc/stb/fp/fan_pwm")
 
 	def getFanSpeed(self, fanid):
-		return int(open("/proc/stb/fp/fan_speed", "r").readline().strip()[:-4])
+		return int(systemState.readValue("/proc/stb/fp/fan_speed")[:-4])
 
 	def getVoltage(self, fanid):
 		return int(open("/proc/stb/fp/fan_vlt", "r").readline().strip(), 16)
@@ -6,6 +6,7 @@ import time
 from Tools.CList import CList
 from Components.SystemInfo import SystemInfo
 from Components.Console import Console
+from Components.SystemState import systemState
 from Components import Task
 from Tools.StbHardware import getBoxProc
 from boxbranding import getMachineMtdRoot, getMachineProcModel
@@ -24,15 +25,10 @@ def readFile(filename):
 
 def getProcMounts():
 	try:
-		mounts = open("/proc/mounts", 'r')
+		return list(systemState.getMounts())
 	except IOError as ex:
 		print("[Harddisk] Failed to open /proc/mounts", ex)
 		return []
-	result = [line.strip().split(' ') for line in mounts]
-	for item in result:
-		# Spaces are encoded as \040 in mounts
-		item[1] = item[1].replace('\\040', ' ')
-	return result
 
 def isFileSystemSupported(filesystem):
 	try:
@@ -621,7 +617,7 @@ class HarddiskManager:
 		BLACKLIST=[]
 		if SystemInfo["HasMMC"]:
 			BLACKLIST=["%s" %(getMachineMtdRoot()[0:7])]
-		if SystemInfo["HasMMC"] and "root=/dev/mmcblk0p1" in open('/proc/cmdline', 'r').read():
+		if SystemInfo["HasMMC"] and "root=/dev/mmcblk0p1" in systemState.getCmdline():
 			BLACKLIST=["mmcblk0p1"]
 		blacklisted = False
 		if blockdev[:7] in BLACKLIST:
@@ -722,6 +718,7 @@ class HarddiskManager:
 	def addHotplugPartition(self, device, physdev = None):
 		# device is the device name, without /dev
 		# physdev is the physical device path, which we (might) use to determine the userfriendly name
+		systemState.invalidate("/proc/mounts")
 		if not physdev:
 			dev, part = self.splitDeviceName(device)
 			try:
@@ -749,6 +746,7 @@ class HarddiskManager:
 	def addHotplugAudiocd(self, device, physdev = None):
 		# device is the device name, without /dev
 		# physdev is the physical device path, which we (might) use to determine the userfriendly name
+		systemState.invalidate("/proc/mounts")
 		if not physdev:
 			dev, part = self.splitDeviceName(device)
 			try:
@@ -766,6 +764,7 @@ class HarddiskManager:
 		return error, blacklisted, removable, is_cdrom, partitions, medium_found
 
 	def removeHotplugPartition(self, device):
+		systemState.invalidate("/proc/mounts")
 		for x in self.partitions[:]:
 			if x.device == device:
 				self.partitions.remove(x)
@@ -845,6 +844,7 @@ class HarddiskManager:
 		return description
 
 	def addMountedPartition(self, device, desc):
+		systemState.invalidate("/proc/mounts")
 		for x in self.partitions:
 			if x.mountpoint == device:
 				#already_mounted
@@ -852,6 +852,7 @@ class HarddiskManager:
 		self.partitions.append(Partition(mountpoint=device, description=desc))
 
 	def removeMountedPartition(self, mountpoint):
+		systemState.invalidate("/proc/mounts")
 		for x in self.partitions[:]:
 			if x.mountpoint == mountpoint:
 				self.partitions.remove(x)
@@ -891,6 +892,7 @@ class UnmountTask(Task.LoggingTask):
 			self.cmd = 'true'
 			self.args = [self.cmd]
 	def afterRun(self):
+		systemState.invalidate("/proc/mounts")
 		for path in self.mountpoints:
 			try:
 				os.rmdir(path)
@@ -929,6 +931,8 @@ class MountTask(Task.LoggingTask):
 			# Sorry for the sleep 2 hack...
 			self.setCmdline('sleep 2; hdparm -z ' + self.hdd.disk_path)
 			self.postconditions.append(Task.ReturncodePostcondition())
+	def afterRun(self):
+		systemState.invalidate("/proc/mounts")
 
 
 class MkfsTask(Task.LoggingTask):
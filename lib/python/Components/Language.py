@@ -5,6 +5,7 @@ import gettext
 import locale
 import os
 from Tools.Directories import SCOPE_LANGUAGE, resolveFilename, SCOPE_LIBDIR
+from Tools.RenderCache import clearAll as clearRenderCaches
 
 LPATH = resolveFilename(SCOPE_LANGUAGE, "")
 
@@ -102,6 +103,7 @@ class Language:
 				locale.setlocale(category, (self.getLanguage(), 'UTF-8'))
 			except:
 				pass
+		clearRenderCaches()  # Day and month names of formatted times.
 
 		# Also write a locale.conf as /home/root/.config/locale.conf to apply language to interactive shells as well:
 		try:
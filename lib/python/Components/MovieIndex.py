@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+from hashlib import md5
+from enigma import iServiceInformation
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
+try:
+	import cPickle as pickle
+except:
+	import pickle
+
+# Per directory index of the movie metadata shown in the movie list.
+#
+# Getting the name, tags and begin time of a recording means reading its
+# .meta/.eit files and its length needs the .ap/.sc files. On a network share with thousands of recordings that makes
+# opening a directory slow. The index keeps these values, keyed on the mtime
+# and size of the recording and the mtime of its .meta file, in one file per
+# directory below INDEX_DIR, so listing an unchanged directory needs two stats
+# per recording. Nothing is written into the browsed directories themselves
+# (network shares, USB sticks, the trash can).
+#
+# Moving a recording (e.g. into the trash) moves its record along; renaming
+# it by editing the .meta file forgets the record. Play positions are read
+# through the cutsCache of Tools/CutsCache.py.
+
+INDEX_DIR = resolveFilename(SCOPE_CONFIG, "movieindex")
+
+# Record fields
+MTIME = 0
+SIZE = 1
+CTIME = 2
+NAME = 3
+LENGTH = 4  # None while not yet calculated
+TAGS = 5
+BEGIN = 6
+META = 7  # mtime of the .meta file, None without one
+FIELDS = 8
+
+def getIndexFilename(path):
+	# The index of a directory is stored under the hash of its path.
+	if not isinstance(path, bytes):
+		path = path.encode("utf-8")
+	return os.path.join(INDEX_DIR, md5(path).hexdigest() + ".pkl")
+
+def getMetaMtime(path):
+	try:
+		return os.stat(path + ".meta").st_mtime
+	except OSError:
+		return None
+
+class DirectoryIndex:
+	def __init__(self, path):
+		self.path = path
+		self.filename = getIndexFilename(path)
+		self.records = None  # basename -> record
+		self.dirty = False
+
+	def load(self):
+		self.records = {}
+		try:
+			with open(self.filename, "rb") as f:
+				(path, records) = pickle.load(f)
+			if path == self.path and isinstance(records, dict):
+				self.records = dict([(name, record) for (name, record) in records.items() if len(record) == FIELDS])
+		except Exception:
+			pass
+
+	def save(self):
+		if not self.dirty:
+			return
+		self.dirty = False
+		try:
+			if not os.path.isdir(INDEX_DIR):
+				os.makedirs(INDEX_DIR)
+			with open(self.filename + ".writing", "wb") as f:
+				pickle.dump((self.path, self.records), f, pickle.HIGHEST_PROTOCOL)
+			os.rename(self.filename + ".writing", self.filename)
+		except Exception as err:
+			print("[MovieIndex] Unable to write index '%s' of '%s':" % (self.filename, self.path), err)
+
+	def get(self, name, st, metaMtime):
+		if self.records is None:
+			self.load()
+		record = self.records.get(name)
+		if record is not None and record[MTIME] == st.st_mtime and record[SIZE] == st.st_size and record[META] == metaMtime:
+			return record
+		return None
+
+	def put(self, name, record):
+		if self.records is None:
+			self.load()
+		self.records[name] = record
+		self.dirty = True
+
+	def pop(self, name):
+		if self.records is None:
+			self.load()
+		record = self.records.pop(name, None)
+		if record is not None:
+			self.dirty = True
+		return record
+
+	def prune(self, names):
+		# Drops the records of recordings that no longer exist.
+		if self.records is None:
+			self.load()
+		for name in [x for x in self.records if x not in names]:
+			del self.records[name]
+			self.dirty = True
+
+class MovieIndex:
+	def __init__(self):
+		self.directories = {}
+
+	def getDirectory(self, path):
+		directory = self.directories.get(path)
+		if directory is None:
+			directory = self.directories[path] = DirectoryIndex(path)
+		return directory
+
+	def getInfo(self, serviceref, serviceHandler):
+		# Returns (info, stat) for a recording, where info answers the common
+		# questions of the movie list from the index. Returns (None, None) if
+		# the service is not a plain file.
+		path = serviceref.getPath()
+		try:
+			st = os.stat(path)
+		except OSError:
+			return (None, None)
+		(dirname, name) = os.path.split(path)
+		directory = self.getDirectory(dirname)
+		metaMtime = getMetaMtime(path)
+		record = directory.get(name, st, metaMtime)
+		info = IndexedInfo(serviceref, serviceHandler, directory, name, record)
+		if record is None:
+			real = info.getRealInfo()
+			if real is None:
+				return (None, st)
+			record = [st.st_mtime, st.st_size, st.st_ctime, real.getName(serviceref), None, real.getInfoString(serviceref, iServiceInformation.sTags), real.getInfo(serviceref, iServiceInformation.sTimeCreate), metaMtime]
+			directory.put(name, record)
+			info.record = record
+		return (info, st)
+
+	def move(self, path, newpath):
+		(dirname, name) = os.path.split(path)
+		record = self.getDirectory(dirname).pop(name)
+		if record is not None:
+			(dirname, name) = os.path.split(newpath)
+			self.getDirectory(dirname).put(name, record)
+
+	def forget(self, path):
+		(dirname, name) = os.path.split(path)
+		self.getDirectory(dirname).pop(name)
+
+	def removeIndex(self, path):
+		# Deletes the index of a directory, e.g. when the directory is removed.
+		self.directories.pop(path, None)
+		try:
+			os.remove(getIndexFilename(path))
+		except OSError:
+			pass
+
+	def save(self):
+		for directory in self.directories.values():
+			directory.save()
+
+# iStaticServiceInformation for the movie list, answers from the index
+# record and gets the real information from the service handler only for
+# everything else.
+class IndexedInfo:
+	def __init__(self, serviceref, serviceHandler, directory, name, record):
+		self.serviceref = serviceref
+		self.serviceHandler = serviceHandler
+		self.directory = directory
+		self.name = name
+		self.record = record
+		self.real = None
+
+	def getRealInfo(self):
+		if self.real is None:
+			self.real = self.serviceHandler.info(self.serviceref)
+		return self.real
+
+	def getName(self, serviceref):
+		return self.record[NAME]
+
+	def getLength(self, serviceref):
+		if self.record[LENGTH] is None:
+			self.record[LENGTH] = self.getRealInfo().getLength(serviceref)
+			self.directory.dirty = True
+		return self.record[LENGTH]
+
+	def getFileSize(self, serviceref):
+		return self.record[SIZE]
+
+	def getInfo(self, serviceref, w):
+		if w == iServiceInformation.sTimeCreate:
+			return self.record[BEGIN]
+		return self.getRealInfo().getInfo(serviceref, w)
+
+	def getInfoString(self, serviceref, w):
+		if w == iServiceInformation.sTags:
+			return self.record[TAGS]
+		return self.getRealInfo().getInfoString(serviceref, w)
+
+	def __getattr__(self, name):
+		return getattr(self.getRealInfo(), name)
+
+movieIndex = MovieIndex()
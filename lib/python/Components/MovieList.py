@@ -2,22 +2,24 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 import os
-import struct
 import random
 from time import localtime, strftime
 from Components.GUIComponent import GUIComponent
 from Tools.FuzzyDate import FuzzyTime
 from Components.MultiContent import MultiContentEntryText, MultiContentEntryPixmapAlphaBlend, MultiContentEntryProgress
 from Components.config import config
+from Components.MovieIndex import movieIndex
 from Components.Renderer.Picon import getPiconName
 from Tools.LoadPixmap import LoadPixmap
+from Tools.PixmapCache import pixmapCache
 from Tools.Directories import SCOPE_CURRENT_SKIN, resolveFilename
 from Screens.LocationBox import defaultInhibitDirs
 from ServiceReference import ServiceReference
 from Tools.Trashcan import getTrashFolder
+from Tools.CutsCache import cutsCache, CUT_TYPE_LAST
 import NavigationInstance
 import skin
-from enigma import eListboxPythonMultiContent, eListbox, gFont, iServiceInformation, eSize, loadPNG, RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_VALIGN_CENTER, BT_SCALE, BT_KEEP_ASPECT_RATIO, BT_HALIGN_CENTER, BT_VALIGN_CENTER, eServiceReference, eServiceCenter, eTimer, getDesktop
+from enigma import eListboxPythonMultiContent, eListbox, gFont, iServiceInformation, eSize, RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_VALIGN_CENTER, BT_SCALE, BT_KEEP_ASPECT_RATIO, BT_HALIGN_CENTER, BT_VALIGN_CENTER, eServiceReference, eServiceCenter, eTimer, getDesktop
 import six
 
 AUDIO_EXTENSIONS = frozenset((".dts", ".mp3", ".wav", ".wave", ".wv", ".oga", ".ogg", ".flac", ".m4a", ".mp2", ".m2a", ".wma", ".ac3", ".mka", ".aac", ".ape", ".alac", ".amr", ".au", ".mid"))
@@ -26,8 +28,6 @@ IMAGE_EXTENSIONS = frozenset((".jpg", ".png", ".gif", ".bmp", ".jpeg", ".jpe", "
 MOVIE_EXTENSIONS = frozenset((".mpg", ".vob", ".m4v", ".mkv", ".avi", ".divx", ".dat", ".flv", ".mp4", ".mov", ".wmv", ".asf", ".3gp", ".3g2", ".mpeg", ".mpe", ".rm", ".rmvb", ".ogm", ".ogv", ".m2ts", ".mts", ".webm", ".pva", ".wtv", ".ts"))
 KNOWN_EXTENSIONS = MOVIE_EXTENSIONS.union(IMAGE_EXTENSIONS, DVD_EXTENSIONS, AUDIO_EXTENSIONS)
 
-cutsParser = struct.Struct('>QI') # big-endian, 64-bit PTS and 32-bit type
-
 def getDesktopSize():
 	s = getDesktop(0).size()
 	return (s.width(), s.height())
@@ -72,16 +72,7 @@ def moviePlayState(cutsFileName, ref, length):
 	'''Returns None, 0..100 for percentage'''
 	try:
 		# read the cuts file first
-		f = open(cutsFileName, 'rb')
-		lastPosition = None
-		while 1:
-			data = f.read(cutsParser.size)
-			if len(data) < cutsParser.size:
-				break
-			cut, cutType = cutsParser.unpack(data)
-			if cutType == 3: # undocumented, but 3 appears to be the stop
-				lastPosition = cut
-		f.close()
+		lastPosition = cutsCache.getLastPosition(cutsFileName)
 		# See what we have in RAM (it might help)
 		last = lastPlayPosFromCache(ref)
 		if last:
@@ -121,17 +112,8 @@ def resetMoviePlayState(cutsFileName, ref=None):
 		if ref is not None:
 			from Screens.InfoBarGenerics import delResumePoint
 			delResumePoint(ref)
-		f = open(cutsFileName, 'rb')
-		cutlist = []
-		while 1:
-			data = f.read(cutsParser.size)
-			if len(data) < cutsParser.size:
-				break
-			cut, cutType = cutsParser.unpack(data)
-			if cutType != 3:
-				cutlist.append(data)
-		f.close()
-		open(cutsFileName, 'wb').write(''.join(cutlist))
+		cutlist = [x for x in cutsCache.getCuts(cutsFileName) if x[1] != CUT_TYPE_LAST]
+		cutsCache.write(cutsFileName, cutlist)
 	except:
 		pass
 		#import sys
@@ -473,7 +455,7 @@ class MovieList(GUIComponent):
 			# Picon
 			picon = getPiconName(serviceref)
 			if picon != "":
-				displayPicon = loadPNG(picon)
+				displayPicon = pixmapCache.load(picon, "picon")
 			if displayPicon is not None:
 				res.append(MultiContentEntryPixmapAlphaBlend(
 					pos = (colX, 0), size = (piconWidth, ih),
@@ -633,25 +615,33 @@ class MovieList(GUIComponent):
 			elif (config.usage.trashsort_deltime.value == "show delete time"):
 				MovieList.UsingTrashSort = MovieList.TRASHSORT_SHOWDELETE
 
+		indexed = set()
 		while 1:
 			serviceref = reflist.getNext()
 			if not serviceref.valid():
 				break
+			info = st = None
+			if not serviceref.flags & eServiceReference.mustDescent:
+				info, st = movieIndex.getInfo(serviceref, serviceHandler)
+				indexed.add(os.path.split(serviceref.getPath())[1])
 			if config.ParentalControl.servicepinactive.value and config.ParentalControl.storeservicepin.value != "never":
 				from Components.ParentalControl import parentalControl
 				if not parentalControl.sessionPinCached and parentalControl.isProtected(serviceref):
 					continue
-			info = serviceHandler.info(serviceref)
+			if info is None:
+				info = serviceHandler.info(serviceref)
 			if info is None:
 				info = justStubInfo
 			begin = info.getInfo(serviceref, iServiceInformation.sTimeCreate)
 			begin2 = 0
 			if MovieList.UsingTrashSort:
 				f_path = serviceref.getPath()
-				if os.path.exists(f_path):	# Override with deltime for sorting
+				if st is None and os.path.exists(f_path):
+					st = os.stat(f_path)
+				if st is not None:	# Override with deltime for sorting
 					if MovieList.UsingTrashSort == MovieList.TRASHSORT_SHOWRECORD:
 						begin2 = begin		# Save for later re-instatement
-					begin = os.stat(f_path).st_ctime
+					begin = st.st_ctime
 
 			if serviceref.flags & eServiceReference.mustDescent:
 				dirname = info.getName(serviceref)
@@ -694,6 +684,9 @@ class MovieList(GUIComponent):
 			else:
 				self.list.append((serviceref, info, begin, -1))
 
+		movieIndex.getDirectory(rootPath).prune(indexed)
+		movieIndex.save()
+
 		self.firstFileEntry = numberOfDirs
 		self.parentDirectory = 0
 
@@ -7,6 +7,8 @@ from Components.Pixmap import Pixmap
 from Components.config import config
 from Components.Sources.ServiceEvent import ServiceEvent
 from Components.Sources.CurrentService import CurrentService
+from Tools.BoundFunction import boundFunction
+from Tools.PixmapCache import pixmapCache
 from os import path as os_path
 
 class Cover(Renderer):
@@ -16,6 +18,7 @@ class Cover(Renderer):
 		Renderer.__init__(self)
 		self.nameCache = {}
 		self.picname = ''
+		self.picload = None
 
 	GUI_WIDGET = ePixmap
 
@@ -55,11 +58,18 @@ class Cover(Renderer):
 				if picname == self.picname:
 					return
 				self.picname = picname
+				self.picload = None  # Drops the decode of the previous cover.
 				if picname != '' and os_path.exists(picname):
-					sc = AVSwitch().getFramebufferScale()
 					size = self.instance.size()
+					coverKey = (picname, os_path.getmtime(picname), size.width(), size.height())
+					ptr = pixmapCache.get(coverKey, "cover")
+					if ptr is not None:
+						self.instance.setPixmap(ptr)
+						self.instance.show()
+						return
+					sc = AVSwitch().getFramebufferScale()
 					self.picload = ePicLoad()
-					self.picload.PictureData.get().append(self.showCoverCallback)
+					self.picload.PictureData.get().append(boundFunction(self.showCoverCallback, coverKey))
 					if self.picload:
 						self.picload.setPara((size.width(),
 						size.height(),
@@ -69,18 +79,19 @@ class Cover(Renderer):
 						1,
 						'#00000000'))
 						if self.picload.startDecode(picname) != 0:
-							del self.picload
+							self.picload = None
 				else:
 					self.instance.hide()
 		return
 
-	def showCoverCallback(self, picInfo = None):
+	def showCoverCallback(self, coverKey, picInfo = None):
 		if self.picload:
 			ptr = self.picload.getData()
 			if ptr != None:
+				pixmapCache.put(coverKey, ptr, "cover")
 				self.instance.setPixmap(ptr)
 				self.instance.show()
-			del self.picload
+			self.picload = None
 		return
 
 	def findCover(self, path):
@@ -1,7 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 from __future__ import print_function
-import os, re, unicodedata
+import os, re, time, unicodedata
 from Components.Renderer.Renderer import Renderer
 from enigma import ePixmap
 from Tools.Alternatives import GetWithAlternative
@@ -9,12 +9,74 @@ from Tools.Directories import pathExists, SCOPE_CURRENT_SKIN, resolveFilename
 from Components.Harddisk import harddiskmanager
 from ServiceReference import ServiceReference
 
+# Names of the .png files in picon directories, so finding a picon checks a
+# set instead of doing a stat per candidate name and search path. The mtimes
+# of the directories are checked every CheckInterval seconds, and mountpoints
+# are dropped when a partition is added or removed. generation is bumped on
+# every change, so memoized lookups know when they are stale.
+class PiconDirectoryIndex:
+	CheckInterval = 30
+
+	def __init__(self):
+		self.directories = {}  # path -> (mtime, set of names without ".png")
+		self.lastCheck = time.time()
+		self.generation = 0
+
+	def read(self, path):
+		try:
+			mtime = os.stat(path).st_mtime
+			names = set([fn[:-4] for fn in os.listdir(path) if fn.endswith(".png")])
+		except OSError:
+			return (None, set())
+		return (mtime, names)
+
+	def check(self):
+		now = time.time()
+		if abs(now - self.lastCheck) < self.CheckInterval:
+			return
+		self.lastCheck = now
+		for (path, entry) in list(self.directories.items()):
+			try:
+				mtime = os.stat(path).st_mtime
+			except OSError:
+				mtime = None
+			if mtime != entry[0]:
+				self.directories[path] = self.read(path)
+				self.generation += 1
+
+	def invalidate(self, mountpoint):
+		mountpoint = mountpoint.rstrip("/") + "/"
+		for path in [x for x in self.directories if (x + "/").startswith(mountpoint)]:
+			del self.directories[path]
+		self.generation += 1
+
+	def getNames(self, path):
+		self.check()
+		path = path.rstrip("/") or "/"
+		entry = self.directories.get(path)
+		if entry is None:
+			entry = self.directories[path] = self.read(path)
+		return entry[1]
+
+	def contains(self, path, name):
+		return name in self.getNames(path)
+
+	def exists(self, filename):
+		(path, name) = os.path.split(filename)
+		return name.endswith(".png") and self.contains(path, name[:-4])
+
+piconIndex = PiconDirectoryIndex()
+
 class PiconLocator:
+	MaxMemo = 10000
+
 	def __init__(self, piconDirectories = ['picon']):
 		harddiskmanager.on_partition_list_change.append(self.__onPartitionChange)
 		self.piconDirectories = piconDirectories
 		self.activePiconPath = None
 		self.searchPaths = []
+		self.memo = {}  # service reference -> picon name
+		self.memoGeneration = piconIndex.generation
 		for mp in ('/usr/share/enigma2/', '/'):
 			self.__onMountpointAdded(mp)
 		for part in harddiskmanager.getMountedPartitions():
@@ -24,18 +86,16 @@ class PiconLocator:
 		for piconDirectory in self.piconDirectories:
 			try:
 				path = os.path.join(mountpoint, piconDirectory) + '/'
-				if os.path.isdir(path) and path not in self.searchPaths:
-					for fn in os.listdir(path):
-						if fn.endswith('.png'):
-							print("[Picon] adding path:", path)
-							self.searchPaths.append(path)
-							break
+				if path not in self.searchPaths and piconIndex.getNames(path):
+					print("[Picon] adding path:", path)
+					self.searchPaths.append(path)
+					self.memo.clear()
 			except:
 				pass
 
 	def __onMountpointRemoved(self, mountpoint):
 		for piconDirectory in self.piconDirectories:
-			path = os.path.join(mountpoint, self.piconDirectories) + '/'
+			path = os.path.join(mountpoint, piconDirectory) + '/'
 			try:
 				self.searchPaths.remove(path)
 				print("[Picon] removed path:", path)
@@ -43,6 +103,8 @@ class PiconLocator:
 				pass
 
 	def __onPartitionChange(self, why, part):
+		if part.mountpoint:
+			piconIndex.invalidate(part.mountpoint)
 		if why == 'add':
 			self.__onMountpointAdded(part.mountpoint)
 		elif why == 'remove':
@@ -50,15 +112,13 @@ class PiconLocator:
 
 	def findPicon(self, serviceName):
 		if self.activePiconPath is not None:
-			pngname = self.activePiconPath + serviceName + ".png"
-			if pathExists(pngname):
-				return pngname
+			if piconIndex.contains(self.activePiconPath, serviceName):
+				return self.activePiconPath + serviceName + ".png"
 		else:
 			for path in self.searchPaths:
-				pngname = path + serviceName + ".png"
-				if pathExists(pngname):
+				if piconIndex.contains(path, serviceName):
 					self.activePiconPath = path
-					return pngname
+					return path + serviceName + ".png"
 		return ""
 
 	def addSearchPath(self, value):
@@ -67,8 +127,19 @@ class PiconLocator:
 				value += '/'
 			if not value.startswith('/media/net') and not value.startswith('/media/autofs') and	value not in self.searchPaths:
 				self.searchPaths.append(value)
+				self.memo.clear()
 
 	def getPiconName(self, serviceName):
+		piconIndex.check()
+		if self.memoGeneration != piconIndex.generation or len(self.memo) > self.MaxMemo:
+			self.memo.clear()
+			self.memoGeneration = piconIndex.generation
+		pngname = self.memo.get(serviceName)
+		if pngname is None:
+			pngname = self.memo[serviceName] = self.lookupPiconName(serviceName)
+		return pngname
+
+	def lookupPiconName(self, serviceName):
 		#remove the path and name fields, and replace ':' by '_'
 		fields = GetWithAlternative(serviceName).split(':', 10)[:10]
 		if not fields or len(fields) < 10:
@@ -100,10 +171,10 @@ class PiconLocator:
 		if not pngname: # picon default
 			tmp = resolveFilename(SCOPE_CURRENT_SKIN, 'picon_default.png') # picon_default in current active skin
 			tmp2 = self.findPicon("picon_default") # picon_default in picon folder
-			if pathExists(tmp2):
+			if tmp2:
 				pngname = tmp2
 			else:
-				if pathExists(tmp):
+				if piconIndex.exists(tmp):
 					pngname = tmp
 				else:
 					pngname = resolveFilename(SCOPE_CURRENT_SKIN, 'picon_default.png')
@@ -142,7 +213,7 @@ class Picon(Renderer):
 		if self.instance:
 			if what[0] in (self.CHANGED_DEFAULT, self.CHANGED_ALL, self.CHANGED_SPECIFIC):
 				pngname = piconLocator.getPiconName(self.source.text)
-				if not pathExists(pngname): # no picon for service found
+				if not piconIndex.exists(pngname): # no picon for service found
 					pngname = self.defaultpngname
 				if self.pngname != pngname:
 					if pngname:
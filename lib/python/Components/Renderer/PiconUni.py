@@ -4,6 +4,7 @@ from __future__ import print_function
 from Components.Renderer.Renderer import Renderer
 from enigma import ePixmap
 from Tools.Directories import SCOPE_CURRENT_SKIN, resolveFilename, SCOPE_PLUGINS
+from Components.Renderer.Picon import piconIndex
 import os
 
 searchPaths = []
@@ -85,9 +86,8 @@ class PiconUni(Renderer):
 		pathtmp = self.path.split(',')
 		for path in searchPaths:
 			for dirName in pathtmp:
-				pngname = (path % dirName) + serviceName + '.png'
-				if os.path.isfile(pngname):
-					return pngname
+				if piconIndex.contains(path % dirName, serviceName):
+					return (path % dirName) + serviceName + '.png'
 		return ''
 
 initPiconPaths()
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 from Components.FanControl import fancontrol
+from Components.SystemState import systemState
 
 class Sensors:
 	# (type, name, unit, directory)
@@ -43,7 +44,7 @@ class Sensors:
 		value = -1
 		sensor = self.sensors_list[sensorid]
 		if sensor[0] == self.TYPE_TEMPERATURE:
-			value = int(open("%s/value" % sensor[3], "r").readline().strip())
+			value = int(systemState.readValue("%s/value" % sensor[3]))
 		elif sensor[0] == self.TYPE_FAN_RPM:
 			value = fancontrol.getFanSpeed(sensor[3])
 		return value
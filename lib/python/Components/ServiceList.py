@@ -15,6 +15,8 @@ from Components.config import config
 
 def refreshServiceList(configElement = None):
 	from Screens.InfoBar import InfoBar
+	from Components.ChannelNumbers import channelNumbers
+	channelNumbers.invalidate()
 	InfoBarInstance = InfoBar.instance
 	if InfoBarInstance is not None:
 		servicelist = InfoBarInstance.servicelist
@@ -166,34 +168,33 @@ class ServiceList(GUIComponent):
 		if adjust and config.usage.multibouquet.value and InfoBarCount == 1 and ref and ref.type != 8192:
 			print("[ServiceList] search for service in user bouquets")
 			if self.serviceList:
+				from Components.ChannelNumbers import channelNumbers
+				from Screens.ChannelSelection import multibouquet_tv_ref, multibouquet_radio_ref
 				revert_mode = config.servicelist.lastmode.value
 				revert_root = self.getRoot()
-				self.serviceList.setModeTv()
-				revert_tv_root = self.getRoot()
-				bouquets = self.serviceList.getBouquetList()
-				for bouquet in bouquets:
-					self.serviceList.enterUserbouquet(bouquet[1])
-					if self.l.setCurrent(ref):
-						config.servicelist.lastmode.save()
-						self.serviceList.saveChannel(ref)
-						return True
-				self.serviceList.enterUserbouquet(revert_tv_root)
-				self.serviceList.setModeRadio()
-				revert_radio_root = self.getRoot()
-				bouquets = self.serviceList.getBouquetList()
-				for bouquet in bouquets:
-					self.serviceList.enterUserbouquet(bouquet[1])
-					if self.l.setCurrent(ref):
-						config.servicelist.lastmode.save()
-						self.serviceList.saveChannel(ref)
-						return True
-				self.serviceList.enterUserbouquet(revert_radio_root)
+				changed = False
+				# Only the bouquets that contain the service are entered.
+				for (root, setMode) in ((multibouquet_tv_ref, self.serviceList.setModeTv), (multibouquet_radio_ref, self.serviceList.setModeRadio)):
+					bouquets = channelNumbers.getServiceBouquets(root, ref)
+					if not bouquets:
+						continue
+					changed = True
+					setMode()
+					revert_mode_root = self.getRoot()
+					for bouquet in bouquets:
+						self.serviceList.enterUserbouquet(bouquet)
+						if self.l.setCurrent(ref):
+							config.servicelist.lastmode.save()
+							self.serviceList.saveChannel(ref)
+							return True
+					self.serviceList.enterUserbouquet(revert_mode_root)
 				print("[ServiceList] service not found in any user bouquets")
-				if revert_mode == "tv":
-					self.serviceList.setModeTv()
-				elif revert_mode == "radio":
-					self.serviceList.setModeRadio()
-				self.serviceList.enterUserbouquet(revert_root)
+				if changed:
+					if revert_mode == "tv":
+						self.serviceList.setModeTv()
+					elif revert_mode == "radio":
+						self.serviceList.setModeRadio()
+					self.serviceList.enterUserbouquet(revert_root)
 		return False
 
 	def getCurrent(self):
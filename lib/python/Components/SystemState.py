@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import time
+
+# Shared snapshots of /proc and /sys files.
+#
+# Harddisk, the movie list, the trash can and a bunch of converters each read
+# and split /proc/mounts, /proc/stat, /proc/net/dev, sensor files and so on
+# on their own, often several times a second. systemState reads each file at
+# most once per tick, parses it once per parser and hands the same result to
+# every consumer, so the results must not be modified.
+#
+# Files that only change at known moments have their own tick: /proc/cmdline
+# never changes and the mount table is invalidated by the hotplug and mount
+# code as well.
+
+def parseMounts(text):
+	result = []
+	for line in text.splitlines():
+		item = line.strip().split(' ')
+		if len(item) > 1:
+			# Spaces are encoded as \040 in mounts
+			item[1] = item[1].replace('\\040', ' ')
+			result.append(item)
+	return result
+
+def parseCpuTimes(text):
+	# Returns [cpu, total, busy] for the total and every cpu.
+	result = []
+	for line in text.splitlines():
+		if line.startswith("cpu"):
+			# [cpu, usr, nic, sys, idle, iowait, irq, softirq, steal, ...]
+			fields = line.split()
+			times = [int(x) for x in fields[1:]]
+			total = sum(times)
+			# busy = total - idle - iowait
+			result.append([fields[0], total, total - times[3] - times[4]])
+	return result
+
+def parseNetDev(text):
+	# Returns interface -> [rx bytes, rx packets, rx errs, rx drop, ..., tx bytes, ...]
+	result = {}
+	for line in text.splitlines()[2:]:
+		if ":" in line:
+			(name, counters) = line.split(":", 1)
+			result[name.strip()] = [int(x) for x in counters.split()]
+	return result
+
+def parseMemInfo(text):
+	# Returns name -> value, in kB for most entries.
+	result = {}
+	for line in text.splitlines():
+		fields = line.split()
+		if len(fields) > 1:
+			result[fields[0].rstrip(":")] = int(fields[1])
+	return result
+
+def parseValue(text):
+	return text.strip()
+
+class SystemState:
+	Tick = 0.4  # Seconds, shorter than the shortest converter poll interval.
+
+	def __init__(self):
+		self.ticks = {"/proc/cmdline": None}  # path -> tick, None never expires
+		self.snapshots = {}  # path -> (time, text, {parser: parsed text})
+		self.requests = {}
+		self.reads = {}
+
+	def setTick(self, tick, path=None):
+		# Sets the default tick, or the one of a single path.
+		if path is None:
+			self.Tick = tick
+		else:
+			self.ticks[path] = tick
+
+	def read(self, path, parser=None):
+		# Returns the (parsed) contents of path, raises IOError if the file
+		# can not be read.
+		self.requests[path] = self.requests.get(path, 0) + 1
+		now = time.time()
+		snapshot = self.snapshots.get(path)
+		tick = self.ticks.get(path, self.Tick)
+		if snapshot is None or (tick is not None and not 0 <= now - snapshot[0] < tick):
+			with open(path, "r") as f:
+				text = f.read()
+			self.reads[path] = self.reads.get(path, 0) + 1
+			snapshot = self.snapshots[path] = (now, text, {})
+		if parser is None:
+			return snapshot[1]
+		parsed = snapshot[2]
+		if parser not in parsed:
+			parsed[parser] = parser(snapshot[1])
+		return parsed[parser]
+
+	def invalidate(self, path=None):
+		if path is None:
+			self.snapshots.clear()
+		else:
+			self.snapshots.pop(path, None)
+
+	def getStats(self):
+		# Returns (path, requests, reads) for every file read, most read first.
+		return sorted([(path, self.requests.get(path, 0), reads) for (path, reads) in self.reads.items()], key=lambda x: -x[2])
+
+	def getMounts(self):
+		return self.read("/proc/mounts", parseMounts)
+
+	def getCmdline(self):
+		return self.read("/proc/cmdline")
+
+	def getCpuTimes(self):
+		return self.read("/proc/stat", parseCpuTimes)
+
+	def getNetDev(self):
+		return self.read("/proc/net/dev", parseNetDev)
+
+	def getMemInfo(self):
+		return self.read("/proc/meminfo", parseMemInfo)
+
+	def getLoadAvg(self):
+		return self.read("/proc/loadavg", parseValue)
+
+	def readValue(self, path):
+		return self.read(path, parseValue)
+
+systemState = SystemState()
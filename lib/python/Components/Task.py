@@ -3,11 +3,20 @@
 from __future__ import print_function
 # A Job consists of many "Tasks".
 # A task is the run of an external tool, with proper methods for failure handling
+from time import time
 from Tools.CList import CList
 
+# Resource classes a job can declare (Job.resource). Jobs without a resource
+# class are exclusive: they never run in parallel with any other job.
+RESOURCE_DISK = "disk"
+RESOURCE_CPU = "cpu"
+RESOURCE_NETWORK = "network"
+
 class Job(object):
 	NOT_STARTED, IN_PROGRESS, FINISHED, FAILED = range(4)
-	def __init__(self, name):
+	# higher priorities are started first
+	PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH = -10, 0, 10
+	def __init__(self, name, resource=None, priority=PRIORITY_NORMAL):
 		self.tasks = [ ]
 		self.resident_tasks = [ ]
 		self.workspace = "/tmp"
@@ -22,6 +31,11 @@ class Job(object):
 		self.state_changed = CList()
 		self.status = self.NOT_STARTED
 		self.onSuccess = None
+		self.resource = resource
+		self.priority = priority
+		self.queue_time = None
+		self.start_time = None
+		self.end_time = None
 
 	# description is a dict
 	def fromDescription(self, description):
@@ -272,28 +286,83 @@ class LoggingTask(Task):
 		self.log.append(data))
 
 
+class TaskCancelled(Exception):
+	pass
+
+class CancellationToken(object):
+	# Handed to the work of a PythonTask. Long running work should check
+	# it regularly and stop (e.g. by calling check()) once it is cancelled.
+	def __init__(self):
+		self.cancelled = False
+
+	def cancel(self):
+		self.cancelled = True
+
+	def check(self):
+		if self.cancelled:
+			raise TaskCancelled("Aborted")
+
+	def __bool__(self):
+		return self.cancelled
+
+	__nonzero__ = __bool__
+
 class PythonTask(Task):
+	# Runs work() in a thread. work() reports progress by assigning self.pos,
+	# the progress is pushed to the main loop at most once per
+	# progressInterval seconds instead of being polled.
+	progressInterval = 0.5
+
 	def _run(self):
 		from twisted.internet import threads
-		from enigma import eTimer
 		self.aborted = False
+		self.cancellation = CancellationToken()
+		self.progressPending = False
+		self.lastProgress = 0
 		self.pos = 0
 		threads.deferToThread(self.work).addBoth(self.onComplete)
-		self.timer = eTimer()
-		self.timer.callback.append(self.onTimer)
-		self.timer.start(5)
 	def work(self):
 		raise NotImplemented("work")
 	def abort(self):
 		self.aborted = True
+		if hasattr(self, "cancellation"):
+			self.cancellation.cancel()
 		if self.callback is None:
 			self.finish(aborted = True)
-	def onTimer(self):
+	def checkCancelled(self):
+		# for use in work(): raises TaskCancelled when the task got aborted
+		self.cancellation.check()
+	def getPos(self):
+		return self.__dict__.get("_pos", 0)
+	def setPos(self, pos):
+		# may be called from the worker thread
+		self._pos = pos
+		if not self.__dict__.get("progressPending", True):
+			self.progressPending = True
+			from twisted.internet import reactor
+			reactor.callFromThread(self.scheduleProgress)
+	pos = property(getPos, setPos)
+	def scheduleProgress(self):
+		delay = self.lastProgress + self.progressInterval - time()
+		if delay > 0:
+			from twisted.internet import reactor
+			reactor.callLater(delay, self.pushProgress)
+		else:
+			self.pushProgress()
+	def pushProgress(self):
+		if self.lastProgress is None:
+			return  # completed meanwhile
+		self.progressPending = False
+		self.lastProgress = time()
 		self.setProgress(self.pos)
 	def onComplete(self, result):
+		self.progressPending = True  # no more progress updates
+		self.lastProgress = None
+		self.setProgress(self.pos)
+		if hasattr(result, "check") and result.check(TaskCancelled):
+			self.finish(aborted = True)
+			return
 		self.postconditions.append(FailedPostcondition(result))
-		self.timer.stop()
-		del self.timer
 		self.finish()
 
 class ConditionTask(Task):
@@ -334,17 +403,35 @@ class ConditionTask(Task):
 		if res:
 			self.finish()
 
-# The jobmanager will execute multiple jobs, each after another.
+# The jobmanager will execute multiple jobs, by default each after another.
+# Jobs are started in order of their priority. When max_jobs is raised, jobs
+# of different resource classes (see Job.resource) run in parallel, up to
+# resource_limits[resource] jobs per class; jobs without a resource class
+# always run alone. A job only overtakes waiting jobs of the same priority and
+# never overtakes a waiting job without a resource class.
 # later, it will also support suspending jobs (and continuing them after reboot etc)
 # It also supports a notification when some error occurred, and possibly a retry.
-class JobManager:
+class JobManager(object):
 	def __init__(self):
 		self.active_jobs = [ ]
+		self.running_jobs = [ ]
 		self.failed_jobs = [ ]
 		self.job_classes = [ ]
 		self.in_background = False
 		self.visible = False
-		self.active_job = None
+		self.max_jobs = 1
+		self.resource_limits = { RESOURCE_DISK: 1, RESOURCE_CPU: 1, RESOURCE_NETWORK: 2 }
+
+	def getActiveJob(self):
+		return self.running_jobs and self.running_jobs[0] or None
+
+	active_job = property(getActiveJob)
+
+	def setConcurrency(self, max_jobs, resource_limits=None):
+		self.max_jobs = max_jobs
+		if resource_limits:
+			self.resource_limits.update(resource_limits)
+		self.kick()
 
 	# Set onSuccess to popupTaskView to get a visible notification.
 	# onFail defaults to notifyFailed which tells the user that it went south.
@@ -354,20 +441,46 @@ class JobManager:
 			job.onFail = self.notifyFailed
 		else:
 			job.onFail = onFail
-		self.active_jobs.append(job)
+		job.queue_time = time()
+		# keep the queue ordered by priority, first come first served within a priority
+		pos = len(self.active_jobs)
+		while pos and self.active_jobs[pos - 1].priority < job.priority:
+			pos -= 1
+		self.active_jobs.insert(pos, job)
 		self.kick()
 
+	def canStart(self, job):
+		if not self.running_jobs:
+			return True
+		if len(self.running_jobs) >= self.max_jobs or job.resource is None:
+			return False
+		running = [x.resource for x in self.running_jobs]
+		return None not in running and running.count(job.resource) < self.resource_limits.get(job.resource, 1)
+
 	def kick(self):
-		if self.active_job is None:
-			if self.active_jobs:
-				self.active_job = self.active_jobs.pop(0)
-				self.active_job.start(self.jobDone)
+		blocked = None
+		for job in self.active_jobs[:]:
+			if len(self.running_jobs) >= self.max_jobs:
+				break
+			if blocked is not None and job.priority < blocked:
+				# never overtake a waiting job of higher priority
+				break
+			if self.canStart(job):
+				self.active_jobs.remove(job)
+				self.running_jobs.append(job)
+				job.start_time = time()
+				job.start(self.jobDone)
+			elif job.resource is None:
+				# keep the capacity for the exclusive job, it starts when the running jobs are done
+				break
+			else:
+				blocked = job.priority
 
 	def notifyFailed(self, job, task, problems):
 		from Tools import Notifications
 		from Screens.MessageBox import MessageBox
 		if problems[0].RECOVERABLE:
-			Notifications.AddNotificationWithCallback(self.errorCB, MessageBox, _("Error: %s\nRetry?") % (problems[0].getErrorMessage(task)))
+			Notifications.AddNotificationWithCallback(lambda answer: self.errorCB(answer, job), MessageBox, _("Error: %s\nRetry?") % (problems[0].getErrorMessage(task)))
 			return True
 		else:
 			Notifications.AddNotification(MessageBox, job.name + "\n" + _("Error") + (': %s') % (problems[0].getErrorMessage(task)), type = MessageBox.TYPE_ERROR )
@@ -377,13 +490,18 @@ class JobManager:
 		print("[Task] job", job, "completed with", problems, "in", task)
 		if problems:
 			if not job.onFail(job, task, problems):
-				self.errorCB(False)
+				self.errorCB(False, job)
 		else:
-			self.active_job = None
+			self.removeRunningJob(job)
 			if job.onSuccess:
 				job.onSuccess(job)
 			self.kick()
 
+	def removeRunningJob(self, job):
+		job.end_time = time()
+		if job in self.running_jobs:
+			self.running_jobs.remove(job)
+
 	# Set job.onSuccess to this function if you want to pop up the jobview when the job is done/
 	def popupTaskView(self, job):
 		if not self.visible:
@@ -392,22 +510,30 @@ class JobManager:
 			self.visible = True
 			Notifications.AddNotification(JobView, job)
 
-	def errorCB(self, answer):
+	def errorCB(self, answer, job=None):
+		job = job or self.active_job
 		if answer:
 			print("[Task] retrying job")
-			self.active_job.retry()
+			job.retry()
 		else:
 			print("[Task] not retrying job.")
-			self.failed_jobs.append(self.active_job)
-			self.active_job = None
+			self.failed_jobs.append(job)
+			self.removeRunningJob(job)
 			self.kick()
 
 	def getPendingJobs(self):
-		list = [ ]
-		if self.active_job:
-			list.append(self.active_job)
-		list += self.active_jobs
-		return list
+		# running jobs first, then the queued ones in the order they will be started
+		return self.running_jobs + self.active_jobs
+
+	def getPendingJobsInfo(self):
+		# (job, running, resource, priority, seconds queued, seconds running) for all pending jobs
+		now = time()
+		info = []
+		for job in self.getPendingJobs():
+			running = job in self.running_jobs
+			queued = ((job.start_time if running else now) - job.queue_time) if job.queue_time else 0
+			info.append((job, running, job.resource, job.priority, queued, running and now - job.start_time or 0))
+		return info
 
 # some examples:
 #class PartitionExistsPostcondition:
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 from __future__ import print_function
+from bisect import bisect_left, bisect_right
 import NavigationInstance
 from time import localtime, mktime, gmtime, time
 from enigma import iServiceInformation, eServiceCenter, eServiceReference, getBestPlayableServiceReference
@@ -9,11 +10,144 @@ import RecordTimer
 from Tools.CIHelper import cihelper
 from Components.config import config
 
+# Sweep-line index of timers: the non repeating timers sorted by begin time
+# (together with the longest duration seen, which bounds a window search)
+# and the repeating timers. It is kept up to date incrementally by the
+# owner of the timer list, so a conflict check only needs to look at the
+# timers which run at the same time as the checked one.
+class TimerOverlapIndex:
+	def __init__(self, timers=()):
+		self.begins = []
+		self.timers = []
+		self.repeated = []
+		self.longest = 0
+		self.keys = {}  # id(timer) -> indexed begin, None for repeating timers
+		for timer in timers:
+			self.add(timer)
+
+	def __len__(self):
+		return len(self.keys)
+
+	def __contains__(self, timer):
+		return id(timer) in self.keys
+
+	def add(self, timer):
+		if id(timer) in self.keys:
+			self.remove(timer)
+		if timer.repeated:
+			self.repeated.append(timer)
+			self.keys[id(timer)] = None
+		else:
+			pos = bisect_right(self.begins, timer.begin)
+			self.begins.insert(pos, timer.begin)
+			self.timers.insert(pos, timer)
+			self.longest = max(self.longest, timer.end - timer.begin)
+			self.keys[id(timer)] = timer.begin
+
+	def remove(self, timer):
+		if id(timer) not in self.keys:
+			return
+		begin = self.keys.pop(id(timer))
+		if begin is None:
+			self.repeated.remove(timer)
+		else:
+			pos = bisect_left(self.begins, begin)
+			while self.timers[pos] is not timer:
+				pos += 1
+			del self.begins[pos]
+			del self.timers[pos]
+			if timer.end - begin >= self.longest:
+				# it may have been the longest one, so the window can shrink
+				self.longest = max([x.end - x.begin for x in self.timers] or [0])
+
+	def getOverlapping(self, begin, end, margin=0):
+		# non repeating timers running (at least partly) between begin and end
+		first = bisect_left(self.begins, begin - margin - self.longest)
+		last = bisect_right(self.begins, end + margin)
+		return [timer for timer in self.timers[first:last] if timer.end >= begin - margin]
+
+def getRepeatedBegins(timer, localtimediff):
+	# the begin times of a repeating timer in the first week of the epoch,
+	# which begins on Thursday
+	begins = []
+	rflags = timer.repeated
+	rflags = ((rflags & 0x7F)>> 3)|((rflags & 0x07)<<4)
+	begin = timer.begin % 86400 # map all to first day
+	if (localtimediff > 0) and ((begin + localtimediff) > 86400):
+		rflags = ((rflags >> 1)& 0x3F)|((rflags << 6)& 0x40)
+	elif (localtimediff < 0) and (begin < localtimediff):
+		rflags = ((rflags << 1)& 0x7E)|((rflags >> 6)& 0x01)
+	while rflags: # then arrange on the week
+		if rflags & 1:
+			begins.append(begin)
+		begin += 86400
+		rflags >>= 1
+	return begins
+
+def getOccurrenceBegin(timer, begin):
+	# summertime correction of an occurrence of a repeating timer
+	return begin + 3600 * (localtime(timer.begin).tm_hour - localtime(begin).tm_hour)
+
+def getOverlapCluster(indexes, begin, end, localtimediff):
+	# all timers of the given indexes which are transitively running at the
+	# same time as begin..end, i.e. everything that influences the tuner
+	# allocation while begin..end is recorded, or that checkTimerlist() may
+	# report together with it. A repeating timer that runs at the same time
+	# as one of them links all its occurrences, as far as checkTimerlist()
+	# places them: in the weeks of the non repeating timers of the cluster.
+	# Repeating timers are always included.
+	cluster = {}
+	repeated = []
+	for index in indexes:
+		for timer in index.repeated:
+			cluster[id(timer)] = timer
+			repeated.append((timer, getRepeatedBegins(timer, localtimediff)))
+	intervals = set([(begin, end)])
+	pending = [(begin, end)]
+	linked = set()  # id() of the repeating timers linked to the cluster
+	first = begin
+	last = end
+	while pending:
+		while pending:
+			(begin, end) = pending.pop()
+			for index in indexes:
+				for timer in index.getOverlapping(begin, end):
+					if id(timer) not in cluster:
+						cluster[id(timer)] = timer
+						first = min(first, timer.begin)
+						last = max(last, timer.end)
+						if (timer.begin, timer.end) not in intervals:
+							intervals.add((timer.begin, timer.end))
+							pending.append((timer.begin, timer.end))
+		for (timer, begins) in repeated:
+			duration = timer.end - timer.begin
+			occurrences = []
+			for week in range(int(first // 604800), int((last + 604799) // 604800)):
+				for day in begins:
+					occurrence = getOccurrenceBegin(timer, day + week * 604800)
+					if occurrence >= timer.begin:
+						occurrences.append((occurrence, occurrence + duration))
+			if id(timer) not in linked:
+				for (begin, end) in occurrences:
+					if [x for x in intervals if x[0] <= end and x[1] >= begin]:
+						linked.add(id(timer))
+						break
+			if id(timer) in linked:
+				for interval in occurrences:
+					if interval not in intervals:
+						intervals.add(interval)
+						pending.append(interval)
+	return cluster
+
 class TimerSanityCheck:
-	def __init__(self, timerlist, newtimer=None):
+	def __init__(self, timerlist, newtimer=None, timerindex=None):
 		self.localtimediff = 25*3600 - mktime(gmtime(25*3600))
 		self.timerlist = timerlist
 		self.newtimer = newtimer
+		# optional TimerOverlapIndex (or list of them) covering timerlist
+		if timerindex is not None and not isinstance(timerindex, (list, tuple)):
+			timerindex = [timerindex]
+		self.timerindex = timerindex
 		self.simultimer = []
 		self.rep_eventlist = []
 		self.nrep_eventlist = []
@@ -34,6 +168,44 @@ class TimerSanityCheck:
 	def getSimulTimerList(self):
 		return self.simultimer
 
+	def checkBatch(self, newtimers):
+		# Check many new timers (e.g. a bulk import) against the timer list and
+		# against each other. Each timer is checked with the timers accepted
+		# before it, without adding anything to the real timer list.
+		# Returns a list of (timer, simultimer list) for the conflicting timers.
+		conflicts = []
+		timerlist = self.timerlist
+		timerindex = self.timerindex
+		accepted = TimerOverlapIndex()
+		self.timerlist = list(timerlist)
+		if timerindex is not None:
+			self.timerindex = timerindex + [accepted]
+		try:
+			for timer in newtimers:
+				self.newtimer = timer
+				if self.check():
+					self.timerlist.append(timer)
+					accepted.add(timer)
+				else:
+					conflicts.append((timer, self.simultimer))
+		finally:
+			self.timerlist = timerlist
+			self.timerindex = timerindex
+		return conflicts
+
+	def getCheckTimerlist(self):
+		# with an index only the timers running at the same time as the new
+		# timer have to be simulated, instead of the complete timer list. The
+		# index covers the timer list, timers only in the index (the processed
+		# timers of RecordTimer) have ended and are skipped by checkTimerlist().
+		# Unlike with the complete list, a conflict between timers which are
+		# not linked to the new timer (see getOverlapCluster()) does not fail
+		# the check of the new timer.
+		if not self.timerindex or self.newtimer.repeated:
+			return self.timerlist
+		cluster = getOverlapCluster(self.timerindex, self.newtimer.begin, self.newtimer.end, self.localtimediff)
+		return sorted(cluster.values(), key=lambda timer: timer.begin)
+
 	def doubleCheck(self):
 		if self.newtimer and self.newtimer.service_ref and self.newtimer.service_ref.ref.valid():
 			self.simultimer = [self.newtimer]
@@ -84,19 +256,10 @@ class TimerSanityCheck:
 		if curtime.tm_year > 1970 and self.newtimer.end < time():
 			print("[TimerSanityCheck] timer is finished!")
 			return True
-		rflags = self.newtimer.repeated
-		rflags = ((rflags & 0x7F)>> 3)|((rflags & 0x07)<<4)
-		if rflags:
-			begin = self.newtimer.begin % 86400 # map to first day
-			if (self.localtimediff > 0) and ((begin + self.localtimediff) > 86400):
-				rflags = ((rflags >> 1)& 0x3F)|((rflags << 6)& 0x40)
-			elif (self.localtimediff < 0) and (begin < self.localtimediff):
-				rflags = ((rflags << 1)& 0x7E)|((rflags >> 6)& 0x01)
-			while rflags: # then arrange on the week
-				if rflags & 1:
-					self.rep_eventlist.append((begin, -1))
-				begin += 86400
-				rflags >>= 1
+		begins = getRepeatedBegins(self.newtimer, self.localtimediff)
+		if begins:
+			for begin in begins:
+				self.rep_eventlist.append((begin, -1))
 		else:
 			self.nrep_eventlist.extend([(self.newtimer.begin, self.bflag, -1), (self.newtimer.end, self.eflag, -1)])
 
@@ -104,23 +267,13 @@ class TimerSanityCheck:
 # now process existing timers
 		self.check_timerlist = []
 		idx = 0
-		for timer in self.timerlist:
+		for timer in self.getCheckTimerlist():
 			if timer != self.newtimer:
 				if timer.disabled or not timer.conflict_detection or not timer.service_ref or '%3a//' in timer.service_ref.ref.toString() or timer.state == TimerEntry.StateEnded:
 					continue
 				if timer.repeated:
-					rflags = timer.repeated
-					rflags = ((rflags & 0x7F)>> 3)|((rflags & 0x07)<<4)
-					begin = timer.begin % 86400 # map all to first day
-					if (self.localtimediff > 0) and ((begin + self.localtimediff) > 86400):
-						rflags = ((rflags >> 1)& 0x3F)|((rflags << 6)& 0x40)
-					elif (self.localtimediff < 0) and (begin < self.localtimediff):
-						rflags = ((rflags << 1)& 0x7E)|((rflags >> 6)& 0x01)
-					while rflags:
-						if rflags & 1:
-							self.rep_eventlist.append((begin, idx))
-						begin += 86400
-						rflags >>= 1
+					for begin in getRepeatedBegins(timer, self.localtimediff):
+						self.rep_eventlist.append((begin, idx))
 				else:
 					self.nrep_eventlist.extend([(timer.begin, self.bflag, idx), (timer.end, self.eflag, idx)])
 			self.check_timerlist.append(timer)
@@ -144,9 +297,7 @@ class TimerSanityCheck:
 						event_begin = self.check_timerlist[event[1]].begin
 						event_end = self.check_timerlist[event[1]].end
 					new_event_begin = event[0] + offset_0 + (cnt * 604800)
-					# summertime correction
-					new_lth = localtime(new_event_begin).tm_hour
-					new_event_begin += 3600 * (localtime(event_begin).tm_hour - new_lth)
+					new_event_begin += 3600 * (localtime(event_begin).tm_hour - localtime(new_event_begin).tm_hour) # summertime correction
 					new_event_end = new_event_begin + (event_end - event_begin)
 					if event[1] == -1:
 						if new_event_begin >= self.newtimer.begin: # is the soap already running?
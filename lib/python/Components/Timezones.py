@@ -6,6 +6,7 @@ from xml.etree.cElementTree import ParseError, parse
 
 from Components.config import ConfigSelection, ConfigSubsection, config
 from Tools.Geolocation import geolocation
+from Tools.RenderCache import clearAll as clearRenderCaches
 from Tools.StbHardware import setRTCoffset
 
 # The DEFAULT_AREA setting is usable by the image maintainers to select the
@@ -291,6 +292,7 @@ class Timezones:
 		except Exception:
 			from enigma import e_tzset
 			e_tzset()
+		clearRenderCaches()  # Formatted times are local times.
 		if path.exists("/proc/stb/fp/rtc_offset"):
 			setRTCoffset()
 		now = int(time())
@@ -189,6 +189,11 @@ def InitUsageConfig():
 		("ask no", _("Ask user (with default as 'no')")),
 		("resume", _("Resume from last position")),
 		("beginning", _("Start from the beginning"))])
+	config.usage.resume_points_max = ConfigSelectionNumber(min = 500, max = 10000, stepwidth = 500, default = 2000)
+	def resumePointsMaxChanged(configElement):
+		from Tools.ResumePoints import resumePointCache
+		resumePointCache.setCapacity(configElement.value)
+	config.usage.resume_points_max.addNotifier(resumePointsMaxChanged)
 	config.usage.on_movie_stop = ConfigSelection(default = "movielist", choices = [
 		("ask", _("Ask user")), ("movielist", _("Return to movie list")), ("quit", _("Return to previous service")) ])
 	config.usage.on_movie_eof = ConfigSelection(default = "movielist", choices = [
@@ -204,6 +209,12 @@ def InitUsageConfig():
 		("intermediate", _("Advanced")),
 		("expert", _("Expert")) ])
 
+	config.usage.background_jobs = ConfigSelectionNumber(min = 1, max = 4, stepwidth = 1, default = 1)
+	def backgroundJobsChanged(configElement):
+		from Components.Task import job_manager
+		job_manager.setConcurrency(configElement.value)
+	config.usage.background_jobs.addNotifier(backgroundJobsChanged)
+
 	config.usage.startup_to_standby = ConfigSelection(default = "no", choices = [
 		("no", _("no")),
 		("yes", _("yes")),
@@ -1,9 +1,9 @@
 from copy import copy as shallowcopy
 from enigma import getPrevAsciiCode
 from os import fsync, rename
-from os.path import realpath
+from os.path import isfile, realpath
 from six import PY2
-from time import localtime, strftime
+from time import localtime, strftime, time
 
 from Components.SystemInfo import SystemInfo
 from Tools.Directories import SCOPE_CONFIG, fileExists, resolveFilename
@@ -96,7 +96,95 @@ def NoSave(element):
 #   save()       Stores _value into saved_value, (or stores "None" if it should
 #                not be stored).
 #
+# Every change of a saved_value in the config tree increments
+# configGeneration, which lets Config.saveToFile() skip unchanged saves.
+#
+configGeneration = 0
+
+def configChanged():
+	global configGeneration
+	configGeneration += 1
+
+# Notifiers are called through callNotifier(), which keeps the number of calls
+# and the time spent per notifier, see getNotifierStats().  Calls taking
+# longer than SLOW_NOTIFIER seconds are logged.
+#
+SLOW_NOTIFIER = 0.2
+notifierStats = {}  # Notifier name -> [calls, total time, longest time].
+
+def notifierName(notifier):
+	owner = getattr(notifier, "__self__", None)
+	if owner is not None:
+		return "%s.%s" % (owner.__class__.__name__, notifier.__name__)
+	return "%s.%s" % (getattr(notifier, "__module__", None), getattr(notifier, "__name__", notifier.__class__.__name__))
+
+def callNotifier(notifier, element, extra_args=None):
+	start = time()
+	try:
+		if extra_args is not None:
+			notifier(element, extra_args)
+		else:
+			notifier(element)
+	finally:
+		elapsed = time() - start
+		name = notifierName(notifier)
+		stats = notifierStats.get(name)
+		if stats is None:
+			stats = notifierStats[name] = [0, 0.0, 0.0]
+		stats[0] += 1
+		stats[1] += elapsed
+		if elapsed > stats[2]:
+			stats[2] = elapsed
+		if elapsed > SLOW_NOTIFIER:
+			print("[config] Warning: Notifier '%s' took %.3fs!" % (name, elapsed))
+
+def getNotifierStats():
+	"""Returns (name, calls, total time, longest time) for all notifiers called so far, the most expensive first."""
+	return sorted([(name, stats[0], stats[1], stats[2]) for (name, stats) in notifierStats.items()], key=lambda x: -x[2])
+
+# Batch of config changes, see Config.batch().  While a batch is active the
+# notifiers of changed elements are not called, when the (outermost) batch
+# ends each element's notifiers are called once, with the final value.
+#
+class NotifierBatch(object):
+	def __init__(self):
+		self.depth = 0
+		self.pending = []
+		self.queued = set()
+
+	def __enter__(self):
+		self.depth += 1
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.depth -= 1
+		if self.depth == 0:
+			self.flush()
+		return False
+
+	def defer(self, element, final):
+		key = (id(element), final)
+		if key not in self.queued:
+			self.queued.add(key)
+			self.pending.append((element, final))
+
+	def flush(self):
+		while self.pending:
+			pending = self.pending
+			self.pending = []
+			self.queued.clear()
+			for (element, final) in pending:
+				if final:
+					element.changedFinal()
+				else:
+					element.changed()
+
+notifierBatch = NotifierBatch()
+
+
 class ConfigElement(object):
+	_saved_value = None
+
 	def __init__(self):
 		self.extra_args = []
 		self.saved_value = None
@@ -126,6 +214,16 @@ class ConfigElement(object):
 		if self.callNotifiersOnSaveAndCancel:
 			self.changedFinal()  # Call none immediate_feedback notifiers, immediate_feedback Notifiers are called as they are chanaged, so do not need to be called here.
 
+	def getSavedValue(self):
+		return self._saved_value
+
+	def setSavedValue(self, value):
+		if value != self._saved_value:
+			self._saved_value = value
+			configChanged()
+
+	saved_value = property(getSavedValue, setSavedValue)
+
 	def disableSave(self):
 		self.save_disabled = True
 
@@ -161,21 +259,19 @@ class ConfigElement(object):
 
 	def changed(self):
 		if self.__notifiers:
+			if notifierBatch.depth:
+				notifierBatch.defer(self, False)
+				return
 			for x in self.notifiers:
-				extra_args = self.__getExtraArgs(x)
-				if extra_args is not None:
-					x(self, extra_args)
-				else:
-					x(self)
+				callNotifier(x, self, self.__getExtraArgs(x))
 
 	def changedFinal(self):
 		if self.__notifiers_final:
+			if notifierBatch.depth:
+				notifierBatch.defer(self, True)
+				return
 			for x in self.notifiers_final:
-				extra_args = self.__getExtraArgs(x)
-				if extra_args is not None:
-					x(self, extra_args)
-				else:
-					x(self)
+				callNotifier(x, self, self.__getExtraArgs(x))
 
 	def onSelect(self, session):
 		pass
@@ -2009,8 +2105,9 @@ class ConfigSubList(list, object):
 		self.stored_values = {}
 
 	def load(self):
-		for x in self:
-			x.load()
+		with notifierBatch:
+			for x in self:
+				x.load()
 
 	def save(self):
 		for x in self:
@@ -2026,6 +2123,7 @@ class ConfigSubList(list, object):
 
 	def setSavedValue(self, values):
 		self.stored_values = dict(values)
+		configChanged()
 		for (key, val) in self.stored_values.items():
 			if int(key) < len(self):
 				self[int(key)].saved_value = val
@@ -2058,8 +2156,9 @@ class ConfigSubDict(dict, object):
 			item.load()
 
 	def load(self):
-		for x in self.values():
-			x.load()
+		with notifierBatch:
+			for x in self.values():
+				x.load()
 
 	def save(self):
 		for x in self.values():
@@ -2075,6 +2174,7 @@ class ConfigSubDict(dict, object):
 
 	def setSavedValue(self, values):
 		self.stored_values = dict(values)
+		configChanged()
 		for (key, val) in self.items():
 			if str(key) in self.stored_values:
 				val.saved_value = self.stored_values[str(key)]
@@ -2119,8 +2219,9 @@ class ConfigSubsection(object):
 			value.load()
 
 	def load(self):
-		for x in self.content.items.values():
-			x.load()
+		with notifierBatch:
+			for x in self.content.items.values():
+				x.load()
 
 	def save(self):
 		for x in self.content.items.values():
@@ -2139,6 +2240,7 @@ class ConfigSubsection(object):
 	def setSavedValue(self, values):
 		values = dict(values)
 		self.content.stored_values = values
+		configChanged()
 		for (key, val) in self.content.items.items():
 			value = values.get(key, None)
 			if value is not None:
@@ -2160,6 +2262,9 @@ class ConfigSubsection(object):
 class Config(ConfigSubsection):
 	def __init__(self):
 		ConfigSubsection.__init__(self)
+		self.__dict__["savedFile"] = None  # The file as last loaded or saved, see saveToFile().
+		self.__dict__["savedText"] = None
+		self.__dict__["savedGeneration"] = None
 
 	def pickle_this(self, prefix, topickle, result):
 		for (key, val) in sorted(topickle.items(), key=lambda x: str(x[0]) if x[0].isdigit() else x[0].lower()):
@@ -2176,37 +2281,72 @@ class Config(ConfigSubsection):
 		self.pickle_this("config", self.saved_value, result)
 		return "".join(result)
 
+	def batch(self):
+		"""Returns the context for a batch of config changes, use "with config.batch():".  The notifiers of the changed elements are called once at the end of the batch."""
+		return notifierBatch
+
 	def unpickle(self, lines, base_file=True):
+		with notifierBatch:
+			self.unpickleLines(lines, base_file)
+
+	def unpickleLines(self, lines, base_file):
 		tree = {}
 		configbase = tree.setdefault("config", {})
+		bases = {}  # Flat index of the dictionaries in tree by dotted prefix.
 		for l in lines:
 			if not l or l[0] == "#":
 				continue
-			result = l.split("=", 1)
-			if len(result) != 2:
+			(name, sep, val) = l.partition("=")
+			if not sep:
 				continue
-			(name, val) = result
 			val = val.strip()
-			names = name.split(".")
-			base = configbase
-			for n in names[1:-1]:
-				base = base.setdefault(n, {})
-			base[names[-1]] = val
+			(prefix, dot, key) = name.rpartition(".")
+			base = bases.get(prefix)
+			if base is None:
+				base = configbase
+				for n in prefix.split(".")[1:]:
+					base = base.setdefault(n, {})
+				bases[prefix] = base
+			base[key] = val
 			if not base_file:  # Not the initial config file.
-				try:  # Update config.x.y.value when exist.
-					configEntry = eval(name)
-					if configEntry is not None:
-						configEntry.value = val
-				except (SyntaxError, KeyError):
-					pass
+				configEntry = self.getElement(name)  # Update config.x.y.value when exist.
+				if configEntry is not None:
+					configEntry.value = val
 
 		# We inherit from ConfigSubsection, so ...
 		# object.__setattr__(self, "saved_value", tree["config"])
 		if "config" in tree:
 			self.setSavedValue(tree["config"])
 
+	def getElement(self, name):
+		"""Returns the config element for a name like "config.x.y" (or "config.x.0.y" for a ConfigSubList), None when it does not exist."""
+		names = name.split(".")
+		if names[0] != "config":
+			return None
+		item = self
+		for n in names[1:]:
+			if isinstance(item, ConfigSubsection):
+				item = item.content.items.get(n)
+			elif isinstance(item, ConfigSubList):
+				item = item[int(n)] if n.isdigit() and int(n) < len(item) else None
+			elif isinstance(item, ConfigSubDict):
+				item = item.get(n, item.get(int(n)) if n.isdigit() else None)
+			else:
+				return None
+			if item is None:
+				return None
+		return item if isinstance(item, ConfigElement) else None
+
 	def saveToFile(self, filename):
+		# Many screens save on every OK, so skip the save when no saved_value has
+		# changed since the file was loaded or saved, or when the result is the
+		# same text anyway.
+		if self.savedGeneration == configGeneration and self.savedFile == filename and isfile(filename):
+			return
 		text = self.pickle()
+		if text == self.savedText and self.savedFile == filename and isfile(filename):
+			self.__dict__["savedGeneration"] = configGeneration
+			return
 		try:
 			import os
 			f = open(filename + ".writing", "w")
@@ -2217,9 +2357,19 @@ class Config(ConfigSubsection):
 			rename(filename + ".writing", filename)
 		except (IOError, OSError) as err:
 			print("[config] Error %d: Couldn't write '%s'!  (%s)" % (err.errno, filename, err.strerror))
+		else:
+			self.__dict__["savedFile"] = filename
+			self.__dict__["savedText"] = text
+			self.__dict__["savedGeneration"] = configGeneration
 
 	def loadFromFile(self, filename, base_file=True):
-		self.unpickle(open(filename, "r"), base_file)
+		with open(filename, "r") as f:
+			text = f.read()
+		self.unpickle(text.split("\n"), base_file)
+		if base_file:
+			self.__dict__["savedFile"] = filename
+			self.__dict__["savedText"] = text
+			self.__dict__["savedGeneration"] = configGeneration
 
 
 class ConfigFile:
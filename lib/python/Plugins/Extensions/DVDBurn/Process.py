@@ -1,7 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 from __future__ import print_function
-from Components.Task import Task, Job, DiskspacePrecondition, Condition, ToolExistsPrecondition
+from Components.Task import Task, Job, DiskspacePrecondition, Condition, ToolExistsPrecondition, RESOURCE_DISK
 from Components.Harddisk import harddiskmanager
 from Screens.MessageBox import MessageBox
 import os
@@ -863,7 +863,7 @@ def getISOfilename(isopath, volName):
 
 class DVDJob(Job):
 	def __init__(self, project, menupreview=False):
-		Job.__init__(self, "DVDBurn Job")
+		Job.__init__(self, "DVDBurn Job", resource=RESOURCE_DISK)
 		self.project = project
 		from time import strftime
 		from Tools.Directories import SCOPE_HDD, resolveFilename, createDir
@@ -925,7 +925,7 @@ class DVDJob(Job):
 
 class DVDdataJob(Job):
 	def __init__(self, project):
-		Job.__init__(self, "Data DVD Burn")
+		Job.__init__(self, "Data DVD Burn", resource=RESOURCE_DISK)
 		self.project = project
 		from time import strftime
 		from Tools.Directories import SCOPE_HDD, resolveFilename, createDir
@@ -971,7 +971,7 @@ class DVDdataJob(Job):
 
 class DVDisoJob(Job):
 	def __init__(self, project, imagepath):
-		Job.__init__(self, _("Burn DVD"))
+		Job.__init__(self, _("Burn DVD"), resource=RESOURCE_DISK)
 		self.project = project
 		self.menupreview = False
 		from Tools.Directories import getSize
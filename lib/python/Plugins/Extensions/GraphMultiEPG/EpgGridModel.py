@@ -0,0 +1,97 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import time
+from collections import OrderedDict
+
+# Events of the EPG grid, looked up per (service, time slice) block.
+#
+# The grid used to look up the events of every service of the bouquet for
+# every page. EPGGridModel only looks up the blocks that are not known yet, all
+# of them in a single lookupEvent() call, and keeps the MaxBlocks most recently
+# used blocks, so paging back and forth and up and down is served from memory.
+# Blocks older than MaxAge seconds are looked up again to pick up new EPG data.
+#
+# The lookup time of every page is logged and summed up in stats.
+
+class EPGGridModel:
+	MaxBlocks = 2000
+	MaxAge = 300
+
+	def __init__(self, epgcache):
+		self.epgcache = epgcache
+		self.blocks = OrderedDict()  # (service, start, duration) -> (time, (service, name, events or None))
+		self.stats = [0, 0, 0, 0.0, 0.0]  # pages, cached blocks, looked up blocks, total time, longest time
+
+	def lookup(self, services, start, duration, keep):
+		# Looks up the blocks of services that are not known yet and marks the
+		# blocks of services as the most recently used ones. Returns (blocks of
+		# services, number of blocks looked up, time it took). With keep, the
+		# blocks of services are kept even when there are more than MaxBlocks.
+		now = time.time()
+		blocks = {}
+		missing = []
+		for service in services:
+			key = (service, start, duration)
+			block = self.blocks.pop(key, None)
+			if block is None or not 0 <= now - block[0] < self.MaxAge:
+				if service not in blocks:
+					missing.append(service)
+					blocks[service] = None
+			else:
+				self.blocks[key] = block
+				blocks[service] = block[1]
+		if missing:
+			data = []
+			if self.epgcache is not None:
+				# return record, service ref, service name, event id, event title, begin time, duration
+				data = self.epgcache.lookupEvent(['XRnITBD'] + [(service, 0, start, duration) for service in missing])
+			results = []
+			events = None
+			for x in data:
+				if events is None or results[-1][0] != x[0]:
+					events = []
+					results.append((x[0], x[1], events))
+				events.append((x[2], x[3], x[4], x[5]))  # (event_id, event_title, begin_time, duration)
+			# The results are in the order of the query, one or more rows per service.
+			for (idx, service) in enumerate(missing):
+				if idx < len(results):
+					(ref, name, events) = results[idx]
+					result = (ref, name, events[0][0] is not None and events or None)
+				else:
+					result = (service, "", None)
+				self.blocks[(service, start, duration)] = (now, result)
+				blocks[service] = result
+		result = [blocks[service] for service in services]
+		keys = keep and set([(service, start, duration) for service in services]) or ()
+		while len(self.blocks) > self.MaxBlocks:
+			if next(iter(self.blocks)) in keys:
+				break  # Only blocks of services are left.
+			self.blocks.popitem(last=False)
+		return (result, len(missing), time.time() - now)
+
+	def getBlocks(self, services, start, duration):
+		# Returns (service, name, events) of services for the time slice, events
+		# are (event_id, event_title, begin_time, duration) or None.
+		(result, looked, elapsed) = self.lookup(services, start, duration, True)
+		stats = self.stats
+		stats[0] += 1
+		stats[1] += len(services) - looked
+		stats[2] += looked
+		stats[3] += elapsed
+		if elapsed > stats[4]:
+			stats[4] = elapsed
+		print("[GraphMultiEPG] page of %d services: %d cached, %d looked up in %.3fs" % (len(services), len(services) - looked, looked, elapsed))
+		return result
+
+	def prefetch(self, services, start, duration):
+		self.lookup(services, start, duration, False)
+
+	def clear(self):
+		self.blocks.clear()
+
+	def getStats(self):
+		# Returns (pages, cached blocks, looked up blocks, average and longest
+		# lookup time per page).
+		stats = self.stats
+		return (stats[0], stats[1], stats[2], stats[0] and stats[3] / stats[0] or 0.0, stats[4])
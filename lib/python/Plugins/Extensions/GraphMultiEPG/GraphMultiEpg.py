@@ -34,6 +34,9 @@ from Tools.FallbackTimer import FallbackTimerList
 from Tools.TextBoundary import getTextBoundarySize
 from enigma import eEPGCache, eListbox, gFont, eListboxPythonMultiContent, RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_HALIGN_CENTER, RT_VALIGN_CENTER, RT_WRAP, BT_SCALE, BT_KEEP_ASPECT_RATIO, BT_ALIGN_CENTER, eSize, eRect, eTimer, loadPNG, eServiceReference
 from Plugins.Extensions.GraphMultiEPG.GraphMultiEpgSetup import GraphMultiEpgSetup
+from Plugins.Extensions.GraphMultiEPG.EpgGridModel import EPGGridModel
+from Tools.RenderCache import RenderCache
+from Tools.PixmapCache import pixmapCache
 from time import localtime, time, strftime, mktime
 from Components.PluginComponent import plugins
 from Plugins.Plugin import PluginDescriptor
@@ -41,6 +44,7 @@ from Tools.BoundFunction import boundFunction
 import six
 
 MAX_TIMELINES = 6
+NOT_LOADED = False # events of a row that were not looked up for the time window yet
 
 config.misc.graph_mepg = ConfigSubsection()
 config.misc.graph_mepg.prev_time = ConfigClock(default = time())
@@ -97,6 +101,12 @@ class EPGList(GUIComponent):
 		self.setOverjump_Empty(overjump_empty)
 		self.epg_bouquet = epg_bouquet
 		self.epgcache = eEPGCache.getInstance()
+		self.model = EPGGridModel(self.epgcache)
+		self.entries = RenderCache()  # built rows, cleared when the services change
+		self.layout = None
+		self.prefetchQueue = [ ]
+		self.prefetchTimer = eTimer()
+		self.prefetchTimer.callback.append(self.prefetch)
 		self.clocks = [ LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, 'icons/epgclock_add.png')),
 				LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, 'icons/epgclock_pre.png')),
 				LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, 'icons/epgclock.png')),
@@ -262,7 +272,9 @@ class EPGList(GUIComponent):
 		self.setItemsPerPage()
 		return rc
 
-	def isSelectable(self, service, service_name, events, picon, serviceref):
+	def isSelectable(self, service, service_name, events, picon, serviceref, index):
+		if events is NOT_LOADED:
+			events = self.loadRows(index)[2]
 		return (events and len(events) and True) or False
 
 	def setShowServiceMode(self, value):
@@ -347,6 +359,8 @@ class EPGList(GUIComponent):
 	def findBestEvent(self):
 		old_service = self.cur_service  #(service, service_name, events, picon)
 		cur_service = self.cur_service = self.l.getCurrentSelection()
+		if cur_service and cur_service[2] is NOT_LOADED:
+			cur_service = self.cur_service = self.loadRows(cur_service[5])
 		time_base = self.getTimeBase()
 		now = time()
 		if old_service and self.cur_event is not None:
@@ -413,6 +427,7 @@ class EPGList(GUIComponent):
 		self.l.setSelectionClip(eRect(0, 0, 0, 0), False)
 
 	def preWidgetRemove(self, instance):
+		self.prefetchTimer.stop()
 		instance.selectionChanged.get().remove(self.serviceChanged)
 		instance.setContent(None)
 
@@ -433,6 +448,10 @@ class EPGList(GUIComponent):
 		if piconWidth > w - 2 * self.serviceBorderVerWidth:
 			piconWidth = w - 2 * self.serviceBorderVerWidth
 		self.picon_size = eSize(piconWidth, piconHeight)
+		# everything besides the row itself that buildEntry() depends on
+		self.layout = (width, height, w, self.number_width, self.showPicon, self.showServiceTitle,
+			config.misc.graph_mepg.servicename_alignment.value, config.misc.graph_mepg.event_alignment.value,
+			config.misc.graph_mepg.show_record_clocks.value)
 
 	def calcEntryPosAndWidthHelper(self, stime, duration, start, end, width):
 		xpos = (stime - start) * width / (end - start)
@@ -449,22 +468,33 @@ class EPGList(GUIComponent):
 		xpos, width = self.calcEntryPosAndWidthHelper(ev_start, ev_duration, time_base, time_base + time_epoch * 60, event_rect.width())
 		return xpos + event_rect.left(), width
 
-	def buildEntry(self, service, service_name, events, picon, serviceref):
+	def buildEntry(self, service, service_name, events, picon, serviceref, index):
+		if events is NOT_LOADED:
+			(service, service_name, events, picon, serviceref, index) = self.loadRows(index)
+		if self.showPicon and picon is None: # go find picon and cache its location
+			picon = getPiconName(service)
+			self.list[index] = (service, service_name, events, picon, serviceref, index)
 		r1 = self.service_rect
 		r2 = self.event_rect
 		selected = self.cur_service[0] == service
+		currentservice = CompareWithAlternatives(service, self.currentlyPlaying and self.currentlyPlaying)
+		now = time()
+		key = (index, service, service_name, events and tuple(events), picon, self.getTimeBase(), self.time_epoch, self.layout,
+			selected, self.select_rect.x if selected and self.select_rect else None, currentservice, self.timer.generation,
+			events and tuple([ev[2] <= now < ev[2] + ev[3] for ev in events]))
+		res = self.entries.get(key)
+		if res is not None:
+			return res
 
 		# Picon and Service name
-		if CompareWithAlternatives(service, self.currentlyPlaying and self.currentlyPlaying):
+		if currentservice:
 			serviceForeColor = self.foreColorServiceSelected
 			serviceBackColor = self.backColorServiceSelected
 			bgpng = self.curSerPix or self.nowEvPix
-			currentservice = True
 		else:
 			serviceForeColor = self.foreColorService
 			serviceBackColor = self.backColorService
 			bgpng = self.othEvPix
-			currentservice = False
 
 		res = [ None ]
 		if bgpng is not None:    # bacground for service rect
@@ -492,14 +522,10 @@ class EPGList(GUIComponent):
 				color = serviceForeColor, color_sel = serviceForeColor,
 				backcolor = serviceBackColor if bgpng is None else None, backcolor_sel = serviceBackColor if bgpng is None else None))
 		if self.showPicon:
-			if picon is None: # go find picon and cache its location
-				picon = getPiconName(service)
-				curIdx = self.l.getCurrentSelectionIndex()
-				self.list[curIdx] = (service, service_name, events, picon, serviceref)
 			piconWidth = self.picon_size.width()
 			piconHeight = self.picon_size.height()
 			if picon != "":
-				displayPicon = loadPNG(picon)
+				displayPicon = pixmapCache.load(picon, "picon")
 			if displayPicon is not None:
 				res.append(MultiContentEntryPixmapAlphaTest(
 					pos = (r1.x + self.serviceBorderVerWidth + self.number_width, r1.y + self.serviceBorderHorWidth),
@@ -541,7 +567,6 @@ class EPGList(GUIComponent):
 			width = r2.w
 			height = r2.h
 
-			now = time()
 			for ev in events:  #(event_id, event_title, begin_time, duration)
 				stime = ev[2]
 				duration = ev[3]
@@ -621,7 +646,7 @@ class EPGList(GUIComponent):
 					size = (r2.w - 2 * self.eventBorderVerWidth, r2.h - 2 * self.eventBorderHorWidth),
 					png = self.selEvPix,
 					flags = BT_SCALE))
-		return res
+		return self.entries.put(key, res)
 
 	def selEntry(self, dir, visible = True):
 		cur_service = self.cur_service    #(service, service_name, events, picon)
@@ -677,48 +702,61 @@ class EPGList(GUIComponent):
 		self.selectionChanged()
 		return False
 
+	def getItemsPerPage(self):
+		if listscreen:
+			return config.misc.graph_mepg.items_per_page_listscreen.getValue()
+		return config.misc.graph_mepg.items_per_page.getValue()
+
+	def loadRows(self, index):
+		# Looks up the events of the rows around index in the current time
+		# window, only the rows that are drawn or selected are looked up.
+		count = self.getItemsPerPage()
+		rows = [ x for x in self.list[max(0, index - count):index + count] if x[2] is NOT_LOADED ]
+		if rows:
+			blocks = self.model.getBlocks([ x[4].ref.toString() for x in rows ], self.getTimeBase(), self.time_epoch)
+			for (row, (service, sname, events)) in zip(rows, blocks):
+				self.list[row[5]] = (service, sname, events, row[3], row[4], row[5])
+		return self.list[index]
+
+	def schedulePrefetch(self):
+		# Looks up the next and previous time window of the rows around the
+		# selection and the pages above and below it while the page is shown,
+		# and loads the picons of those rows.
+		index = self.l.getCurrentSelectionIndex() or 0
+		count = self.getItemsPerPage()
+		time_base = self.getTimeBase()
+		rows = lambda first, last: [ x[4].ref.toString() for x in self.list[max(0, first):max(0, last)] ]
+		self.prefetchQueue = [ (rows(index - count, index + count), time_base + self.time_epoch * 60, self.time_epoch) ]
+		if self.offs > 0:
+			self.prefetchQueue.append((rows(index - count, index + count), time_base - self.time_epoch * 60, self.time_epoch))
+		self.prefetchQueue.append((rows(index + count, index + 2 * count), time_base, self.time_epoch))
+		self.prefetchQueue.append((rows(index - 2 * count, index - count), time_base, self.time_epoch))
+		self.prefetchTimer.start(100, True)
+		if self.showPicon:
+			pixmapCache.preload([ x[3] is None and getPiconName(x[0]) or x[3] for x in self.list[max(0, index - 2 * count):index + 2 * count] ], "picon")
+
+	def prefetch(self):
+		if self.prefetchQueue:
+			(services, start, duration) = self.prefetchQueue.pop(0)
+			self.model.prefetch(services, start, duration)
+			self.prefetchTimer.start(50, True)
+
 	def fillMultiEPG(self, services, stime = None):
 		if stime is not None:
 			self.time_base = int(stime)
 		if services is None:
-			time_base = self.time_base + self.offs * self.time_epoch * 60
-			test = [ (service[0], 0, time_base, self.time_epoch) for service in self.list ]
-			serviceList = self.list
-			piconIdx = 3
-			channelIdx = 4
+			# Same services, other time window.
+			self.list = [ (x[0], x[1], NOT_LOADED, x[3], x[4], x[5]) for x in self.list ]
 		else:
 			self.cur_event = None
 			self.cur_service = None
-			test = [ (service.ref.toString(), 0, self.time_base, self.time_epoch) for service in services ]
-			serviceList = services
-			piconIdx = 0
-			channelIdx = None
-
-		test.insert(0, 'XRnITBD') #return record, service ref, service name, event id, event title, begin time, duration
-		epg_data = [] if self.epgcache is None else self.epgcache.lookupEvent(test)
-		self.list = [ ]
-		tmp_list = None
-		service = ""
-		sname = ""
-
-		serviceIdx = 0
-		for x in epg_data:
-			if service != x[0]:
-				if tmp_list is not None:
-					picon = None if piconIdx == 0 else serviceList[serviceIdx][piconIdx]
-					self.list.append((service, sname, tmp_list[0][0] is not None and tmp_list or None, picon, serviceList[serviceIdx] if (channelIdx is None) else serviceList[serviceIdx][channelIdx]))
-					serviceIdx += 1
-				service = x[0]
-				sname = x[1]
-				tmp_list = [ ]
-			tmp_list.append((x[2], x[3], x[4], x[5])) #(event_id, event_title, begin_time, duration)
-		if tmp_list and len(tmp_list):
-			picon = None if piconIdx == 0 else serviceList[serviceIdx][piconIdx]
-			self.list.append((service, sname, tmp_list[0][0] is not None and tmp_list or None, picon, serviceList[serviceIdx] if (channelIdx is None) else serviceList[serviceIdx][channelIdx]))
-			serviceIdx += 1
-
+			self.entries.clear()
+			self.list = [ (service.ref.toString(), "", NOT_LOADED, None, service, idx) for (idx, service) in enumerate(services) ]
+		if self.list:
+			self.loadRows(min(self.l.getCurrentSelectionIndex() or 0, len(self.list) - 1))
 		self.l.setList(self.list)
 		self.findBestEvent()
+		self.schedulePrefetch()
 
 	def getEventRect(self):
 		rc = self.event_rect
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 from __future__ import print_function
+from os import stat
 from enigma import ePicLoad, eTimer, getDesktop, gMainDC, eSize
 
 from Screens.Screen import Screen
@@ -14,6 +15,7 @@ from Components.AVSwitch import AVSwitch
 from Components.Sources.List import List
 from Components.ConfigList import ConfigList, ConfigListScreen
 
+from Tools.PixmapCache import pixmapCache
 from Components.config import config, ConfigSubsection, ConfigInteger, ConfigSelection, ConfigText, ConfigYesNo, KEY_LEFT, KEY_RIGHT, getConfigListEntry
 import skin
 
@@ -382,9 +384,23 @@ class Pic_Thumb(Screen):
 		#paint Thumbnail start
 		self.showPic()
 
+	def thumbKey(self, path):
+		size = self["thumb0"].instance.size()
+		try:
+			mtime = stat(path).st_mtime
+		except OSError:
+			mtime = None
+		return (path, mtime, size.width(), size.height())
+
 	def showPic(self, picInfo=""):
 		for x in range(len(self.Thumbnaillist)):
 			if self.Thumbnaillist[x][0] == 0:
+				ptr = pixmapCache.get(self.thumbKey(self.Thumbnaillist[x][2]), "thumbnail")
+				if ptr is not None: # seen before, no need to decode it again
+					self.Thumbnaillist[x][0] = 2
+					self["thumb" + str(self.Thumbnaillist[x][1])].instance.setPixmap(ptr.__deref__())
+					self["thumb" + str(self.Thumbnaillist[x][1])].show()
+					continue
 				if self.picload.getThumbnail(self.Thumbnaillist[x][2]) == 1: #zu tun probier noch mal
 					self.ThumbTimer.start(500, True)
 				else:
@@ -394,6 +410,7 @@ class Pic_Thumb(Screen):
 				self.Thumbnaillist[x][0] = 2
 				ptr = self.picload.getData()
 				if ptr is not None:
+					pixmapCache.put(self.thumbKey(self.Thumbnaillist[x][2]), ptr, "thumbnail")
 					self["thumb" + str(self.Thumbnaillist[x][1])].instance.setPixmap(ptr.__deref__())
 					self["thumb" + str(self.Thumbnaillist[x][1])].show()
 
@@ -8,6 +8,7 @@ from Screens.ScreenSaver import InfoBarScreenSaver
 import Components.ParentalControl
 from Components.Button import Button
 from Components.ServiceList import ServiceList, refreshServiceList
+from Components.ChannelNumbers import channelNumbers
 from Components.ActionMap import NumberActionMap, ActionMap, HelpableActionMap
 from Components.MenuList import MenuList
 from Components.ServiceEventTracker import ServiceEventTracker, InfoBarBase
@@ -989,6 +990,7 @@ class ChannelSelectionEdit:
 				mutableList.addService(current)
 				mutableList.moveService(current, index)
 				mutableList.flushChanges()
+				channelNumbers.invalidate()
 				self.servicelist.addService(current, True)
 				self.servicelist.removeCurrent()
 				if not self.servicelist.atEnd():
@@ -1005,10 +1007,12 @@ class ChannelSelectionEdit:
 				if not mutableList.addService(ref, current):
 					self.servicelist.addService(ref, True)
 					mutableList.flushChanges()
+					channelNumbers.invalidate()
 					break
 			elif not mutableList.addService(ref):
 				self.servicelist.addService(ref, True)
 				mutableList.flushChanges()
+				channelNumbers.invalidate()
 				break
 			cnt+=1
 
@@ -1041,6 +1045,7 @@ class ChannelSelectionEdit:
 			if not mutableBouquet.addService(new_ref.ref, cur_service.ref):
 				mutableBouquet.removeService(cur_service.ref)
 				mutableBouquet.flushChanges()
+				channelNumbers.invalidate()
 				eDVBDB.getInstance().reloadBouquets()
 				mutableAlternatives = new_ref.list().startEdit()
 				if mutableAlternatives:
@@ -1048,6 +1053,7 @@ class ChannelSelectionEdit:
 					if mutableAlternatives.addService(cur_service.ref):
 						print("[ChannelSelection] add", cur_service.ref.toString(), "to new alternatives failed")
 					mutableAlternatives.flushChanges()
+					channelNumbers.invalidate()
 					self.servicelist.addService(new_ref.ref, True)
 					self.servicelist.removeCurrent()
 					if not end:
@@ -1077,6 +1083,7 @@ class ChannelSelectionEdit:
 				new_bouquet_ref.setPath('FROM BOUQUET "userbouquet.%s.radio" ORDER BY bouquet' % self.buildBouquetID(bName))
 			if not mutableBouquetList.addService(new_bouquet_ref):
 				mutableBouquetList.flushChanges()
+				channelNumbers.invalidate()
 				eDVBDB.getInstance().reloadBouquets()
 				mutableBouquet = serviceHandler.list(new_bouquet_ref).startEdit()
 				if mutableBouquet:
@@ -1086,6 +1093,7 @@ class ChannelSelectionEdit:
 							if mutableBouquet.addService(service):
 								print("[ChannelSelection] add", service.toString(), "to new bouquet failed")
 					mutableBouquet.flushChanges()
+					channelNumbers.invalidate()
 				else:
 					print("[ChannelSelection] get mutable list for new created bouquet failed")
 				# do some voodoo to check if current_root is equal to bouquet_root
@@ -1233,6 +1241,7 @@ class ChannelSelectionEdit:
 				if self.bouquet_mark_edit == EDIT_ALTERNATIVES and not new_marked and self.__marked:
 					self.mutableList.addService(eServiceReference(self.__marked[0]))
 				self.mutableList.flushChanges()
+				channelNumbers.invalidate()
 		self.__marked = []
 		self.clearMarks()
 		self.bouquet_mark_edit = OFF
@@ -1284,6 +1293,7 @@ class ChannelSelectionEdit:
 		if ref.valid() and mutableList is not None:
 			if not mutableList.removeService(ref):
 				mutableList.flushChanges() #FIXME dont flush on each single removed service
+				channelNumbers.invalidate()
 				self.servicelist.removeCurrent()
 				self.servicelist.resetRoot()
 				playingref = self.session.nav.getCurrentlyPlayingServiceOrGroup()
@@ -1297,6 +1307,7 @@ class ChannelSelectionEdit:
 				service = self.servicelist.getCurrent()
 			if not mutableList.addService(service):
 				mutableList.flushChanges()
+				channelNumbers.invalidate()
 				# do some voodoo to check if current_root is equal to dest
 				cur_root = self.getRoot()
 				str1 = cur_root and cur_root.toString() or -1
@@ -1314,6 +1325,7 @@ class ChannelSelectionEdit:
 				self.toggleMoveMarked() # unmark current entry
 			self.movemode = False
 			self.mutableList.flushChanges() # FIXME add check if changes was made
+			channelNumbers.invalidate()
 			self.mutableList = None
 			self.setTitle(self.saved_title)
 			self.saved_title = None
@@ -1433,9 +1445,11 @@ class ChannelSelectionBase(Screen):
 	def getBouquetNumOffset(self, bouquet):
 		if not config.usage.multibouquet.value:
 			return 0
-		str = bouquet.toString()
 		offset = 0
 		if 'userbouquet.' in bouquet.toCompareString():
+			entry = channelNumbers.getBouquet(self.bouquet_root, bouquet)
+			if entry is not None:
+				return entry.offset
 			serviceHandler = eServiceCenter.getInstance()
 			servicelist = serviceHandler.list(bouquet)
 			if not servicelist is None:
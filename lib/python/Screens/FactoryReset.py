@@ -50,7 +50,7 @@ class FactoryReset(Setup, ProtectedScreen):
 				self.keymaps.append(file)
 			elif file in ("automounts.xml",):
 				self.networks.append(file)
-			elif file in ("resumepoints.pkl",):
+			elif file in ("resumepoints.pkl", "resumepoints.log"):
 				self.resumePoints.append(file)
 			elif file in ("settings",):
 				self.settings.append(file)
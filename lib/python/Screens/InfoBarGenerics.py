@@ -11,6 +11,7 @@ from Components.PluginComponent import plugins
 from Components.ServiceEventTracker import ServiceEventTracker
 from Components.Sources.ServiceEvent import ServiceEvent
 from Components.ServiceList import refreshServiceList
+from Components.ChannelNumbers import channelNumbers
 from Components.Sources.Boolean import Boolean
 from Components.config import config, ConfigBoolean, ConfigClock
 from Components.SystemInfo import SystemInfo
@@ -39,6 +40,7 @@ from ServiceReference import ServiceReference, isPlayableForCur, hdmiInServiceRe
 from Tools import Notifications, ASCIItranslit
 from Tools.Directories import fileExists, getRecordingFilename, moveFiles
 from Tools.KeyBindings import getKeyBindingKeys, getKeyDescription
+from Tools.ResumePoints import resumePointCache
 from keyids import KEYFLAGS, KEYIDS, invertKeyIds
 from enigma import eTimer, eServiceCenter, eDVBServicePMTHandler, iServiceInformation, iPlayableService, eServiceReference, eEPGCache, eActionMap, getDesktop, eDVBDB, getBoxBrand, getBoxType
 from time import time, localtime, strftime
@@ -61,7 +63,6 @@ def isStandardInfoBar(self):
 	return self.__class__.__name__ == "InfoBar"
 
 def setResumePoint(session):
-	global resumePointCache, resumePointCacheLast
 	service = session.nav.getCurrentService()
 	ref = session.nav.getCurrentlyPlayingServiceOrGroup()
 	if (service is not None) and (ref is not None): # and (ref.type != 1):
@@ -70,70 +71,29 @@ def setResumePoint(session):
 		if seek:
 			pos = seek.getPlayPosition()
 			if not pos[0]:
-				key = ref.toString()
-				lru = int(time())
 				l = seek.getLength()
 				if l:
 					l = l[1]
 				else:
 					l = None
-				resumePointCache[key] = [lru, pos[1], l]
-				if len(resumePointCache) > 50:
-					candidate = key
-					for k, v in resumePointCache.items():
-						if v[0] < lru:
-							candidate = k
-					del resumePointCache[candidate]
-				if lru - resumePointCacheLast > 3600:
-					saveResumePoints()
+				resumePointCache.set(ref.toString(), pos[1], l)
 
 def delResumePoint(ref):
-	global resumePointCache, resumePointCacheLast
 	try:
 		del resumePointCache[ref.toString()]
 	except KeyError:
 		pass
-	if int(time()) - resumePointCacheLast > 3600:
-		saveResumePoints()
 
 def getResumePoint(session):
-	global resumePointCache
 	ref = session.nav.getCurrentlyPlayingServiceOrGroup()
 	if (ref is not None) and (ref.type != 1):
 		try:
-			entry = resumePointCache[ref.toString()]
-			entry[0] = int(time()) # update LRU timestamp
-			return entry[1]
+			return resumePointCache.touch(ref.toString())[1] # update LRU timestamp
 		except KeyError:
 			return None
 
 def saveResumePoints():
-	global resumePointCache, resumePointCacheLast
-	try:
-		import cPickle as pickle
-	except:
-		import pickle
-	try:
-		f = open('/etc/enigma2/resumepoints.pkl', 'wb')
-		pickle.dump(resumePointCache, f, pickle.HIGHEST_PROTOCOL)
-		f.close()
-	except Exception as ex:
-		print("[InfoBarGenerics] Failed to write resumepoints:", ex)
-	resumePointCacheLast = int(time())
-
-def loadResumePoints():
-	try:
-		import cPickle as pickle
-	except:
-		import pickle
-	try:
-		return pickle.load(open('/etc/enigma2/resumepoints.pkl', 'rb'))
-	except Exception as ex:
-		print("[InfoBarGenerics] Failed to load resumepoints:", ex)
-		return {}
-
-resumePointCache = loadResumePoints()
-resumePointCacheLast = int(time())
+	resumePointCache.save()
 
 class whitelist:
 	vbi = []
@@ -727,25 +687,24 @@ class InfoBarNumberZap:
 	def searchNumber(self, number, firstBouquetOnly=False, bouquet=None):
 		bouquet = bouquet or self.servicelist.getRoot()
 		service = None
-		serviceHandler = eServiceCenter.getInstance()
 		if not firstBouquetOnly:
-			service = self.searchNumberHelper(serviceHandler, number, bouquet)
+			entry = channelNumbers.getBouquet(self.servicelist.bouquet_root, bouquet)
+			if entry is not None:
+				service = entry.services.get(number)
+			else:
+				service = self.searchNumberHelper(eServiceCenter.getInstance(), number, bouquet)
 		if config.usage.multibouquet.value and not service:
-			bouquet = self.servicelist.bouquet_root
-			bouquetlist = serviceHandler.list(bouquet)
-			if bouquetlist:
-				bouquet = bouquetlist.getNext()
-				while bouquet.valid():
-					if bouquet.flags & eServiceReference.isDirectory and not bouquet.flags & eServiceReference.isInvisible:
-						service = self.searchNumberHelper(serviceHandler, number, bouquet)
-						if service:
-							playable = not (service.flags & (eServiceReference.isMarker|eServiceReference.isDirectory)) or (service.flags & eServiceReference.isNumberedMarker)
-							if not playable:
-								service = None
-							break
-						if config.usage.alternative_number_mode.value or firstBouquetOnly:
-							break
-					bouquet = bouquetlist.getNext()
+			if config.usage.alternative_number_mode.value or firstBouquetOnly:
+				# Only the first visible bouquet is searched.
+				bouquets = [x for x in channelNumbers.getBouquets(self.servicelist.bouquet_root) if x.visible]
+				bouquet = bouquets and bouquets[0].bouquet or eServiceReference()
+				service = bouquets and bouquets[0].services.get(number) or None
+			else:
+				(bouquet, service) = channelNumbers.getService(self.servicelist.bouquet_root, number) or (eServiceReference(), None)
+			if service:
+				playable = not (service.flags & (eServiceReference.isMarker|eServiceReference.isDirectory)) or (service.flags & eServiceReference.isNumberedMarker)
+				if not playable:
+					service = None
 		return service, bouquet
 
 	def selectAndStartService(self, service, bouquet):
@@ -6,6 +6,7 @@ from Components.Button import Button
 from Components.ActionMap import HelpableActionMap, ActionMap, NumberActionMap
 from Components.ChoiceList import ChoiceList, ChoiceEntryComponent
 from Components.MovieList import MovieList, resetMoviePlayState, AUDIO_EXTENSIONS, DVD_EXTENSIONS, IMAGE_EXTENSIONS, moviePlayState
+from Components.MovieIndex import movieIndex
 from Components.DiskInfo import DiskInfo
 from Tools.Trashcan import TrashInfo
 from Components.Pixmap import Pixmap, MultiPixmap
@@ -185,7 +186,11 @@ def moveServiceFiles(serviceref, dest, name=None, allowCopy=True):
 		moveList.reverse()
 		if name is None:
 			name = os.path.split(moveList[-1][0])[1]
+		sizes = [os.path.isfile(src) and os.path.getsize(src) or None for (src, dst) in moveList]
 		Tools.CopyFiles.moveFiles(moveList, name)
+		movieIndex.move(moveList[-1][0], moveList[-1][1])
+		for ((src, dst), size) in zip(moveList, sizes):
+			Tools.Trashcan.trashed(dst, size)
 	except Exception as e:
 		print("[MovieSelection] Failed move:", e)
 		# rethrow exception
@@ -1903,6 +1908,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 				meta = path + '.meta'
 				if os.path.isfile(meta):
 					# if .meta file is present don't rename files. Only set new name in .meta
+					movieIndex.forget(path)
 					name = "".join((newbasename, self.extension))
 					metafile = open(meta, "r+")
 					sid = metafile.readline()
@@ -2147,6 +2153,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 					try:
 						msg = ''
 						Tools.CopyFiles.deleteFiles(cur_path, name)
+						Tools.Trashcan.removedFromTrash(cur_path)
 						self["list"].removeService(current)
 						self.showActionFeedback(_("Deleted") + " " + name)
 						return
@@ -2170,6 +2177,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 					return
 				else:
 					try:
+						movieIndex.removeIndex(cur_path)
 						os.rmdir(cur_path)
 					except Exception as e:
 						print("[MovieSelection] Failed delete", e)
@@ -2239,6 +2247,8 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 			else:
 				if offline.deleteFromDisk(0):
 					raise Exception("Offline delete failed")
+			path = current.getPath()
+			Tools.Trashcan.removedFromTrash(path, os.path.splitext(path)[0] + ".eit")
 			self["list"].removeService(current)
 			from Screens.InfoBarGenerics import delResumePoint
 			delResumePoint(current)
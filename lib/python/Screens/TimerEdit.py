@@ -114,7 +114,7 @@ class TimerEditList(Screen, ProtectedScreen):
 				if t.disabled:
 					print("[TimerEdit] try to ENABLE timer")
 					t.enable()
-					timersanitycheck = TimerSanityCheck(self.session.nav.RecordTimer.timer_list, cur)
+					timersanitycheck = TimerSanityCheck(self.session.nav.RecordTimer.timer_list, cur, self.session.nav.RecordTimer.conflict_index)
 					if not timersanitycheck.check():
 						t.disable()
 						print("[TimerEdit] sanity check failed")
@@ -363,7 +363,7 @@ class TimerEditList(Screen, ProtectedScreen):
 			elif entry.external:
 				self.fallbackTimer.editTimer(entry, self.refill)
 			else:
-				timersanitycheck = TimerSanityCheck(self.session.nav.RecordTimer.timer_list, entry)
+				timersanitycheck = TimerSanityCheck(self.session.nav.RecordTimer.timer_list, entry, self.session.nav.RecordTimer.conflict_index)
 				success = False
 				if not timersanitycheck.check():
 					simulTimerList = timersanitycheck.getSimulTimerList()
@@ -533,7 +533,7 @@ class TimerSanityConflict(Screen):
 
 	def isResolvedConflict(self, checktimer=None):
 		timer = checktimer or self.timer[0]
-		timersanitycheck = TimerSanityCheck(self.session.nav.RecordTimer.timer_list, timer)
+		timersanitycheck = TimerSanityCheck(self.session.nav.RecordTimer.timer_list, timer, self.session.nav.RecordTimer.conflict_index)
 		success = False
 		if not timersanitycheck.check():
 			simulTimerList = timersanitycheck.getSimulTimerList()
@@ -1,7 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 from __future__ import print_function
-from Components.Task import PythonTask, Task, Job, job_manager as JobManager, Condition
+from Components.Task import PythonTask, Task, Job, job_manager as JobManager, Condition, RESOURCE_DISK, RESOURCE_NETWORK
 from Tools.Directories import fileExists
 from enigma import eTimer
 from os import path
@@ -23,13 +23,13 @@ class DeleteFolderTask(PythonTask):
 
 class CopyFileJob(Job):
 	def __init__(self, srcfile, destfile, name):
-		Job.__init__(self, _("Copying files"))
+		Job.__init__(self, _("Copying files"), resource=RESOURCE_DISK)
 		cmdline = 'cp -Rf "%s" "%s"' % (srcfile, destfile)
 		AddFileProcessTask(self, cmdline, srcfile, destfile, name)
 
 class MoveFileJob(Job):
 	def __init__(self, srcfile, destfile, name):
-		Job.__init__(self, _("Moving files"))
+		Job.__init__(self, _("Moving files"), resource=RESOURCE_DISK)
 		cmdline = 'mv -f "%s" "%s"' % (srcfile, destfile)
 		AddFileProcessTask(self, cmdline, srcfile, destfile, name)
 
@@ -62,7 +62,7 @@ class AddFileProcessTask(Task):
 
 class DownloadProcessTask(Job):
 	def __init__(self, url, filename, file):
-		Job.__init__(self, _("%s") % file)
+		Job.__init__(self, _("%s") % file, resource=RESOURCE_NETWORK)
 		DownloadTask(self, url, filename)
 
 class DownloaderPostcondition(Condition):
@@ -139,7 +139,7 @@ def moveFiles(fileList, name):
 			move(src, dst)
 
 def deleteFiles(fileList, name):
-	job = Job(_("Deleting files"))
+	job = Job(_("Deleting files"), resource=RESOURCE_DISK)
 	task = DeleteFolderTask(job, name)
 	task.openFiles(fileList)
 	JobManager.AddJob(job)
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import struct
+from collections import OrderedDict
+
+# Cache of parsed .cuts files (cue sheets), keyed on path, mtime and size.
+#
+# A .cuts file is a sequence of big-endian (64-bit PTS, 32-bit type) records.
+# Type 3 is the last stop position, 0/1 are in/out points and 2 are marks.
+# Files are read with a single read() and decoded in one unpack call.
+
+CUT_TYPE_IN = 0
+CUT_TYPE_OUT = 1
+CUT_TYPE_MARK = 2
+CUT_TYPE_LAST = 3
+
+RECORD_SIZE = 12
+
+def decodeCuts(data):
+	count = len(data) // RECORD_SIZE
+	values = struct.unpack(">" + "QI" * count, data[:count * RECORD_SIZE])
+	return list(zip(values[0::2], values[1::2]))
+
+def encodeCuts(cuts):
+	values = []
+	for (pts, cutType) in cuts:
+		values += [pts, cutType]
+	return struct.pack(">" + "QI" * len(cuts), *values)
+
+class CutsCache:
+	MaxEntries = 1000
+
+	def __init__(self):
+		self.entries = OrderedDict()  # path -> (mtime, size, cuts, last stop position)
+
+	def get(self, path):
+		# Returns (cuts, last stop position), raises OSError/IOError if the file
+		# can not be read.
+		st = os.stat(path)
+		entry = self.entries.get(path)
+		if entry is None or entry[0] != st.st_mtime or entry[1] != st.st_size:
+			with open(path, "rb") as f:
+				cuts = decodeCuts(f.read())
+			lastPosition = None
+			for (pts, cutType) in cuts:
+				if cutType == CUT_TYPE_LAST:
+					lastPosition = pts
+			entry = (st.st_mtime, st.st_size, cuts, lastPosition)
+			self.entries.pop(path, None)
+			if len(self.entries) >= self.MaxEntries:
+				self.entries.popitem(last=False)
+		else:
+			del self.entries[path]  # Move to the end, most recently used.
+		self.entries[path] = entry
+		return entry[2:]
+
+	def getCuts(self, path):
+		return self.get(path)[0][:]
+
+	def getLastPosition(self, path):
+		return self.get(path)[1]
+
+	def write(self, path, cuts):
+		with open(path, "wb") as f:
+			f.write(encodeCuts(cuts))
+		self.invalidate(path)
+
+	def invalidate(self, path):
+		self.entries.pop(path, None)
+
+cutsCache = CutsCache()
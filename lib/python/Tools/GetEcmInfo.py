@@ -1,144 +1,306 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+from __future__ import print_function
 import os
+import struct
 import time
+from collections import namedtuple
+from Components.Converter.Poll import Poll
 
 ECM_INFO = '/tmp/ecm.info'
 EMPTY_ECM_INFO = '', '0', '0', '0'
 
-old_ecm_time = time.time()
-info = {}
-ecm = ''
-data = EMPTY_ECM_INFO
+# The softcam rewrites ECM_INFO on every ECM. ecmWatcher parses it once per
+# change into an EcmSnapshot and pushes that to its subscribers, so the crypto
+# converters no longer stat the file on every getText(). Changes are noticed
+# with inotify on the directory of ECM_INFO; without inotify a single timer
+# stats the file once per EcmInfoWatcher.Interval for all subscribers. Without
+# subscribers the file is only checked when asked for.
+#
+# Snapshots are shared and must not be modified. ecm holds the lines of the
+# file, info the "name: value" pairs and data the (text, caid, provid, ecmpid)
+# tuple returned by GetEcmInfo.getEcmData().
 
-class GetEcmInfo:
-	def pollEcmData(self):
-		global data
-		global old_ecm_time
-		global info
-		global ecm
+EcmSnapshot = namedtuple("EcmSnapshot", ("mtime", "size", "ecm", "info", "data"))
+EMPTY_SNAPSHOT = EcmSnapshot(None, 0, (), {}, EMPTY_ECM_INFO)
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, length of the name
+
+def openInotify(directory):
+	# Returns an inotify file descriptor watching directory, or None.
+	try:
+		import ctypes
+		libc = ctypes.CDLL(None, use_errno=True)
+		fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		if fd < 0:
+			return None
+		if libc.inotify_add_watch(fd, directory.encode(), IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE) < 0:
+			os.close(fd)
+			return None
+		return fd
+	except Exception as ex:
+		print("[GetEcmInfo] inotify not available:", ex)
+		return None
+
+def readInotifyNames(fd):
+	# Returns the names of the files in the pending events, None stands for
+	# lost events.
+	names = set()
+	while True:
 		try:
-			ecm_time = os.stat(ECM_INFO).st_mtime
-		except:
-			ecm_time = old_ecm_time
-			data = EMPTY_ECM_INFO
-			info = {}
-			ecm = ''
-		if ecm_time != old_ecm_time:
-			oecmi1 = info.get('ecminterval1', '')
-			oecmi0 = info.get('ecminterval0', '')
-			info = {}
-			info['ecminterval2'] = oecmi1
-			info['ecminterval1'] = oecmi0
-			old_ecm_time = ecm_time
+			buf = os.read(fd, 4096)
+		except OSError:
+			break
+		if not buf:
+			break
+		offset = 0
+		while offset + INOTIFY_EVENT.size <= len(buf):
+			(wd, mask, cookie, length) = INOTIFY_EVENT.unpack_from(buf, offset)
+			offset += INOTIFY_EVENT.size
+			if mask & IN_Q_OVERFLOW:
+				names.add(None)
+			names.add(buf[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace"))
+			offset += length
+	return names
+
+def parseEcmInfo(ecm, info):
+	# Fills info from the lines in ecm and returns the (text, caid, provid,
+	# ecmpid) tuple.
+	for line in ecm:
+		d = line.split(':', 1)
+		if len(d) > 1:
+			info[d[0].strip()] = d[1].strip()
+	try:
+		# info is dictionary
+		using = info.get('using', '')
+		if using:
+			# CCcam
+			if using == 'fta':
+				textvalue = _("FTA")
+			elif using == 'emu':
+				textvalue = "EMU (%ss)" % (info.get('ecm time', '?'))
+			else:
+				hops = info.get('hops', None)
+				if hops and hops != '0':
+					hops = ' @' + hops
+				else:
+					hops = ''
+				textvalue = info.get('address', '?') + hops + " (%ss)" % info.get('ecm time', '?')
+		else:
+			decode = info.get('decode', None)
+			if decode:
+				# gbox (untested)
+				if info['decode'] == 'Network':
+					cardid = 'id:' + info.get('prov', '')
+					try:
+						share = open('/tmp/share.info', 'rb').readlines()
+						for line in share:
+							if cardid in line:
+								textvalue = line.strip()
+								break
+						else:
+							textvalue = cardid
+					except:
+						textvalue = decode
+				else:
+					textvalue = decode
+				if ecm[1].startswith('SysID'):
+					info['prov'] = ecm[1].strip()[6:]
+				if info['response'] and 'CaID 0x' in ecm[0] and 'pid 0x' in ecm[0]:
+					textvalue += " (0.%ss)" % info['response']
+					info['caid'] = ecm[0][ecm[0].find('CaID 0x')+7:ecm[0].find(',')]
+					info['pid'] = ecm[0][ecm[0].find('pid 0x')+6:ecm[0].find(' =')]
+					info['provid'] = info.get('prov', '0')[:4]
+			else:
+				source = info.get('source', None)
+				if source:
+					# wicardd - type 2 / mgcamd
+					caid = info.get('caid', None)
+					if caid:
+						info['caid'] = info['caid'][2:]
+						info['pid'] = info['pid'][2:]
+					info['provid'] = info['prov'][2:]
+					time = ""
+					for line in ecm:
+						if 'msec' in line:
+							line = line.split(' ')
+							if line[0]:
+								time = " (%ss)" % (float(line[0])/1000)
+								continue
+					textvalue = source + time
+				else:
+					reader = info.get('reader', '')
+					if reader:
+						hops = info.get('hops', None)
+						if hops and hops != '0':
+							hops = ' @' + hops
+						else:
+							hops = ''
+						textvalue = reader + hops + " (%ss)" % info.get('ecm time', '?')
+					else:
+						response = info.get('response time', None)
+						if response:
+							# wicardd - type 1
+							response = response.split(' ')
+							textvalue = "%s (%ss)" % (response[4], float(response[0])/1000)
+						else:
+							textvalue = ""
+		decCI = info.get('caid', info.get('CAID', '0'))
+		provid = info.get('provid', info.get('prov', info.get('Provider', '0')))
+		ecmpid = info.get('pid', info.get('ECM PID', '0'))
+	except:
+		textvalue = ""
+		decCI='0'
+		provid='0'
+		ecmpid='0'
+	return textvalue, decCI, provid, ecmpid
+
+class EcmInfoWatcher:
+	Interval = 1000  # ms, how often the timer checks ECM_INFO without inotify.
+
+	def __init__(self, filename=ECM_INFO):
+		self.filename = filename
+		self.snapshot = EMPTY_SNAPSHOT
+		self.subscribers = []
+		self.fd = None
+		self.notifier = None
+		self.timer = None
+		self.reads = 0
+
+	def subscribe(self, callback):
+		# callback(snapshot) is called after every change of the file.
+		if callback not in self.subscribers:
+			self.subscribers.append(callback)
+			if len(self.subscribers) == 1:
+				self.start()
+
+	def unsubscribe(self, callback):
+		if callback in self.subscribers:
+			self.subscribers.remove(callback)
+			if not self.subscribers:
+				self.stop()
+
+	def start(self):
+		self.refresh()
+		self.fd = openInotify(os.path.dirname(self.filename))
+		if self.fd is not None:
+			from enigma import eSocketNotifier
+			from select import POLLIN
+			self.notifier = eSocketNotifier(self.fd, POLLIN)
+			self.notifier.callback.append(self.inotifyEvent)
+		else:
+			from enigma import eTimer
+			self.timer = eTimer()
+			self.timer.callback.append(self.refresh)
+			self.timer.start(self.Interval, False)
+
+	def stop(self):
+		if self.notifier is not None:
+			self.notifier.callback.remove(self.inotifyEvent)
+			self.notifier = None
+		if self.fd is not None:
+			os.close(self.fd)
+			self.fd = None
+		if self.timer is not None:
+			self.timer.stop()
+			self.timer = None
+
+	def inotifyEvent(self, what):
+		names = readInotifyNames(self.fd)
+		if None in names or os.path.basename(self.filename) in names:
+			self.refresh(force=True)
+
+	def refresh(self, force=False):
+		# Reads the file again if it changed and notifies the subscribers,
+		# returns the current snapshot.
+		try:
+			stat = os.stat(self.filename)
+		except OSError:
+			stat = None
+		previous = self.snapshot
+		if stat is None:
+			if previous is EMPTY_SNAPSHOT:
+				return previous
+			self.snapshot = EMPTY_SNAPSHOT
+		elif force or stat.st_mtime != previous.mtime or stat.st_size != previous.size:
 			try:
-				ecm = open(ECM_INFO, 'r').readlines()
-			except:
-				ecm = ''
-			for line in ecm:
-				d = line.split(':', 1)
-				if len(d) > 1:
-					info[d[0].strip()] = d[1].strip()
-			data = self.getText()
-			return True
+				with open(self.filename, 'r') as f:
+					ecm = tuple(f.readlines())
+			except (IOError, OSError):
+				ecm = ()
+			self.reads += 1
+			info = {}
+			if previous.mtime is not None:
+				info['ecminterval2'] = previous.info.get('ecminterval1', '')
+				info['ecminterval1'] = int(stat.st_mtime - previous.mtime + 0.5)
+			else:
+				info['ecminterval2'] = info['ecminterval1'] = ''
+			data = parseEcmInfo(ecm, info)
+			self.snapshot = EcmSnapshot(stat.st_mtime, stat.st_size, ecm, info, data)
 		else:
-			info['ecminterval0'] = int(time.time()-ecm_time+0.5)
+			return previous
+		for callback in self.subscribers[:]:
+			callback(self.snapshot)
+		return self.snapshot
+
+	def getSnapshot(self):
+		if not self.subscribers:
+			return self.refresh()
+		return self.snapshot
+
+ecmWatcher = EcmInfoWatcher()
+
+class EcmPoll(Poll):
+	# Poll for the converters showing the ECM info: while not suspended they
+	# are subscribed to ecmWatcher and changed() on every new ECM, so only
+	# the values not taken from ECM_INFO have to be polled.
+	def ecmChanged(self, snapshot):
+		self.changed((self.CHANGED_POLL,))
+
+	def doSuspend(self, suspended):
+		Poll.doSuspend(self, suspended)
+		if suspended:
+			ecmWatcher.unsubscribe(self.ecmChanged)
+		else:
+			ecmWatcher.subscribe(self.ecmChanged)
+
+	def destroy(self):
+		ecmWatcher.unsubscribe(self.ecmChanged)
+		Poll.destroy(self)
+
+class GetEcmInfo:
+	def __init__(self):
+		self.snapshot = None
+
+	def pollEcmData(self):
+		# Returns True if the ECM info changed since the last call.
+		snapshot = ecmWatcher.getSnapshot()
+		if snapshot is not self.snapshot:
+			self.snapshot = snapshot
+			return True
+		return False
 
 	def getEcm(self):
-		return (self.pollEcmData(), ecm)
+		return (self.pollEcmData(), self.snapshot.ecm)
 
 	def getEcmData(self):
-		self.pollEcmData()
-		return data
+		return ecmWatcher.getSnapshot().data
 
 	def getInfo(self, member, ifempty = ''):
-		self.pollEcmData()
-		return str(info.get(member, ifempty))
+		snapshot = ecmWatcher.getSnapshot()
+		if member == 'ecminterval0':
+			if snapshot.mtime is None:
+				return str(ifempty)
+			return str(int(time.time() - snapshot.mtime + 0.5))
+		return str(snapshot.info.get(member, ifempty))
 
 	def getText(self):
-		global ecm
-		try:
-			# info is dictionary
-			using = info.get('using', '')
-			if using:
-				# CCcam
-				if using == 'fta':
-					self.textvalue = _("FTA")
-				elif using == 'emu':
-					self.textvalue = "EMU (%ss)" % (info.get('ecm time', '?'))
-				else:
-					hops = info.get('hops', None)
-					if hops and hops != '0':
-						hops = ' @' + hops
-					else:
-						hops = ''
-					self.textvalue = info.get('address', '?') + hops + " (%ss)" % info.get('ecm time', '?')
-			else:
-				decode = info.get('decode', None)
-				if decode:
-					# gbox (untested)
-					if info['decode'] == 'Network':
-						cardid = 'id:' + info.get('prov', '')
-						try:
-							share = open('/tmp/share.info', 'rb').readlines()
-							for line in share:
-								if cardid in line:
-									self.textvalue = line.strip()
-									break
-							else:
-								self.textvalue = cardid
-						except:
-							self.textvalue = decode
-					else:
-						self.textvalue = decode
-					if ecm[1].startswith('SysID'):
-						info['prov'] = ecm[1].strip()[6:]
-					if info['response'] and 'CaID 0x' in ecm[0] and 'pid 0x' in ecm[0]:
-						self.textvalue += " (0.%ss)" % info['response']
-						info['caid'] = ecm[0][ecm[0].find('CaID 0x')+7:ecm[0].find(',')]
-						info['pid'] = ecm[0][ecm[0].find('pid 0x')+6:ecm[0].find(' =')]
-						info['provid'] = info.get('prov', '0')[:4]
-				else:
-					source = info.get('source', None)
-					if source:
-						# wicardd - type 2 / mgcamd
-						caid = info.get('caid', None)
-						if caid:
-							info['caid'] = info['caid'][2:]
-							info['pid'] = info['pid'][2:]
-						info['provid'] = info['prov'][2:]
-						time = ""
-						for line in ecm:
-							if 'msec' in line:
-								line = line.split(' ')
-								if line[0]:
-									time = " (%ss)" % (float(line[0])/1000)
-									continue
-						self.textvalue = source + time
-					else:
-						reader = info.get('reader', '')
-						if reader:
-							hops = info.get('hops', None)
-							if hops and hops != '0':
-								hops = ' @' + hops
-							else:
-								hops = ''
-							self.textvalue = reader + hops + " (%ss)" % info.get('ecm time', '?')
-						else:
-							response = info.get('response time', None)
-							if response:
-								# wicardd - type 1
-								response = response.split(' ')
-								self.textvalue = "%s (%ss)" % (response[4], float(response[0])/1000)
-							else:
-								self.textvalue = ""
-			decCI = info.get('caid', info.get('CAID', '0'))
-			provid = info.get('provid', info.get('prov', info.get('Provider', '0')))
-			ecmpid = info.get('pid', info.get('ECM PID', '0'))
-		except:
-			ecm = ''
-			self.textvalue = ""
-			decCI='0'
-			provid='0'
-			ecmpid='0'
-		return self.textvalue, decCI, provid, ecmpid
+		return self.getEcmData()
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+from collections import OrderedDict
+from Tools.LoadPixmap import LoadPixmap
+
+# Memory bounded cache of pixmaps, per scope.
+#
+# LoadPixmap() leaves PNGs in the C++ pixmap cache forever and never caches
+# JPGs, so picons, covers and thumbnails were either decoded on every paint or
+# kept until the end. pixmapCache loads them uncached and keeps the most
+# recently used ones of every scope (picon, cover, thumbnail) within the byte
+# budget of the scope. The size of a pixmap is taken as 4 bytes per pixel.
+#
+# preload() reads the files in a thread, so slow media (USB sticks, network
+# shares) do not block the UI, and decodes them on the main thread, as pixmaps
+# can not be created outside of it.
+
+class PixmapScope:
+	def __init__(self, name, budget):
+		self.name = name
+		self.budget = budget
+		self.entries = OrderedDict()  # key -> (pixmap, bytes)
+		self.bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.loaded = 0  # bytes of all pixmaps added
+
+	def get(self, key):
+		entry = self.entries.pop(key, None)
+		if entry is None:
+			self.misses += 1
+			return None
+		self.entries[key] = entry
+		self.hits += 1
+		return entry[0]
+
+	def put(self, key, pixmap):
+		self.discard(key)
+		size = pixmapBytes(pixmap)
+		self.entries[key] = (pixmap, size)
+		self.bytes += size
+		self.loaded += size
+		# The new pixmap is kept even when it alone exceeds the budget.
+		while self.bytes > self.budget and len(self.entries) > 1:
+			(pixmap, size) = self.entries.popitem(last=False)[1]
+			self.bytes -= size
+			self.evictions += 1
+
+	def discard(self, key):
+		entry = self.entries.pop(key, None)
+		if entry is not None:
+			self.bytes -= entry[1]
+
+	def clear(self):
+		self.entries.clear()
+		self.bytes = 0
+
+def pixmapBytes(pixmap):
+	try:
+		size = pixmap.size()
+		return size.width() * size.height() * 4
+	except Exception:
+		return 0
+
+def readFiles(paths):
+	# Reads the files, which leaves them in the page cache, returns the
+	# paths that could be read.
+	result = []
+	for path in paths:
+		try:
+			with open(path, "rb") as f:
+				while f.read(65536):
+					pass
+			result.append(path)
+		except (IOError, OSError):
+			pass
+	return result
+
+class PixmapCache:
+	Budgets = {
+		"picon": 8 * 1024 * 1024,
+		"cover": 8 * 1024 * 1024,
+		"thumbnail": 8 * 1024 * 1024,
+	}
+
+	def __init__(self):
+		self.scopes = {}
+		for (name, budget) in self.Budgets.items():
+			self.addScope(name, budget)
+
+	def addScope(self, name, budget):
+		# Adds a scope or changes its budget.
+		scope = self.scopes.get(name)
+		if scope is None:
+			scope = self.scopes[name] = PixmapScope(name, budget)
+		else:
+			scope.budget = budget
+		return scope
+
+	def get(self, key, scope):
+		# Returns the cached pixmap of key or None.
+		return self.scopes[scope].get(key)
+
+	def put(self, key, pixmap, scope):
+		# Caches a pixmap that was created elsewhere (e.g. by ePicLoad).
+		if pixmap is not None:
+			self.scopes[scope].put(key, pixmap)
+		return pixmap
+
+	def load(self, path, scope, desktop=None):
+		# Returns the pixmap of the file path, loading it if it is not cached.
+		pixmap = self.scopes[scope].get(path)
+		if pixmap is None and path:
+			pixmap = self.put(path, LoadPixmap(path, desktop, cached=False), scope)
+		return pixmap
+
+	def preload(self, paths, scope):
+		# Loads the pixmaps of paths that are not cached yet in the background.
+		entries = self.scopes[scope].entries
+		paths = [x for x in paths if x and x not in entries]
+		if paths:
+			from twisted.internet import threads
+			threads.deferToThread(readFiles, paths).addCallbacks(lambda result: self.preloaded(result, scope), self.preloadFailed)
+
+	def preloaded(self, paths, scope):
+		for path in paths:
+			if path not in self.scopes[scope].entries:
+				self.put(path, LoadPixmap(path, cached=False), scope)
+
+	def preloadFailed(self, failure):
+		print("[PixmapCache] preload failed:", failure)
+
+	def invalidate(self, scope=None, key=None):
+		# Drops key of scope, all pixmaps of scope or everything.
+		for x in (scope is None and self.scopes.values() or (self.scopes[scope],)):
+			if key is None:
+				x.clear()
+			else:
+				x.discard(key)
+
+	def getStats(self):
+		# Returns {scope: (pixmaps, bytes, budget, hits, misses, evictions, bytes loaded)}.
+		return dict([(x.name, (len(x.entries), x.bytes, x.budget, x.hits, x.misses, x.evictions, x.loaded)) for x in self.scopes.values()])
+
+pixmapCache = PixmapCache()
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+from collections import OrderedDict
+from time import localtime, strftime
+from weakref import WeakSet
+
+# Cache of built list entries (the multi-content tuples of a row).
+#
+# eListboxPythonMultiContent calls the build function of a list every time a
+# row is painted, so scrolling an EPG list rebuilds the same rows over and over.
+# RenderCache keeps the MaxEntries most recently built rows, keyed on whatever
+# the row depends on: the event (id, begin, duration, title), the timer
+# generation (see RecordTimer.generation) and the selection state. The layout
+# is handled by the owner: EpgList clears the cache when its item size changes
+# (recalcEntrySize), GraphMultiEpg puts its layout tuple into the key.
+#
+# Entries are shared between paints and must not be modified. Rows and times
+# formatted for the old time zone or language are dropped by clearAll().
+
+class RenderCache:
+	MaxEntries = 500
+
+	def __init__(self, maxEntries=None):
+		self.maxEntries = maxEntries or self.MaxEntries
+		self.entries = OrderedDict()  # key -> entry
+		self.hits = 0
+		self.misses = 0
+		renderCaches.add(self)
+
+	def get(self, key):
+		# Returns the entry of key or None.
+		entry = self.entries.pop(key, None)
+		if entry is None:
+			self.misses += 1
+			return None
+		self.entries[key] = entry
+		self.hits += 1
+		return entry
+
+	def put(self, key, entry):
+		self.entries.pop(key, None)
+		self.entries[key] = entry
+		while len(self.entries) > self.maxEntries:
+			self.entries.popitem(last=False)
+		return entry
+
+	def clear(self):
+		self.entries.clear()
+
+	def getStats(self):
+		# Returns (entries, hits, misses).
+		return (len(self.entries), self.hits, self.misses)
+
+renderCaches = WeakSet()  # all RenderCache instances
+
+# strftime() results of formatTime(), per (timestamp, format).
+timeStrings = OrderedDict()
+MaxTimeStrings = 2000
+
+def clearAll():
+	# Drops all formatted times and cached rows, called when the time zone or
+	# the language changes.
+	timeStrings.clear()
+	for cache in list(renderCaches):
+		cache.clear()
+
+def formatTime(timestamp, format):
+	# Returns strftime(format, localtime(timestamp)), memoized.
+	key = (timestamp, format)
+	text = timeStrings.get(key)
+	if text is None:
+		text = timeStrings[key] = strftime(format, localtime(timestamp))
+		if len(timeStrings) > MaxTimeStrings:
+			timeStrings.popitem(last=False)
+	return text
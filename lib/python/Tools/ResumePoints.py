@@ -0,0 +1,171 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import time
+from collections import OrderedDict
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
+try:
+	import cPickle as pickle
+except:
+	import pickle
+
+# Resume points of played media, service reference string -> [lru, position,
+# length] with the least recently used entry first.
+#
+# The entries are stored in a snapshot file (the pickled list of entries) and
+# an append-only log of the changes made since. Every change is appended to the
+# log right away, so it survives a crash, and the snapshot is only rewritten
+# when the log has grown to CompactRecords records. Log lines are
+#
+#   S <lru> <position> <length or -> <service reference>
+#   D <service reference>
+#
+# Loading applies the log to the snapshot; a torn last line is ignored and cut
+# off the log, so that the next record starts on a line of its own.
+
+class ResumePointStore:
+	CompactRecords = 500
+
+	def __init__(self, filename, capacity=2000):
+		self.filename = filename
+		self.logname = os.path.splitext(filename)[0] + ".log"
+		self.capacity = capacity
+		self.entries = None
+		self.log = None
+		self.records = 0
+
+	def load(self):
+		self.entries = OrderedDict()
+		try:
+			with open(self.filename, "rb") as f:
+				entries = pickle.load(f)
+			if isinstance(entries, dict):  # Before the log, the snapshot was a dict.
+				entries = sorted(entries.items(), key=lambda x: x[1][0])
+			for (key, entry) in entries:
+				self.entries[key] = list(entry)
+		except Exception as ex:
+			if not isinstance(ex, (IOError, OSError)):
+				print("[ResumePoints] Failed to load resume points:", ex)
+		self.records = 0
+		torn = False
+		try:
+			with open(self.logname, "r") as f:
+				for line in f:
+					if line.endswith("\n"):
+						self.replay(line)
+						self.records += 1
+					else:
+						torn = True
+			if torn:
+				with open(self.logname, "r+b") as f:
+					f.truncate(f.read().rfind(b"\n") + 1)
+		except (IOError, OSError) as ex:
+			if torn:
+				print("[ResumePoints] Failed to truncate torn resume point log:", ex)
+		self.shrink()
+
+	def replay(self, line):
+		try:
+			if line.startswith("S "):
+				(op, lru, position, length, key) = line[:-1].split(" ", 4)
+				self.entries.pop(key, None)
+				self.entries[key] = [int(lru), int(position), length != "-" and int(length) or None]
+				self.shrink()
+			elif line.startswith("D "):
+				self.entries.pop(line[2:-1], None)
+		except ValueError:
+			print("[ResumePoints] Ignoring bad log record:", line)
+
+	def append(self, line, sync=True):
+		if self.records >= self.CompactRecords:
+			self.save()
+			return
+		try:
+			if self.log is None:
+				self.log = open(self.logname, "a")
+			self.log.write(line)
+			self.log.flush()
+			if sync:
+				os.fsync(self.log.fileno())
+			self.records += 1
+		except (IOError, OSError) as ex:
+			print("[ResumePoints] Failed to write resume point log:", ex)
+
+	def save(self):
+		# Writes a new snapshot and empties the log.
+		if self.entries is None:
+			return
+		try:
+			with open(self.filename + ".writing", "wb") as f:
+				pickle.dump(list(self.entries.items()), f, pickle.HIGHEST_PROTOCOL)
+				f.flush()
+				os.fsync(f.fileno())
+			os.rename(self.filename + ".writing", self.filename)
+			if self.log is not None:
+				self.log.close()
+			self.log = open(self.logname, "w")
+			self.records = 0
+		except (IOError, OSError) as ex:
+			print("[ResumePoints] Failed to write resume points:", ex)
+
+	def shrink(self):
+		while len(self.entries) > self.capacity:
+			self.entries.popitem(last=False)
+
+	def setCapacity(self, capacity):
+		self.capacity = capacity
+		if self.entries is not None:
+			self.shrink()
+
+	def set(self, key, position, length):
+		if self.entries is None:
+			self.load()
+		entry = [int(time.time()), position, length]
+		self.entries.pop(key, None)
+		self.entries[key] = entry
+		self.shrink()
+		self.append("S %d %d %s %s\n" % (entry[0], position, length is None and "-" or length, key))
+
+	def touch(self, key):
+		# Returns the entry of key and marks it as the most recently used.
+		if self.entries is None:
+			self.load()
+		entry = self.entries.pop(key)
+		entry[0] = int(time.time())
+		self.entries[key] = entry
+		self.append("S %d %d %s %s\n" % (entry[0], entry[1], entry[2] is None and "-" or entry[2], key), sync=False)
+		return entry
+
+	def get(self, key, default=None):
+		if self.entries is None:
+			self.load()
+		return self.entries.get(key, default)
+
+	def __getitem__(self, key):
+		if self.entries is None:
+			self.load()
+		return self.entries[key]
+
+	def __delitem__(self, key):
+		if self.entries is None:
+			self.load()
+		del self.entries[key]
+		self.append("D %s\n" % key)
+
+	def __contains__(self, key):
+		if self.entries is None:
+			self.load()
+		return key in self.entries
+
+	def __len__(self):
+		if self.entries is None:
+			self.load()
+		return len(self.entries)
+
+	def keys(self):
+		if self.entries is None:
+			self.load()
+		return list(self.entries.keys())
+
+resumePointCache = ResumePointStore(resolveFilename(SCOPE_CONFIG, "resumepoints.pkl"))
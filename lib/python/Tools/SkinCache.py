@@ -0,0 +1,177 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import threading
+import xml.etree.cElementTree
+try:
+	import cPickle as pickle
+except:
+	import pickle
+
+# Compiled skin cache.
+#
+# Parsing all skin XML files is a big part of the time spent at startup, even
+# though only a handful of the (often thousands of) skin screens is needed
+# before the user interacts with the box. The cache keeps every skin file
+# loaded, keyed on the size and mtime of the file, split into:
+#
+#  - the skin without its screens (colors, fonts, windowstyles, ...), which
+#    is parsed right away, as loadSingleSkinData() needs it,
+#  - the screens as (name, id, screen xml) tuples. A screen is only parsed
+#    when it is first used, see ScreenDict.
+#
+# Files that were not loaded since the last save are dropped from the cache.
+#
+# A skin file that is not cached yet is parsed once and used as it is, the
+# screens are compiled and the cache is written in a thread WriteDelay seconds
+# after save(), so a cache miss costs no more than loading the skin without
+# the cache.
+
+WriteDelay = 60
+
+def splitSkin(domSkin):
+	# Returns (skin without screens, [(name, id, screen element)]).
+	data = xml.etree.cElementTree.Element(domSkin.tag, domSkin.attrib)
+	screens = []
+	for element in domSkin:
+		if element.tag == "screen":
+			name = element.attrib.get("name", None)
+			if name:  # Without a name, it's useless!
+				screens.append((name, element.attrib.get("id", None), element))
+		else:
+			data.append(element)
+	return (data, screens)
+
+def compileSkin(domSkin):
+	(data, screens) = splitSkin(domSkin)
+	for (name, scrnID, element) in screens:
+		element.tail = None
+	return (xml.etree.cElementTree.tostring(data), tuple([(name, scrnID, xml.etree.cElementTree.tostring(element)) for (name, scrnID, element) in screens]))
+
+class ScreenDict(dict):
+	# Dictionary of skin screens (name -> (element, path)). Screens added with
+	# setCompiled() are parsed when they are looked up, unless they are
+	# elements already.
+	def __init__(self, *args, **kwargs):
+		dict.__init__(self, *args, **kwargs)
+		self.pending = {}
+
+	def setCompiled(self, name, compiled, path):
+		if hasattr(compiled, "tag"):
+			self[name] = (compiled, path)
+		else:
+			dict.__setitem__(self, name, None)
+			self.pending[name] = (compiled, path)
+
+	def __getitem__(self, name):
+		if name in self.pending:
+			(compiled, path) = self.pending.pop(name)
+			dict.__setitem__(self, name, (xml.etree.cElementTree.fromstring(compiled), path))
+		return dict.__getitem__(self, name)
+
+	def __setitem__(self, name, value):
+		self.pending.pop(name, None)
+		dict.__setitem__(self, name, value)
+
+	def __delitem__(self, name):
+		self.pending.pop(name, None)
+		dict.__delitem__(self, name)
+
+	def clear(self):
+		self.pending.clear()
+		dict.clear(self)
+
+	def get(self, name, default=None):
+		if name in self:
+			return self[name]
+		return default
+
+	def values(self):
+		return [self[name] for name in self.keys()]
+
+	def items(self):
+		return [(name, self[name]) for name in self.keys()]
+
+	def itervalues(self):
+		return iter(self.values())
+
+	def iteritems(self):
+		return iter(self.items())
+
+class SkinCache:
+	def __init__(self, filename):
+		self.filename = filename
+		self.entries = None  # skin filename -> (signature, compiled skin)
+		self.used = {}  # compiled skin is None until the cache is written
+		self.dirty = False
+		self.writeTimer = None
+		self.lock = threading.Lock()
+
+	def get(self, fd, filename):
+		# Returns (root, screens) for the open skin file fd. root is a "skin"
+		# element with all the non screen elements, the screens are compiled
+		# or elements. Raises the errors of the XML parser if the skin has to
+		# be parsed and is broken.
+		if self.entries is None:
+			self.entries = self.readCache()
+		st = os.fstat(fd.fileno())
+		signature = (st.st_size, st.st_mtime)
+		entry = self.entries.get(filename)
+		if entry is None or entry[0] != signature or entry[1] is None:
+			self.used[filename] = (signature, None)
+			self.dirty = True
+			return splitSkin(xml.etree.cElementTree.parse(fd).getroot())
+		self.used[filename] = entry
+		(data, screens) = entry[1]
+		return (xml.etree.cElementTree.fromstring(data), screens)
+
+	def readCache(self):
+		try:
+			with open(self.filename, "rb") as f:
+				entries = pickle.load(f)
+			if isinstance(entries, dict):
+				return entries
+		except Exception:
+			pass
+		return {}
+
+	def save(self):
+		# Writes the cache, skin files that have to be compiled first are
+		# left for a thread started WriteDelay seconds later.
+		if not self.dirty and len(self.used) == len(self.entries or ()):
+			return
+		if [x for x in self.used.values() if x[1] is None]:
+			from enigma import eTimer
+			self.writeTimer = eTimer()
+			self.writeTimer.callback.append(self.startWrite)
+			self.writeTimer.start(WriteDelay * 1000, True)
+		else:
+			self.write()
+
+	def startWrite(self):
+		self.writeTimer = None
+		threading.Thread(target=self.write, args=(dict(self.used),)).start()
+
+	def write(self, used=None):
+		with self.lock:
+			used = dict(used or self.used)
+			for (filename, (signature, compiled)) in list(used.items()):
+				if compiled is None:
+					try:
+						with open(filename, "r") as fd:
+							st = os.fstat(fd.fileno())
+							if (st.st_size, st.st_mtime) != signature:
+								raise ValueError("skin file changed")
+							used[filename] = (signature, compileSkin(xml.etree.cElementTree.parse(fd).getroot()))
+					except Exception as err:
+						print("[SkinCache] Skin '%s' not cached! (%s)" % (filename, err))
+						del used[filename]
+			try:
+				with open(self.filename + ".writing", "wb") as f:
+					pickle.dump(used, f, pickle.HIGHEST_PROTOCOL)
+				os.rename(self.filename + ".writing", self.filename)
+				self.entries = used
+				self.dirty = False
+			except Exception as err:
+				print("[SkinCache] Error: Unable to write skin cache '%s'! (%s)" % (self.filename, err))
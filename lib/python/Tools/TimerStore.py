@@ -0,0 +1,231 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import xml.etree.cElementTree
+from time import time
+try:
+	import cPickle as pickle
+except:
+	import pickle
+
+# Persistence for the timer files (timers.xml, pm_timers.xml).
+#
+# The timer file itself keeps its usual format. Next to it the store keeps:
+#
+#  <file>.cache    pickled, already parsed timer elements together with the
+#                  size/mtime of the timer file they belong to, so loading
+#                  an unchanged file at boot does not need the XML parser.
+#  <file>.journal  (journal mode only) appended changes since the timer file
+#                  was last written: "set <key> <timer xml>" and "del <key>"
+#                  lines. The first line holds a token which must match the
+#                  "journal" attribute of the timer file, a journal left over
+#                  from an older timer file is ignored.
+#
+# Keys are the positions of the timers in the timer file; timers added later
+# get the following numbers. The journal is folded back into the timer file
+# (written to a temporary file, then renamed) when it grows beyond
+# JournalCompactLimit records and whenever a compacting save is requested.
+
+class TimerElement:
+	# Stand-in for a parsed <timer> or <log> element, as kept in the cache.
+	def __init__(self, attrib, text=None, logs=()):
+		self.attrib = attrib
+		self.text = text
+		self.logs = list(logs)
+
+	def get(self, key, default=None):
+		return self.attrib.get(key, default)
+
+	def findall(self, tag):
+		return self.logs if tag == "log" else []
+
+def toTimerElement(element):
+	return TimerElement(dict(element.attrib), None, [TimerElement(dict(log.attrib), log.text) for log in element.findall("log")])
+
+class TimerStore:
+	JournalCompactLimit = 64
+
+	def __init__(self, filename):
+		self.filename = filename
+		self.journalname = filename + ".journal"
+		self.cachename = filename + ".cache"
+		self.token = None  # journal token of the timer file as last written
+		self.keys = {}  # id(timer) -> key
+		self.timers = {}  # key -> timer
+		self.written = {}  # key -> timer xml as stored in timer file + journal
+		self.nextkey = 0
+		self.journalrecords = 0
+		self.lastfragments = None
+		self.signature = None  # (size, mtime) of the timer file as last written
+
+	def load(self):
+		# Returns the timer elements of the timer file with the journal applied.
+		# Like ElementTree.parse(), raises IOError when the file is missing and
+		# SyntaxError when it is corrupt.
+		(token, elements) = self.loadFile()
+		elements = dict(enumerate(elements))
+		for (key, element) in self.readJournal(token):
+			if element is None:
+				elements.pop(key, None)
+			else:
+				elements[key] = element
+		# nothing is known about what the timers will look like when they are
+		# saved again, so the first save always rewrites the timer file
+		self.lastfragments = None
+		self.keys = {}
+		self.timers = {}
+		self.written = {}
+		return [elements[key] for key in sorted(elements)]
+
+	def loadFile(self):
+		with open(self.filename, "rb") as f:
+			st = os.fstat(f.fileno())
+			signature = (st.st_size, st.st_mtime)
+			cached = self.readCache(signature)
+			if cached is not None:
+				return cached
+			root = xml.etree.cElementTree.parse(f).getroot()
+		result = (root.get("journal"), [toTimerElement(x) for x in root.findall("timer")])
+		self.writeCache(signature, result)
+		return result
+
+	def readCache(self, signature):
+		try:
+			with open(self.cachename, "rb") as f:
+				(cachedsignature, result) = pickle.load(f)
+			if cachedsignature == signature:
+				return result
+		except Exception:
+			pass
+		return None
+
+	def writeCache(self, signature, result):
+		try:
+			with open(self.cachename + ".writing", "wb") as f:
+				pickle.dump((signature, result), f, pickle.HIGHEST_PROTOCOL)
+			os.rename(self.cachename + ".writing", self.cachename)
+		except Exception as ex:
+			print("[TimerStore] Failed to write cache %s:" % self.cachename, ex)
+
+	def refreshCache(self):
+		try:
+			st = os.stat(self.filename)
+		except OSError:
+			return
+		if self.readCache((st.st_size, st.st_mtime)) is None:
+			try:
+				self.loadFile()
+			except (IOError, SyntaxError) as ex:
+				print("[TimerStore] Failed to refresh cache %s:" % self.cachename, ex)
+
+	def readJournal(self, token):
+		records = []
+		if token is None:
+			return records
+		try:
+			f = open(self.journalname, "r")
+		except IOError:
+			return records
+		with f:
+			if f.readline().strip() != token:
+				print("[TimerStore] ignoring stale journal %s" % self.journalname)
+				return records
+			for line in f:
+				if not line.endswith("\n"):
+					break  # incomplete last record
+				try:
+					(op, key, fragment) = (line.rstrip("\n").split(" ", 2) + [None])[:3]
+					if op == "set":
+						records.append((int(key), toTimerElement(xml.etree.cElementTree.fromstring(fragment))))
+					elif op == "del":
+						records.append((int(key), None))
+				except Exception as ex:
+					print("[TimerStore] broken journal record in %s:" % self.journalname, ex)
+					break
+		return records
+
+	def fileChanged(self):
+		# True if the timer file was deleted or replaced since it was written.
+		try:
+			st = os.stat(self.filename)
+		except OSError:
+			return True
+		return (st.st_size, st.st_mtime) != self.signature
+
+	def save(self, records, journal=False, compact=False):
+		# records is a list of (timer, timer xml) pairs in the order the timers
+		# should appear in the timer file.
+		if self.lastfragments is not None and self.fileChanged():
+			print("[TimerStore] %s changed on disk, rewriting it" % self.filename)
+			self.lastfragments = None
+		if journal and not compact and self.token is not None and self.lastfragments is not None:
+			changes = self.getChanges(records)
+			if not changes:
+				return
+			if self.journalrecords + len(changes) <= self.JournalCompactLimit:
+				self.appendJournal(changes)
+				return
+			self.writeFile(records, journal)
+		elif [fragment for (timer, fragment) in records] != self.lastfragments or journal != (self.token is not None) or self.journalrecords:
+			self.writeFile(records, journal)
+		if compact:
+			self.refreshCache()
+
+	def getChanges(self, records):
+		changes = []
+		seen = set()
+		for (timer, fragment) in records:
+			key = self.keys.get(id(timer))
+			if key is None or self.timers.get(key) is not timer:
+				key = self.nextkey
+				self.nextkey += 1
+				self.keys[id(timer)] = key
+				self.timers[key] = timer
+			seen.add(key)
+			if self.written.get(key) != fragment:
+				self.written[key] = fragment
+				changes.append("set %d %s\n" % (key, fragment.rstrip("\n").replace("\n", "&#10;")))
+		for key in [key for key in self.written if key not in seen]:
+			del self.written[key]
+			self.keys.pop(id(self.timers.pop(key)), None)
+			changes.append("del %d\n" % key)
+		self.lastfragments = [fragment for (timer, fragment) in records]
+		return changes
+
+	def appendJournal(self, changes):
+		mode = "a" if self.journalrecords else "w"
+		with open(self.journalname, mode) as f:
+			if not self.journalrecords:
+				f.write(self.token + "\n")
+			for x in changes:
+				f.write(x)
+			f.flush()
+			os.fsync(f.fileno())
+		self.journalrecords += len(changes)
+
+	def writeFile(self, records, journal):
+		self.token = journal and str(int(time() * 1000)) or None
+		with open(self.filename + ".writing", "w") as f:
+			f.write('<?xml version="1.0" ?>\n')
+			f.write(self.token and '<timers journal="%s">\n' % self.token or '<timers>\n')
+			for (timer, fragment) in records:
+				f.write(fragment)
+			f.write('</timers>\n')
+			f.flush()
+			os.fsync(f.fileno())
+		os.rename(self.filename + ".writing", self.filename)
+		st = os.stat(self.filename)
+		self.signature = (st.st_size, st.st_mtime)
+		if os.path.exists(self.journalname):
+			os.remove(self.journalname)
+		self.journalrecords = 0
+		self.keys = {}
+		self.timers = {}
+		self.written = {}
+		for (key, (timer, fragment)) in enumerate(records):
+			self.keys[id(timer)] = key
+			self.timers[key] = timer
+			self.written[key] = fragment
+		self.nextkey = len(records)
+		self.lastfragments = [fragment for (timer, fragment) in records]
@@ -0,0 +1,237 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import stat
+import time
+import threading
+from heapq import heapify, heappush, heappop
+
+# Index of the files in a trash folder.
+#
+# Purging the trash used to walk and stat the whole trash folder (and once more
+# for its size) on every cleanup. The index walks it once and then keeps the
+# (ctime, size, path) of every file in a heap ordered by deletion time, plus
+# the total size. Files moved into the trash are added as they arrive, so a
+# purge only pops the entries it needs.
+#
+# Files and folders moved into the trash by others (e.g. another box sharing
+# the disk) change the mtime of the trash folder, which is checked before the
+# index is used. The top level of the trash is then listed again and new
+# entries are added, missing ones dropped. Changes deeper down are picked up
+# by rebuilding the index every RescanInterval seconds. Entries are checked
+# with lstat() before they are erased, the folders they were in are removed
+# once they are empty.
+
+class TrashIndex:
+	RescanInterval = 24 * 3600
+
+	def __init__(self, trash):
+		self.trash = trash
+		self.lock = threading.Lock()
+		self.heap = None  # [(ctime, size, path)], oldest deletion first
+		self.files = {}  # path -> (ctime, size), entries in the heap not in here are stale
+		self.entries = {}  # top level name -> number of indexed files in it
+		self.size = 0
+		self.scanned = 0
+		self.mtime = None  # of the trash folder when its top level was last listed
+		self.emptied = set()  # folders of erased files, removed when empty
+
+	def check(self):
+		# Rebuilds the index when it is missing or outdated and looks for
+		# changes of the trash folder. Called without the lock, the folder is
+		# walked while the old index is still in use.
+		now = time.time()
+		with self.lock:
+			rescan = self.heap is None or abs(now - self.scanned) > self.RescanInterval
+		if rescan:
+			mtime = os.stat(self.trash).st_mtime
+			files = self.scan()
+			with self.lock:
+				self.files = files
+				self.heap = [(ctime, size, path) for (path, (ctime, size)) in files.items()]
+				heapify(self.heap)
+				self.size = sum([size for (ctime, size) in files.values()])
+				self.entries = {}
+				for path in files:
+					name = self.topLevel(path)
+					self.entries[name] = self.entries.get(name, 0) + 1
+				self.scanned = now
+				self.mtime = mtime
+				self.emptied = set()
+		with self.lock:
+			self.removeEmptied()
+			mtime = os.stat(self.trash).st_mtime
+			if mtime != self.mtime:
+				self.revalidate()
+				self.mtime = mtime
+
+	def revalidate(self):
+		# Adds the top level entries of the trash that are not indexed and
+		# drops the ones that are gone, called with the lock held.
+		names = set(os.listdir(self.trash))
+		for name in names.difference(self.entries):
+			self.insertPath(os.path.join(self.trash, name))
+		gone = set(self.entries).difference(names)
+		if gone:
+			for path in [x for x in self.files if self.topLevel(x) in gone]:
+				self.discard(path)
+
+	def topLevel(self, path):
+		# Returns the name of the top level file or folder of path in the trash.
+		return path[len(self.trash) + 1:].split("/", 1)[0]
+
+	def removeEmptied(self):
+		# Removes the folders of erased files that are empty now, along with
+		# their empty parents, called with the lock held. Folders that are not
+		# empty yet (e.g. files still being erased in the background) are
+		# tried again later.
+		for path in list(self.emptied):
+			self.emptied.discard(path)
+			while path.startswith(self.trash + "/"):
+				try:
+					os.rmdir(path)
+				except OSError:
+					if os.path.isdir(path):
+						self.emptied.add(path)
+					break
+				path = os.path.dirname(path)
+
+	def scan(self):
+		# Returns {path: (ctime, size)} of all files in the trash.
+		files = {}
+		for root, dirs, names in os.walk(self.trash, topdown=False):
+			for name in names:
+				path = os.path.join(root, name)
+				try:
+					st = os.lstat(path)
+					files[path] = (st.st_ctime, st.st_size)
+				except OSError as e:
+					print("[TrashIndex] Failed to stat %s:" % path, e)
+			# Remove empty directories if possible
+			for name in dirs:
+				try:
+					os.rmdir(os.path.join(root, name))
+				except OSError:
+					pass
+		return files
+
+	def insert(self, path, ctime, size):
+		self.discard(path)
+		self.files[path] = (ctime, size)
+		heappush(self.heap, (ctime, size, path))
+		self.size += size
+		name = self.topLevel(path)
+		self.entries[name] = self.entries.get(name, 0) + 1
+
+	def discard(self, path):
+		entry = self.files.pop(path, None)
+		if entry is not None:
+			self.size -= entry[1]  # The heap entry is dropped when it is popped.
+			name = self.topLevel(path)
+			self.entries[name] -= 1
+			if not self.entries[name]:
+				del self.entries[name]
+
+	def add(self, path, size=None):
+		# Adds a file or folder that was just moved into the trash. When the
+		# move runs in the background and the file is not there yet, its size
+		# has to be given.
+		with self.lock:
+			if self.heap is None:
+				return  # Not indexed yet, the first use will find it.
+			if not self.insertPath(path) and size is not None:
+				self.insert(path, time.time(), size)
+
+	def insertPath(self, path):
+		# Indexes a file or the files of a folder, returns False if path
+		# does not exist. Called with the lock held.
+		if os.path.isdir(path):
+			for root, dirs, names in os.walk(path):
+				for name in names:
+					try:
+						fn = os.path.join(root, name)
+						st = os.lstat(fn)
+						self.insert(fn, st.st_ctime, st.st_size)
+					except OSError:
+						pass
+			return True
+		try:
+			st = os.lstat(path)
+		except OSError:
+			return False
+		self.insert(path, st.st_ctime, st.st_size)
+		return True
+
+	def remove(self, *paths):
+		# Forgets files or folders removed from the trash, along with the files
+		# next to them that share their name (the .ap, .cuts, ... of a recording).
+		with self.lock:
+			if self.heap is None:
+				return
+			prefixes = tuple([x.rstrip("/") + "/" for x in paths] + [x.rstrip("/") + "." for x in paths])
+			for fn in [x for x in self.files if x in paths or x.startswith(prefixes)]:
+				self.discard(fn)
+
+	def getSize(self):
+		self.check()
+		with self.lock:
+			return self.size
+
+	def purge(self, ctimeLimit, bytesToRemove, erase, keep=()):
+		# Erases the files deleted before ctimeLimit and then the oldest ones
+		# until bytesToRemove bytes are freed. erase(path) does the actual
+		# removal, files named in keep are left alone. Returns the remaining
+		# size of the trash.
+		self.check()
+		with self.lock:
+			kept = []
+			while self.heap and (self.heap[0][0] < ctimeLimit or bytesToRemove >= 0):
+				(ctime, size, path) = heappop(self.heap)
+				if self.files.get(path) != (ctime, size):
+					continue  # Stale, the file was removed or replaced.
+				if os.path.basename(path) in keep:
+					kept.append((ctime, size, path))
+					continue
+				try:
+					st = os.lstat(path)
+				except OSError:
+					self.discard(path)  # Removed by someone else.
+					continue
+				if stat.S_ISDIR(st.st_mode):
+					self.discard(path)
+					continue
+				if (st.st_ctime, st.st_size) != (ctime, size):
+					self.insert(path, st.st_ctime, st.st_size)
+					continue
+				try:
+					erase(path)
+				except Exception as e:
+					print("[TrashIndex] Failed to erase %s:" % path, e)
+				self.discard(path)
+				if os.path.dirname(path) != self.trash:
+					self.emptied.add(os.path.dirname(path))
+				bytesToRemove -= size
+			for entry in kept:
+				heappush(self.heap, entry)
+			return self.size
+
+	def clear(self):
+		with self.lock:
+			self.heap = None
+			self.files = {}
+			self.entries = {}
+			self.size = 0
+			self.mtime = None
+			self.emptied = set()
+
+indexes = {}
+indexesLock = threading.Lock()
+
+def getTrashIndex(trash):
+	trash = os.path.realpath(trash)
+	with indexesLock:
+		index = indexes.get(trash)
+		if index is None:
+			index = indexes[trash] = TrashIndex(trash)
+		return index
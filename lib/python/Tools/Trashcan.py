@@ -9,6 +9,7 @@ from Components import Harddisk
 from twisted.internet import threads
 from Components.GUIComponent import GUIComponent
 from Components.VariableText import VariableText
+from Tools.TrashIndex import getTrashIndex
 import Components.Task
 
 def getTrashFolder(path=None):
@@ -42,6 +43,22 @@ def createTrashFolder(path=None):
 	else:
 		return None
 
+def trashed(path, size=None):
+	# Called for files and folders moved into a trash folder. The size is used
+	# when the move runs in the background.
+	if os.path.basename(os.path.dirname(path)) != ".Trash":
+		return
+	trash = getTrashFolder(path)
+	if trash and os.path.dirname(os.path.realpath(path)) == trash:
+		getTrashIndex(trash).add(os.path.realpath(path), size)
+
+def removedFromTrash(*paths):
+	if "/.Trash/" not in paths[0]:
+		return
+	trash = getTrashFolder(paths[0])
+	if trash:
+		getTrashIndex(trash).remove(*[os.path.realpath(x) for x in paths])
+
 def get_size(start_path = '.'):
 	total_size = 0
 	if start_path:
@@ -134,6 +151,7 @@ class Trashcan:
 def purge(cleanset, ctimeLimit, reserveBytes):
 	# Remove expired items from trash, and attempt to have
 	# reserveBytes of free disk space.
+	erase = enigma.eBackgroundFileEraser.getInstance().erase
 	for trash in cleanset:
 		if not os.path.isdir(trash):
 			print("[Trashcan] No trash.", trash)
@@ -141,44 +159,15 @@ def purge(cleanset, ctimeLimit, reserveBytes):
 		diskstat = os.statvfs(trash)
 		free = diskstat.f_bfree * diskstat.f_bsize
 		bytesToRemove = reserveBytes - free
-		candidates = []
 		print("[Trashcan] bytesToRemove", bytesToRemove, trash)
-		size = 0
-		for root, dirs, files in os.walk(trash, topdown=False):
-			for name in files:
-				try:
-					fn = os.path.join(root, name)
-					st = os.stat(fn)
-					if st.st_ctime < ctimeLimit:
-						print("[Trashcan] Too old:", name, st.st_ctime)
-						enigma.eBackgroundFileEraser.getInstance().erase(fn)
-						bytesToRemove -= st.st_size
-					else:
-						candidates.append((st.st_ctime, fn, st.st_size))
-						size += st.st_size
-				except Exception as e:
-					print("[Trashcan] Failed to stat %s:"% name, e)
-			# Remove empty directories if possible
-			for name in dirs:
-				try:
-					os.rmdir(os.path.join(root, name))
-				except:
-					pass
-		candidates.sort()
-		# Now we have a list of ctime, candidates, size. Sorted by ctime (=deletion time)
-		print("[Trashcan] Bytes to remove remaining:", bytesToRemove, trash)
-		for st_ctime, fn, st_size in candidates:
-			if bytesToRemove < 0:
-				break
-			enigma.eBackgroundFileEraser.getInstance().erase(fn)
-			bytesToRemove -= st_size
-			size -= st_size
+		size = getTrashIndex(trash).purge(ctimeLimit, bytesToRemove, erase)
 		print("[Trashcan] Size after purging:", size, trash)
 
 def cleanAll(trash):
 	if not os.path.isdir(trash):
 		print("[Trashcan] No trash.", trash)
 		return 0
+	getTrashIndex(trash).clear()
 	for root, dirs, files in os.walk(trash, topdown=False):
 		for name in files:
 			fn = os.path.join(root, name)
@@ -226,51 +215,18 @@ class CleanTrashTask(Components.Task.PythonTask):
 				matches.append(os.path.join(mount, 'movie/.Trash'))
 
 		print("[Trashcan] found following trashcan's:", matches)
-		if len(matches):
-			for trashfolder in matches:
-				print("[Trashcan] looking in trashcan", trashfolder)
-				trashsize = get_size(trashfolder)
-				diskstat = os.statvfs(trashfolder)
-				free = diskstat.f_bfree * diskstat.f_bsize
-				bytesToRemove = self.reserveBytes - free
-				print("[Trashcan] " + str(trashfolder) + ": Size:", trashsize)
-				candidates = []
-				size = 0
-				for root, dirs, files in os.walk(trashfolder, topdown=False):
-					for name in files:
-# Don't delete any per-directory config files from .Trash if the option is in use
-						if (config.movielist.settings_per_directory.value and name == ".e2settings.pkl"):
-							continue
-						try:
-							fn = os.path.join(root, name)
-							st = os.stat(fn)
-							if st.st_ctime < self.ctimeLimit:
-								enigma.eBackgroundFileEraser.getInstance().erase(fn)
-								bytesToRemove -= st.st_size
-							else:
-								candidates.append((st.st_ctime, fn, st.st_size))
-								size += st.st_size
-						except Exception as e:
-							print("[Trashcan] Failed to stat %s:"% name, e)
-					# Remove empty directories if possible
-					for name in dirs:
-						try:
-							os.rmdir(os.path.join(root, name))
-						except:
-							pass
-					candidates.sort()
-					# Now we have a list of ctime, candidates, size. Sorted by ctime (=deletion time)
-					for st_ctime, fn, st_size in candidates:
-						if bytesToRemove < 0:
-							break
-						try:
-							# somtimes the file does not exist, can happen if trashcan is on a network, the main box could also be emptying trash at same time.
-							enigma.eBackgroundFileEraser.getInstance().erase(fn)
-						except:
-							pass
-						bytesToRemove -= st_size
-						size -= st_size
-					print("[Trashcan] " + str(trashfolder) + ": Size now:", size)
+		# Don't delete any per-directory config files from .Trash if the option is in use
+		keep = config.movielist.settings_per_directory.value and (".e2settings.pkl",) or ()
+		erase = enigma.eBackgroundFileEraser.getInstance().erase
+		for trashfolder in matches:
+			print("[Trashcan] looking in trashcan", trashfolder)
+			diskstat = os.statvfs(trashfolder)
+			free = diskstat.f_bfree * diskstat.f_bsize
+			bytesToRemove = self.reserveBytes - free
+			index = getTrashIndex(trashfolder)
+			print("[Trashcan] " + str(trashfolder) + ": Size:", index.getSize())
+			size = index.purge(self.ctimeLimit, bytesToRemove, erase, keep)
+			print("[Trashcan] " + str(trashfolder) + ": Size now:", size)
 
 class TrashInfo(VariableText, GUIComponent):
 	FREE = 0
@@ -285,8 +241,11 @@ class TrashInfo(VariableText, GUIComponent):
 			self.update(path)
 
 	def update(self, path):
+		trash = getTrashFolder(path)
+		if not trash:
+			return -1
 		try:
-			total_size = get_size(getTrashFolder(path))
+			total_size = getTrashIndex(trash).getSize()
 		except OSError:
 			return -1
 
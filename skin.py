@@ -1,5 +1,6 @@
 import errno
 import xml.etree.cElementTree
+from collections import OrderedDict
 
 from enigma import addFont, eLabel, ePixmap, ePoint, eRect, eSize, eWindow, eWindowStyleManager, eWindowStyleSkinned, getDesktop, gFont, getFontFaces, gRGB
 from os.path import basename, dirname, isfile
@@ -11,6 +12,7 @@ from Components.Sources.Source import ObsoleteSource
 from Tools.Directories import SCOPE_CONFIG, SCOPE_CURRENT_LCDSKIN, SCOPE_CURRENT_SKIN, SCOPE_FONTS, SCOPE_SKIN, resolveFilename, fileExists
 from Tools.Import import my_import
 from Tools.LoadPixmap import LoadPixmap
+from Tools.SkinCache import ScreenDict, SkinCache
 
 DEFAULT_SKIN = SystemInfo["HasFullHDSkinSupport"] and "OctEtFHD/skin.xml" or "PLi-HD/skin.xml"
 EMERGENCY_SKIN = "skin_default/skin.xml"
@@ -23,7 +25,7 @@ SUBTITLE_SKIN = "skin_subtitles.xml"
 GUI_SKIN_ID = 0  # Main frame-buffer.
 DISPLAY_SKIN_ID = 1  # Front panel / display / LCD.
 
-domScreens = {}  # Dictionary of skin based screens.
+domScreens = ScreenDict()  # Dictionary of skin based screens.
 colors = {  # Dictionary of skin color names.
 	"key_back": gRGB(0x00313131),
 	"key_blue": gRGB(0x0018188b),
@@ -41,6 +43,9 @@ parameters = {}  # Dictionary of skin parameters used to modify code behavior.
 setups = {}  # Dictionary of images associated with setup menus.
 switchPixmap = {}  # Dictionary of switch images.
 windowStyles = {}  # Dictionary of window styles for each screen ID.
+skinCache = SkinCache(resolveFilename(SCOPE_CONFIG, "skin.cache"))  # Compiled skin files, see Tools/SkinCache.py.
+embeddedSkins = OrderedDict()  # Parsed embedded skins, the MAX_EMBEDDED_SKINS most recently used.
+MAX_EMBEDDED_SKINS = 100
 
 config.skin = ConfigSubsection()
 skin = resolveFilename(SCOPE_SKIN, DEFAULT_SKIN)
@@ -106,6 +111,7 @@ def InitSkins():
 			result = loadSkin(name, scope=SCOPE_CURRENT_SKIN, desktop=getDesktop(GUI_SKIN_ID), screenID=GUI_SKIN_ID)
 	if result is None:
 		loadSkin(USER_SKIN, scope=SCOPE_CURRENT_SKIN, desktop=getDesktop(GUI_SKIN_ID), screenID=GUI_SKIN_ID)
+	skinCache.save()
 	runCallbacks = True
 
 # Temporary entry point for older versions of mytest.py.
@@ -122,20 +128,17 @@ def loadSkin(filename, scope=SCOPE_SKIN, desktop=getDesktop(GUI_SKIN_ID), screen
 	try:
 		with open(filename, "r") as fd:  # This open gets around a possible file handle leak in Python's XML parser.
 			try:
-				domSkin = xml.etree.cElementTree.parse(fd).getroot()
+				domSkin, screens = skinCache.get(fd, filename)  # The skin without its screens, parsed only if the cache is out of date.
 				# print("[Skin] DEBUG: Extracting non screen blocks from '%s'.  (scope='%s')" % (filename, scope))
 				# For loadSingleSkinData colors, bordersets etc. are applied one after
 				# the other in order of ascending priority.
 				loadSingleSkinData(desktop, screenID, domSkin, filename, scope=scope)
+				for name, scrnID, element in screens:  # Process all screen elements.
+					if scrnID is None or scrnID == screenID:  # If there is a screen ID is it for this display.
+						# print("[Skin] DEBUG: Extracting screen '%s' from '%s'.  (scope='%s')" % (name, filename, scope))
+						domScreens.setCompiled(name, element, "%s/" % dirname(filename))
 				for element in domSkin:
-					if element.tag == "screen":  # Process all screen elements.
-						name = element.attrib.get("name", None)
-						if name:  # Without a name, it's useless!
-							scrnID = element.attrib.get("id", None)
-							if scrnID is None or scrnID == screenID:  # If there is a screen ID is it for this display.
-								# print("[Skin] DEBUG: Extracting screen '%s' from '%s'.  (scope='%s')" % (name, filename, scope))
-								domScreens[name] = (element, "%s/" % dirname(filename))
-					elif element.tag == "windowstyle":  # Process the windowstyle element.
+					if element.tag == "windowstyle":  # Process the windowstyle element.
 						scrnID = element.attrib.get("id", None)
 						if scrnID is not None:  # Without an scrnID, it is useless!
 							scrnID = int(scrnID)
@@ -173,6 +176,7 @@ def loadSkin(filename, scope=SCOPE_SKIN, desktop=getDesktop(GUI_SKIN_ID), screen
 	return False
 
 def reloadSkins():
+	clearParseCaches()
 	domScreens.clear()
 	colors.clear()
 	colors = {
@@ -228,6 +232,67 @@ def getParentSize(object, desktop):
 			return desktop.size()  # Widget has no parent, use desktop size instead for relative coordinates.
 	return eSize()
 
+# Memo of the results of the parse functions below.  The same colors, fonts and
+# coordinates are parsed for nearly every widget of every screen.  The results
+# depend on the named colors and fonts and on the desktop size, so the caches
+# are cleared whenever skin data is (re)loaded.  A cache that gets full is
+# simply cleared.
+#
+class ParseCache:
+	def __init__(self, name, maxSize=1024):
+		self.name = name
+		self.maxSize = maxSize
+		self.entries = {}
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, key):
+		try:
+			result = self.entries[key]
+		except KeyError:
+			self.misses += 1
+			return None
+		self.hits += 1
+		return result
+
+	def put(self, key, result):
+		if len(self.entries) >= self.maxSize:
+			self.entries.clear()
+		self.entries[key] = result
+		return result
+
+	def clear(self):
+		self.entries.clear()
+
+	def __call__(self, function):  # Decorator, calls with keyword or unhashable arguments are not cached.
+		def memoized(*args, **kwargs):
+			if kwargs:
+				return function(*args, **kwargs)
+			try:
+				result = self.get(args)
+			except TypeError:
+				return function(*args)
+			if result is None:
+				result = self.put(args, function(*args))
+			return result
+		memoized.__name__ = function.__name__
+		memoized.__doc__ = function.__doc__
+		return memoized
+
+colorCache = ParseCache("color")
+fontCache = ParseCache("font")
+coordinateCache = ParseCache("coordinate", 4096)
+valuePairCache = ParseCache("valuepair", 4096)
+parseCaches = (colorCache, fontCache, coordinateCache, valuePairCache)
+
+def clearParseCaches():
+	for cache in parseCaches:
+		cache.clear()
+
+def getParseCacheStats():
+	return dict([(cache.name, {"hits": cache.hits, "misses": cache.misses, "size": len(cache.entries)}) for cache in parseCaches])
+
+@colorCache
 def parseColor(value):
 	if value[0] != "#":
 		try:
@@ -258,6 +323,7 @@ def parseColor(value):
 #         h      : Multiply by current font height. (Only to be used in elements where the font attribute is available, i.e. not "None")
 #         f      : Replace with getSkinFactor().
 #
+@coordinateCache
 def parseCoordinate(value, parent, size=0, font=None):
 	value = value.strip()
 	if value == "center":  # For speed as this can be common case.
@@ -301,6 +367,7 @@ def parseCoordinate(value, parent, size=0, font=None):
 		result = 0
 	return result
 
+@fontCache
 def parseFont(value, scale=((1, 1), (1, 1))):
 	if ";" in value:
 		(name, size) = value.split(";")
@@ -370,10 +437,14 @@ def parseValuePair(value, scale, object=None, desktop=None, size=None):
 	parentsize = eSize()
 	if object and ("c" in xValue or "c" in yValue or "e" in xValue or "e" in yValue or "%" in xValue or "%" in yValue):  # Need parent size for 'c', 'e' and '%'.
 		parentsize = getParentSize(object, desktop)
-	xValue = parseCoordinate(xValue, parentsize.width(), size and size.width() or 0)
-	yValue = parseCoordinate(yValue, parentsize.height(), size and size.height() or 0)
-	# print("[Skin] DEBUG: Scale pair X %d -> %d, Y %d -> %d." % (xValue, int(xValue * scale[0][0] / scale[0][1]), yValue, int(yValue * scale[1][0] / scale[1][1])))
-	return (int(xValue * scale[0][0] / scale[0][1]), int(yValue * scale[1][0] / scale[1][1]))
+	key = (value, tuple(map(tuple, scale)), parentsize.width(), parentsize.height(), size and size.width() or 0, size and size.height() or 0)
+	result = valuePairCache.get(key)
+	if result is None:
+		xValue = parseCoordinate(xValue, key[2], key[4])
+		yValue = parseCoordinate(yValue, key[3], key[5])
+		# print("[Skin] DEBUG: Scale pair X %d -> %d, Y %d -> %d." % (xValue, int(xValue * scale[0][0] / scale[0][1]), yValue, int(yValue * scale[1][0] / scale[1][1])))
+		result = valuePairCache.put(key, (int(xValue * scale[0][0] / scale[0][1]), int(yValue * scale[1][0] / scale[1][1])))
+	return result
 
 def loadPixmap(path, desktop):
 	option = path.find("#")
@@ -753,6 +824,7 @@ def loadSingleSkinData(desktop, screenID, domSkin, pathSkin, scope=SCOPE_CURRENT
 	"""Loads skin data like colors, windowstyle etc."""
 	assert domSkin.tag == "skin", "root element in skin must be 'skin'!"
 	global colors, fonts, menus, parameters, setups, switchPixmap
+	clearParseCaches()  # Colors, fonts or the resolution may change.
 	for tag in domSkin.findall("output"):
 		scrnID = int(tag.attrib.get("id", GUI_SKIN_ID))
 		if scrnID == GUI_SKIN_ID:
@@ -1116,7 +1188,7 @@ def readSkin(screen, skin, names, desktop):
 		print("[Skin] Parsing embedded skin '%s'." % name)
 		if isinstance(skin, tuple):
 			for s in skin:
-				candidate = xml.etree.cElementTree.fromstring(s)
+				candidate = parseEmbeddedSkin(s)
 				if candidate.tag == "screen":
 					screenID = candidate.attrib.get("id", None)
 					if (not screenID) or (int(screenID) == DISPLAY_SKIN_ID):
@@ -1125,7 +1197,7 @@ def readSkin(screen, skin, names, desktop):
 			else:
 				print("[Skin] No suitable screen found!")
 		else:
-			myScreen = xml.etree.cElementTree.fromstring(skin)
+			myScreen = parseEmbeddedSkin(skin)
 		if myScreen:
 			screen.parsedSkin = myScreen
 	if myScreen is None:
@@ -1316,6 +1388,20 @@ def readSkin(screen, skin, names, desktop):
 	screen = None
 	usedComponents = None
 
+# Embedded skins are parsed once for all instances of a screen class, the
+# elements are only read by the skin code. Screens that build their skin with
+# "%" formatting produce a new skin string per variant, so only the most
+# recently used ones are kept.
+#
+def parseEmbeddedSkin(skin):
+	element = embeddedSkins.pop(skin, None)
+	if element is None:
+		element = xml.etree.cElementTree.fromstring(skin)
+	embeddedSkins[skin] = element
+	if len(embeddedSkins) > MAX_EMBEDDED_SKINS:
+		embeddedSkins.popitem(last=False)
+	return element
+
 # Return a set of all the widgets found in a screen. Panels will be expanded
 # recursively until all referenced widgets are captured. This code only performs
 # a simple scan of the XML and no skin processing is performed.
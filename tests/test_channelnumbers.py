@@ -0,0 +1,100 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import tests
+
+import Components.ChannelNumbers
+from Components.ChannelNumbers import ChannelNumberIndex
+
+class FakeReference:
+	isDirectory = 1
+	isInvisible = 2
+	isMarker = 4
+
+	def __init__(self, name, flags=0, number=0, children=()):
+		self.name = name
+		self.flags = flags
+		self.number = number
+		self.children = children
+
+	def valid(self):
+		return self.name is not None
+
+	def toCompareString(self):
+		return self.name
+
+	def getChannelNum(self):
+		return self.number
+
+class FakeList:
+	def __init__(self, children):
+		self.children = iter(children)
+
+	def getNext(self):
+		return next(self.children, FakeReference(None))
+
+class FakeServiceCenter:
+	lists = 0
+
+	@classmethod
+	def getInstance(cls):
+		return cls()
+
+	def list(self, ref):
+		FakeServiceCenter.lists += 1
+		return FakeList(ref.children)
+
+# Builds a root of bouquets with continuous numbering, one of them hidden.
+def makeRoot(bouquets, services):
+	children = []
+	number = 1
+	for b in range(bouquets):
+		entries = [FakeReference("marker %d" % b, FakeReference.isMarker), FakeReference("favourite")]
+		for s in range(services):
+			entries.append(FakeReference("service %d.%d" % (b, s), 0, number))
+			number += 1
+		children.append(FakeReference("bouquet %d" % b, FakeReference.isDirectory | (b == 1 and FakeReference.isInvisible), 0, entries))
+	return FakeReference("root", FakeReference.isDirectory, 0, children)
+
+# Looking up many channel numbers and services lists the bouquets once, editing
+# the bouquets or changing the settings directory builds the index again.
+def test_channel_numbers(bouquets = 40, services = 100):
+	Components.ChannelNumbers.eServiceCenter = FakeServiceCenter
+	Components.ChannelNumbers.eServiceReference = FakeReference
+	workdir = tempfile.mkdtemp()
+	try:
+		index = ChannelNumberIndex(workdir)
+		root = makeRoot(bouquets, services)
+		for number in range(1, bouquets * services + 1):
+			found = index.getService(root, number)
+			bouquet = (number - 1) // services
+			if bouquet == 1:
+				if found is not None:
+					raise tests.TestError("number %d found in a hidden bouquet" % number)
+			elif found is None or found[1].toCompareString() != "service %d.%d" % (bouquet, (number - 1) % services):
+				raise tests.TestError("number %d not found in bouquet %d" % (number, bouquet))
+		if index.builds != 1 or FakeServiceCenter.lists != bouquets + 1:
+			raise tests.TestError("%d builds, %d lists for %d lookups" % (index.builds, FakeServiceCenter.lists, bouquets * services))
+		entry = index.getBouquet(root, root.children[5])
+		if entry.offset != 5 * services or entry.services[5 * services + 1].toCompareString() != "service 5.0":
+			raise tests.TestError("wrong bouquet offset %d" % entry.offset)
+		favourite = index.getServiceBouquets(root, FakeReference("favourite"))
+		if len(favourite) != bouquets - 1 or root.children[1] in favourite or index.getServiceBouquets(root, FakeReference("unknown")):
+			raise tests.TestError("wrong bouquets of a service: %d" % len(favourite))
+		if index.getServiceBouquets(root, FakeReference("service 7.3")) != [root.children[7]]:
+			raise tests.TestError("service not found in its bouquet")
+
+		index.invalidate()
+		index.getService(root, 1)
+		os.mkdir(os.path.join(workdir, "changed"))
+		os.utime(workdir, (0, 0))
+		index.getService(root, 1)
+		if index.builds != 3:
+			raise tests.TestError("index not built again after a change, %d builds" % index.builds)
+	finally:
+		shutil.rmtree(workdir)
+
+test_channel_numbers()
@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+import tests
+
+from Components.config import config, getNotifierStats, ConfigSubsection, ConfigSubList, ConfigYesNo, ConfigInteger, ConfigText, ConfigSelection
+
+# Builds a settings file similar to the one of a box with a few tuners, many
+# LNBs and satellites and a bunch of plugins.
+def make_settings(lines):
+	result = []
+	i = 0
+	while len(result) < lines:
+		result.append("config.Nims.%d.advanced.lnb.%d.lof=universal_lnb\n" % (i % 8, i % 64))
+		result.append("config.Nims.%d.advanced.sat.%d.lnb=%d\n" % (i % 8, i * 7 % 3600, i % 64))
+		result.append("config.plugins.Plugin%d.enabled=true\n" % (i % 200))
+		result.append("config.plugins.Plugin%d.setting%d=value %d\n" % (i % 200, i, i))
+		result.append("config.misc.entry%d=%d\n" % (i, i))
+		i += 1
+	return "".join(sorted(result[:lines]))
+
+def test_config_benchmark(lines = 5000, saves = 200):
+	workdir = tempfile.mkdtemp()
+	try:
+		filename = os.path.join(workdir, "settings")
+		with open(filename, "w") as f:
+			f.write(make_settings(lines))
+
+		start = time.time()
+		config.loadFromFile(filename)
+		load = time.time() - start
+
+		config.misc.entry1 = ConfigInteger(default = 0, limits = (0, 100000))
+		config.plugins = ConfigSubsection()
+		config.plugins.Plugin1 = ConfigSubsection()
+		config.plugins.Plugin1.enabled = ConfigYesNo(default = False)
+		config.Nims = ConfigSubList()
+		config.Nims.append(ConfigSubsection())
+		config.Nims[0].name = ConfigText(default = "")
+		config.Nims[0].mode = ConfigSelection(default = "off", choices = ["off", "on"])
+		if config.misc.entry1.value != 1 or config.plugins.Plugin1.enabled.value is not True:
+			raise tests.TestError("settings not applied")
+
+		config.save()
+		config.saveToFile(filename)  # Elements added after loading.
+		mtime = os.stat(filename).st_mtime
+		start = time.time()
+		for i in range(saves):
+			config.plugins.Plugin1.enabled.save()
+			config.saveToFile(filename)
+		unchanged = (time.time() - start) / saves
+		if os.stat(filename).st_mtime != mtime:
+			raise tests.TestError("unchanged settings were written")
+
+		start = time.time()
+		for i in range(saves):
+			config.Nims[0].name.value = "tuner %d" % i
+			config.Nims[0].name.save()
+			config.saveToFile(filename)
+		changed = (time.time() - start) / saves
+		if "config.Nims.0.name=tuner %d\n" % (saves - 1) not in open(filename).read():
+			raise tests.TestError("changed setting was not written")
+
+		with open(filename + ".update", "w") as f:
+			f.write("config.misc.entry1=42\nconfig.Nims.0.mode=on\n")
+		config.loadFromFile(filename + ".update", base_file = False)
+		if str(config.misc.entry1.value) != "42" or config.Nims[0].mode.value != "on":
+			raise tests.TestError("settings update not applied")
+
+		print("[test_config] benchmark: %d lines, load %.3fs, unchanged save %.6fs, changed save %.6fs" % (lines, load, unchanged, changed))
+	finally:
+		shutil.rmtree(workdir)
+
+def test_config_batch():
+	calls = []
+
+	def notifier(configElement):
+		calls.append(configElement.value)
+
+	config.batchtest = ConfigSubsection()
+	config.batchtest.value = ConfigInteger(default = 0, limits = (0, 100))
+	config.batchtest.value.addNotifier(notifier, initial_call = False)
+	with config.batch():
+		for i in range(100):
+			config.batchtest.value.value = i
+		if calls:
+			raise tests.TestError("notifier called inside a batch")
+	if calls != [99]:
+		raise tests.TestError("batched notifier calls %s instead of [99]" % calls)
+	if not [x for x in getNotifierStats() if x[0].endswith(".notifier") and x[1] == 1]:
+		raise tests.TestError("notifier call not counted")
+
+test_config_benchmark()
+test_config_batch()
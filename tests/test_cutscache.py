@@ -0,0 +1,74 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import struct
+import tempfile
+import tests
+
+from Tools.CutsCache import CutsCache, decodeCuts, encodeCuts, CUT_TYPE_IN, CUT_TYPE_OUT, CUT_TYPE_MARK, CUT_TYPE_LAST
+
+# Decodes .cuts data written the way the C++ side writes it, then checks the
+# last stop position and that a file is only read again after it changed.
+def test_cuts_cache():
+	cuts = [(90000, CUT_TYPE_IN), (450000, CUT_TYPE_MARK), (900000, CUT_TYPE_LAST), (2700000, CUT_TYPE_OUT), (1 << 40, CUT_TYPE_MARK)]
+	data = b"".join([struct.pack(">QI", pts, cutType) for (pts, cutType) in cuts])
+	if decodeCuts(data) != cuts:
+		raise tests.TestError("cuts decoded as %s" % decodeCuts(data))
+	if decodeCuts(data + b"\0\0\0") != cuts:
+		raise tests.TestError("truncated record not ignored")
+	if decodeCuts(b"") != []:
+		raise tests.TestError("empty file not decoded as no cuts")
+	if encodeCuts(cuts) != data:
+		raise tests.TestError("cuts encoded differently")
+
+	workdir = tempfile.mkdtemp()
+	try:
+		path = os.path.join(workdir, "movie.ts.cuts")
+		with open(path, "wb") as f:
+			f.write(data)
+		cache = CutsCache()
+		if cache.getLastPosition(path) != 900000:
+			raise tests.TestError("last position %s" % cache.getLastPosition(path))
+		if cache.getCuts(path) != cuts:
+			raise tests.TestError("cached cuts %s" % cache.getCuts(path))
+		cache.getCuts(path).append((0, CUT_TYPE_MARK))
+		if cache.getCuts(path) != cuts:
+			raise tests.TestError("cached cuts changed through a returned list")
+
+		# A write through the cache is seen at once, even with the same mtime and size.
+		moved = [(pts, cutType) for (pts, cutType) in cuts if cutType != CUT_TYPE_LAST] + [(1800000, CUT_TYPE_LAST)]
+		cache.write(path, moved)
+		if cache.getLastPosition(path) != 1800000 or cache.getCuts(path) != moved:
+			raise tests.TestError("write not seen: last position %s" % cache.getLastPosition(path))
+		with open(path, "rb") as f:
+			if decodeCuts(f.read()) != moved:
+				raise tests.TestError("written cuts differ")
+
+		# A write behind the back of the cache is noticed by the size change.
+		with open(path, "wb") as f:
+			f.write(encodeCuts([(180000, CUT_TYPE_MARK)]))
+		if cache.getLastPosition(path) is not None:
+			raise tests.TestError("changed file not read again")
+		os.remove(path)
+		try:
+			cache.get(path)
+		except (IOError, OSError):
+			pass
+		else:
+			raise tests.TestError("removed file still answered from the cache")
+
+		# The cache is bounded.
+		cache.MaxEntries = 10
+		for i in range(20):
+			name = os.path.join(workdir, "%d.cuts" % i)
+			with open(name, "wb") as f:
+				f.write(data)
+			cache.getLastPosition(name)
+		if len(cache.entries) != 10 or os.path.join(workdir, "9.cuts") in cache.entries:
+			raise tests.TestError("least recently used entries not dropped")
+	finally:
+		shutil.rmtree(workdir)
+
+test_cuts_cache()
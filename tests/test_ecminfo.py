@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import tests
+
+import Tools.GetEcmInfo
+from Tools.GetEcmInfo import EcmInfoWatcher, EcmPoll, GetEcmInfo, openInotify, readInotifyNames, EMPTY_ECM_INFO
+
+OSCAM = "caid: 0x0963\npid: 0x0065\nprov: 0x000000\nreader: sky\nfrom: 192.168.1.2\nprotocol: cccam\nhops: 1\necm time: 0.250\n"
+
+def write(filename, text, mtime):
+	with open(filename, "w") as f:
+		f.write(text)
+	os.utime(filename, (mtime, mtime))
+
+# Many readers of an unchanged file share one parsed snapshot, a change is
+# read once and pushed to the subscribers.
+def test_ecm_info(readers = 20):
+	workdir = tempfile.mkdtemp()
+	try:
+		filename = os.path.join(workdir, "ecm.info")
+		watcher = Tools.GetEcmInfo.ecmWatcher = EcmInfoWatcher(filename)
+		ecmdata = [GetEcmInfo() for i in range(readers)]
+		if ecmdata[0].getEcmData() != EMPTY_ECM_INFO:
+			raise tests.TestError("missing file not reported as empty")
+		write(filename, OSCAM, 1000000)
+		results = [x.getEcmData() for x in ecmdata for i in range(5)]
+		if [x for x in results if x is not results[0]] or watcher.reads != 1:
+			raise tests.TestError("readers did not share the parsed file, %d reads" % watcher.reads)
+		if results[0] != ("sky @1 (0.250s)", "0x0963", "0x000000", "0x0065"):
+			raise tests.TestError("ecm info parsed wrong: %s" % (results[0],))
+		if not ecmdata[0].getEcm()[0] or ecmdata[0].getEcm()[0]:
+			raise tests.TestError("new ecm not reported exactly once")
+
+		pushed = []
+		watcher.start = watcher.stop = lambda: None
+		watcher.subscribe(pushed.append)
+		write(filename, OSCAM.replace("sky", "cable"), 1000005)
+		if ecmdata[0].getEcmData() is not results[0]:
+			raise tests.TestError("subscribed watcher read the file on request")
+		watcher.refresh()
+		if len(pushed) != 1 or ecmdata[0].getEcmData()[0] != "cable @1 (0.250s)" or watcher.reads != 2:
+			raise tests.TestError("change not pushed to the subscriber")
+		if ecmdata[0].getInfo("ecminterval1") != "5":
+			raise tests.TestError("wrong ecm interval: %s" % ecmdata[0].getInfo("ecminterval1"))
+		os.remove(filename)
+		watcher.refresh()
+		if len(pushed) != 2 or pushed[1].data != EMPTY_ECM_INFO:
+			raise tests.TestError("removed file not pushed")
+
+		# Converters are subscribed while they are shown.
+		class Converter(EcmPoll):
+			CHANGED_POLL = 4
+			def __init__(self):
+				EcmPoll.__init__(self)
+				self.changes = 0
+			def changed(self, what):
+				self.changes += 1
+		converter = Converter()
+		converter.doSuspend(False)
+		write(filename, OSCAM, 1000010)
+		watcher.refresh()
+		converter.doSuspend(True)
+		write(filename, OSCAM.replace("sky", "cable"), 1000015)
+		watcher.refresh()
+		if converter.changes != 1:
+			raise tests.TestError("converter changed %d times for one ECM while shown" % converter.changes)
+		converter.doSuspend(False)
+		converter.destroy()
+		if watcher.subscribers != [pushed.append]:
+			raise tests.TestError("converter still subscribed after destroy()")
+
+		fd = openInotify(workdir)
+		if fd is not None:
+			try:
+				write(filename, OSCAM, 1000020)
+				if "ecm.info" not in readInotifyNames(fd):
+					raise tests.TestError("inotify event not seen")
+			finally:
+				os.close(fd)
+	finally:
+		shutil.rmtree(workdir)
+
+test_ecm_info()
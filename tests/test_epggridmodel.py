@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import tests
+
+from Plugins.Extensions.GraphMultiEPG.EpgGridModel import EPGGridModel
+
+class FakeEPGCache:
+	def __init__(self):
+		self.lookups = 0
+		self.services = 0
+
+	def lookupEvent(self, query):
+		# One event per hour for odd services, a None row for even ones.
+		self.lookups += 1
+		result = []
+		for (service, dummy, start, duration) in query[1:]:
+			self.services += 1
+			number = int(service.split(":")[1])
+			if number % 2:
+				for begin in range(start - start % 3600, start + duration * 60, 3600):
+					result.append((service, "Service %d" % number, begin // 3600, "Event", begin, 3600))
+			else:
+				result.append((service, "Service %d" % number, None, None, None, None))
+		return result
+
+# Paging through a bouquet looks up every (service, time slice) block once,
+# paging back is served from memory and the least recently used blocks go.
+def test_epg_grid_model(services = 200, page = 10):
+	epgcache = FakeEPGCache()
+	model = EPGGridModel(epgcache)
+	refs = ["1:%d:0" % x for x in range(services)]
+	start = 1000 * 3600
+	for offs in (0, 1, 2, 1, 0):
+		for first in range(0, services, page):
+			blocks = model.getBlocks(refs[first:first + page], start + offs * 7200, 120)
+			if [x[0] for x in blocks] != refs[first:first + page]:
+				raise tests.TestError("blocks in the wrong order")
+	if epgcache.services != 3 * services or epgcache.lookups != 3 * services // page:
+		raise tests.TestError("%d services looked up in %d lookups" % (epgcache.services, epgcache.lookups))
+	blocks = model.getBlocks(refs[:2], start, 120)
+	if blocks[0][2] is not None or len(blocks[1][2]) != 2 or blocks[1][1] != "Service 1":
+		raise tests.TestError("events grouped wrong: %s" % (blocks,))
+	stats = model.getStats()
+	if stats[0] != 5 * services // page + 1 or stats[2] != 3 * services:
+		raise tests.TestError("wrong stats: %s" % (stats,))
+
+	model.MaxBlocks = 50
+	model.prefetch(refs[:100], start + 5 * 7200, 120)
+	if len(model.blocks) != 50:
+		raise tests.TestError("%d blocks kept" % len(model.blocks))
+	before = epgcache.services
+	model.getBlocks(refs[50:100], start + 5 * 7200, 120)
+	model.getBlocks(refs[:10], start + 5 * 7200, 120)
+	if epgcache.services - before != 10:
+		raise tests.TestError("least recently used blocks not dropped")
+
+	# Revisiting a page whose blocks are at the head of the LRU must not
+	# evict them while the missing ones are added.
+	model = EPGGridModel(FakeEPGCache())
+	model.MaxBlocks = 20
+	model.getBlocks(refs[:10], start, 60)
+	model.getBlocks(refs[10:20], start, 60)
+	model.getBlocks(refs[20:25], start, 60)
+	blocks = model.getBlocks(refs[:10], start, 60)
+	if [x[0] for x in blocks] != refs[:10] or len(model.blocks) != 20:
+		raise tests.TestError("page blocks evicted while looking it up")
+	blocks = model.getBlocks(refs[:30], start, 60)  # a page larger than the cache
+	if [x[0] for x in blocks] != refs[:30] or len(model.blocks) != 30:
+		raise tests.TestError("blocks of a large page evicted")
+
+test_epg_grid_model()
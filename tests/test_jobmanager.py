@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import tests
+
+from Components.Task import Job, JobManager, RESOURCE_DISK, RESOURCE_CPU, RESOURCE_NETWORK
+
+class FakeJob(Job):
+	def start(self, callback):
+		self.callback = callback
+
+	def finish(self):
+		callback = self.callback
+		self.callback = None
+		callback(self, None, [])
+
+def running(manager):
+	return sorted(job.name for job in manager.running_jobs)
+
+def test_job_manager():
+	# One job at a time by default, in order of priority.
+	manager = JobManager()
+	low = FakeJob("low", RESOURCE_DISK, Job.PRIORITY_LOW)
+	normal = FakeJob("normal", RESOURCE_CPU)
+	high = FakeJob("high", RESOURCE_NETWORK, Job.PRIORITY_HIGH)
+	first = FakeJob("first", RESOURCE_DISK)
+	manager.AddJob(first)
+	manager.AddJob(low)
+	manager.AddJob(normal)
+	manager.AddJob(high)
+	if [job.name for job in manager.getPendingJobs()] != ["first", "high", "normal", "low"]:
+		raise tests.TestError("jobs not queued by priority: %s" % [job.name for job in manager.getPendingJobs()])
+	for name in ("first", "high", "normal", "low"):
+		if running(manager) != [name]:
+			raise tests.TestError("%s running instead of %s" % (running(manager), name))
+		manager.running_jobs[0].finish()
+	if manager.getPendingJobs():
+		raise tests.TestError("jobs left after all finished")
+
+	# Jobs of different resource classes run in parallel, up to the limit per class.
+	manager = JobManager()
+	manager.setConcurrency(4)
+	disk1 = FakeJob("disk1", RESOURCE_DISK)
+	disk2 = FakeJob("disk2", RESOURCE_DISK)
+	net1 = FakeJob("net1", RESOURCE_NETWORK)
+	net2 = FakeJob("net2", RESOURCE_NETWORK)
+	net3 = FakeJob("net3", RESOURCE_NETWORK)
+	for job in (disk1, disk2, net1, net2, net3):
+		manager.AddJob(job)
+	if running(manager) != ["disk1", "net1", "net2"]:
+		raise tests.TestError("resource limits not applied: %s" % running(manager))
+	disk1.finish()
+	if running(manager) != ["disk2", "net1", "net2"]:
+		raise tests.TestError("next disk job not started: %s" % running(manager))
+
+	# An exclusive job waits for the running jobs, the jobs queued after it wait for it.
+	manager = JobManager()
+	manager.setConcurrency(4)
+	disk = FakeJob("disk", RESOURCE_DISK)
+	exclusive = FakeJob("exclusive")
+	cpu = FakeJob("cpu", RESOURCE_CPU)
+	for job in (disk, exclusive, cpu):
+		manager.AddJob(job)
+	if running(manager) != ["disk"]:
+		raise tests.TestError("job overtook the exclusive job: %s" % running(manager))
+	disk.finish()
+	if running(manager) != ["exclusive"]:
+		raise tests.TestError("exclusive job not run alone: %s" % running(manager))
+	exclusive.finish()
+	if running(manager) != ["cpu"]:
+		raise tests.TestError("job after the exclusive job not started: %s" % running(manager))
+
+	# A lower priority job does not overtake a blocked higher priority job,
+	# a job of the same priority does.
+	manager = JobManager()
+	manager.setConcurrency(4)
+	disk1 = FakeJob("disk1", RESOURCE_DISK, Job.PRIORITY_HIGH)
+	disk2 = FakeJob("disk2", RESOURCE_DISK, Job.PRIORITY_HIGH)
+	cpu = FakeJob("cpu", RESOURCE_CPU, Job.PRIORITY_HIGH)
+	net = FakeJob("net", RESOURCE_NETWORK)
+	for job in (disk1, disk2, cpu, net):
+		manager.AddJob(job)
+	if running(manager) != ["cpu", "disk1"]:
+		raise tests.TestError("blocked high priority job overtaken: %s" % running(manager))
+	disk1.finish()
+	cpu.finish()
+	if running(manager) != ["disk2", "net"]:
+		raise tests.TestError("queued jobs not started: %s" % running(manager))
+
+	# Lowering the concurrency lets the running jobs finish.
+	manager.setConcurrency(1)
+	waiting = FakeJob("waiting", RESOURCE_CPU)
+	manager.AddJob(waiting)
+	disk2.finish()
+	if running(manager) != ["net"]:
+		raise tests.TestError("job started above the concurrency: %s" % running(manager))
+	net.finish()
+	if running(manager) != ["waiting"]:
+		raise tests.TestError("waiting job not started: %s" % running(manager))
+
+test_job_manager()
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import tempfile
+import tests
+
+import Tools.PixmapCache
+from Tools.PixmapCache import PixmapCache, readFiles
+
+class FakeSize:
+	def __init__(self, width, height):
+		self.w = width
+		self.h = height
+
+	def width(self):
+		return self.w
+
+	def height(self):
+		return self.h
+
+class FakePixmap:
+	def __init__(self, path):
+		self.path = path
+
+	def size(self):
+		return FakeSize(100, 60)  # 24000 bytes
+
+loads = []
+
+def FakeLoadPixmap(path, desktop=None, cached=None):
+	loads.append((path, cached))
+	return FakePixmap(path)
+
+# Pages through picons with a budget of five of them and checks that they are
+# loaded uncached, once while they fit, and that the least recently used ones
+# are evicted.
+def test_pixmap_cache():
+	Tools.PixmapCache.LoadPixmap = FakeLoadPixmap
+	cache = PixmapCache()
+	cache.addScope("picon", 5 * 24000)
+	page = ["/picon/%d.png" % x for x in range(4)]
+	for repaint in range(3):
+		for path in page:
+			cache.load(path, "picon")
+	if len(loads) != 4 or [x for x in loads if x[1] is not False]:
+		raise tests.TestError("picons loaded %d times or cached in C++" % len(loads))
+	for path in ["/picon/%d.png" % x for x in range(4, 8)]:
+		cache.load(path, "picon")
+	(pixmaps, used, budget, hits, misses, evictions, loaded) = cache.getStats()["picon"]
+	if pixmaps != 5 or used > budget or evictions != 3 or "/picon/0.png" in cache.scopes["picon"].entries:
+		raise tests.TestError("%d pixmaps of %d bytes kept, %d evicted" % (pixmaps, used, evictions))
+	if (hits, misses, loaded) != (8, 8, 8 * 24000):
+		raise tests.TestError("%d hits, %d misses and %d bytes counted" % (hits, misses, loaded))
+	if cache.getStats()["thumbnail"][0] or cache.get("/picon/7.png", "thumbnail") is not None:
+		raise tests.TestError("scopes not separated")
+
+	directory = tempfile.mkdtemp()
+	paths = [os.path.join(directory, "%d.png" % x) for x in range(3)]
+	for path in paths[:2]:
+		with open(path, "wb") as f:
+			f.write(b"\0" * 100000)
+	if readFiles(paths) != paths[:2]:
+		raise tests.TestError("missing file not skipped")
+	cache.preloaded(paths[:2], "cover")
+	if cache.get(paths[1], "cover") is None or cache.getStats()["cover"][0] != 2:
+		raise tests.TestError("preloaded covers not cached")
+	for path in paths[:2]:
+		os.remove(path)
+	os.rmdir(directory)
+	cache.invalidate("cover")
+	cache.invalidate(key="/picon/7.png", scope="picon")
+	if cache.getStats()["cover"][:2] != (0, 0) or cache.getStats()["picon"][:2] != (4, 4 * 24000):
+		raise tests.TestError("invalidate() did not drop the pixmaps")
+	print("[test_pixmapcache] %d loads for %d lookups" % (len(loads), hits + misses))
+
+test_pixmap_cache()
@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import tests
+
+from Components.Converter.Poll import Poll, PollScheduler, getPollStats
+import Components.Converter.Poll
+
+class FakeTimer:
+	def __init__(self):
+		self.callback = []
+		self.delay = None
+
+	def start(self, delay, singleshot):
+		self.delay = delay
+
+	def stop(self):
+		self.delay = None
+
+class Poller(Poll):
+	def __init__(self, interval, hidden=False):
+		Poll.__init__(self)
+		self.polls = 0
+		self.hidden = hidden
+		self.poll_interval = interval
+		self.poll_enabled = True
+
+	def poll(self):
+		self.polls += 1
+
+	def pollSuspended(self):
+		return self.hidden
+
+class FailingPoller(Poller):
+	def poll(self):
+		self.polls += 1
+		raise ValueError("broken converter")
+
+# Runs pollers with the usual skin intervals for a minute of fake time and
+# counts the wakeups, which would be one per poll with a timer per poller.
+def test_poll_scheduler(seconds = 60):
+	clock = [1000000]
+	scheduler = Components.Converter.Poll.pollScheduler = PollScheduler()
+	scheduler.timer = FakeTimer()
+	scheduler.now = lambda: clock[0]
+	pollers = [Poller(x) for x in (500, 500, 1000, 1000, 1000, 1500, 1500, 5000, 30000)]
+	hidden = Poller(1000, hidden=True)
+	wakeups = 0
+	end = clock[0] + seconds * 1000
+	while clock[0] + scheduler.timer.delay <= end:
+		clock[0] += scheduler.timer.delay
+		scheduler.run()
+		wakeups += 1
+	for poller in pollers:
+		expected = seconds * 1000 // poller.poll_interval
+		if abs(poller.polls - expected) > 1:
+			raise tests.TestError("%d ms poller polled %d times instead of %d" % (poller.poll_interval, poller.polls, expected))
+	if hidden.polls or not scheduler.skipped:
+		raise tests.TestError("hidden poller was polled")
+	polls = sum([x.polls for x in pollers])
+	if wakeups > seconds * 3:
+		raise tests.TestError("%d wakeups for %d polls" % (wakeups, polls))
+
+	pollers[0].poll_enabled = False
+	del pollers[1]  # Dropped without destroy()
+	before = pollers[0].polls
+	for i in range(10):
+		clock[0] += scheduler.timer.delay
+		scheduler.run()
+	if pollers[0].polls != before or len(scheduler.pollers) != len(pollers):
+		raise tests.TestError("disabled or dropped poller still scheduled")
+	if not [x for x in getPollStats() if x[0] == "Poller"]:
+		raise tests.TestError("poll cost not counted")
+
+	# A poller raising an exception must not stop the others.
+	failing = FailingPoller(500)
+	pollers[0].polls = 0
+	pollers[0].poll_enabled = True
+	for i in range(10):
+		clock[0] += scheduler.timer.delay
+		scheduler.run()
+	if scheduler.timer.delay is None or failing.polls < 5 or pollers[0].polls < 5:
+		raise tests.TestError("failing poller stopped the scheduler")
+	print("[test_poll] %d polls in %d wakeups" % (polls, wakeups))
+
+test_poll_scheduler()
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import time
+import tests
+
+from twisted.internet import reactor
+from Components.Task import Job, PythonTask, AbortedPostcondition
+
+class CountingTask(PythonTask):
+	progressInterval = 0.1
+
+	def work(self):
+		for i in range(100):
+			self.checkCancelled()
+			self.pos = i + 1
+			time.sleep(0.005)
+
+class EndlessTask(PythonTask):
+	def work(self):
+		self.started = True
+		try:
+			while True:
+				self.checkCancelled()
+				time.sleep(0.005)
+		finally:
+			self.stopped = True
+
+# Runs a task assigning its position a hundred times and checks that the
+# updates reach the main loop coalesced and that the final position is
+# pushed, then aborts an endless task and checks that its work stops.
+def test_python_task():
+	results = {}
+	updates = []
+
+	def stop(reason):
+		results["error"] = reason
+		reactor.stop()
+
+	def countingDone(job, task, problems):
+		results["counting"] = (task, problems)
+		job = Job("endless")
+		endless = EndlessTask(job, "endless")
+		endless.started = endless.stopped = False
+		job.start(endlessDone)
+		reactor.callLater(0.1, job.abort)
+		results["endless"] = endless
+
+	def endlessDone(job, task, problems):
+		results["aborted"] = problems
+		reactor.stop()
+
+	def start():
+		job = Job("counting")
+		task = CountingTask(job, "counting")
+		results["task"] = task
+		job.state_changed.append(lambda: updates.append(task.progress))
+		job.start(countingDone)
+
+	reactor.callWhenRunning(start)
+	reactor.callLater(10, stop, "timed out")
+	reactor.run()
+
+	if "error" in results:
+		raise tests.TestError(results["error"])
+	task = results["task"]
+	if results["counting"] != (None, []):
+		raise tests.TestError("task failed: %s" % (results["counting"],))
+	if task.progress != 100:
+		raise tests.TestError("final position not pushed: %s" % task.progress)
+	# Job.state_changed also fires for the job starting and finishing.
+	if not 1 < len(updates) < 50:
+		raise tests.TestError("%d progress updates for 100 positions" % len(updates))
+	endless = results["endless"]
+	if not endless.started or not endless.stopped:
+		raise tests.TestError("aborted work did not stop")
+	if [x.__class__ for x in results["aborted"]] != [AbortedPostcondition]:
+		raise tests.TestError("task not finished as aborted: %s" % results["aborted"])
+	print("[test_pythontask] %d progress updates for 100 positions" % len(updates))
+
+test_python_task()
@@ -0,0 +1,55 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import tests
+
+from time import localtime, strftime
+import Tools.RenderCache
+from Tools.RenderCache import RenderCache, formatTime
+
+# Builds rows of a scrolled list through the cache and checks that only new
+# rows are built, that the least recently used rows are dropped, that
+# formatted times match strftime() and that clearAll() drops both.
+def test_render_cache():
+	cache = RenderCache(maxEntries=10)
+	builds = [0]
+
+	def build(eventId, begin, generation):
+		key = (eventId, begin, generation)
+		res = cache.get(key)
+		if res is not None:
+			return res
+		builds[0] += 1
+		return cache.put(key, [None, formatTime(begin, "%H:%M")])
+
+	for scroll in range(3):
+		for i in range(8):
+			build(i, 1500000000 + i * 1800, 0)
+	if builds[0] != 8:
+		raise tests.TestError("%d rows built instead of 8" % builds[0])
+	build(0, 1500000000, 1)  # timer generation changed
+	if builds[0] != 9:
+		raise tests.TestError("row not rebuilt after a timer change")
+	for i in range(8, 12):
+		build(i, 1500000000 + i * 1800, 0)
+	if len(cache.entries) != 10 or (1, 1500000000 + 1800, 0) in cache.entries:
+		raise tests.TestError("least recently used row not dropped")
+	(entries, hits, misses) = cache.getStats()
+	if hits != 16 or misses != 13:
+		raise tests.TestError("%d hits and %d misses counted" % (hits, misses))
+
+	for t in (0, 1500000000, 1500003600):
+		for format in ("%a %d.%m", "%H:%M -"):
+			if formatTime(t, format) != strftime(format, localtime(t)):
+				raise tests.TestError("formatTime(%d, %s) differs" % (t, format))
+	Tools.RenderCache.timeStrings.clear()
+	for t in range(Tools.RenderCache.MaxTimeStrings + 10):
+		formatTime(t * 60, "%H:%M")
+	if len(Tools.RenderCache.timeStrings) != Tools.RenderCache.MaxTimeStrings:
+		raise tests.TestError("formatted times not bounded")
+	Tools.RenderCache.clearAll()  # The time zone or language changed.
+	if Tools.RenderCache.timeStrings or cache.entries:
+		raise tests.TestError("formatted times or rows kept after clearAll()")
+	print("[test_rendercache] %d rows built for %d paints" % (misses, hits + misses))
+
+test_render_cache()
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+import tests
+
+from Tools.ResumePoints import ResumePointStore
+
+def ref(i):
+	return "1:0:0:0:0:0:0:0:0:0:/media/hdd/movie/movie %d.ts" % i
+
+# Checks that resume points survive a crash (no save()), that the least
+# recently used ones are dropped first and that the log gets compacted.
+def test_resume_points(capacity = 2000, updates = 5000):
+	workdir = tempfile.mkdtemp()
+	try:
+		filename = os.path.join(workdir, "resumepoints.pkl")
+		store = ResumePointStore(filename, capacity)
+		start = time.time()
+		for i in range(updates):
+			store.set(ref(i), i * 90000, i % 3 and 3600 * 90000 or None)
+		elapsed = (time.time() - start) / updates
+		store.touch(ref(updates - capacity))
+		store.set(ref(updates), 1, None)
+		del store[ref(updates - 1)]
+
+		store = ResumePointStore(filename, capacity)  # Reload without saving.
+		if len(store) != capacity - 1:
+			raise tests.TestError("%d resume points instead of %d" % (len(store), capacity - 1))
+		if ref(updates - capacity) not in store or ref(updates - capacity + 1) in store:
+			raise tests.TestError("wrong resume point dropped")
+		if ref(updates - 1) in store or store.get(ref(updates)) is None:
+			raise tests.TestError("log not replayed")
+		entry = store[ref(updates - 2)]
+		if entry[1] != (updates - 2) * 90000 or entry[2] != ((updates - 2) % 3 and 3600 * 90000 or None):
+			raise tests.TestError("resume point changed: %s" % entry)
+		if store.records > ResumePointStore.CompactRecords:
+			raise tests.TestError("log not compacted")
+
+		with open(store.logname, "a") as f:
+			f.write("S 1 2 3 torn")
+		store = ResumePointStore(filename, capacity)
+		if "torn" in [x[-4:] for x in store.keys()] or len(store) != capacity - 1:
+			raise tests.TestError("torn log record applied")
+		store.set(ref(updates + 1), 2, None)  # Appended after the torn record.
+		store = ResumePointStore(filename, capacity)
+		entry = store.get(ref(updates + 1))
+		if entry is None or entry[1:] != [2, None]:
+			raise tests.TestError("record after a torn record lost")
+		with open(store.logname, "r") as f:
+			if [x for x in f if not x.startswith(("S ", "D "))]:
+				raise tests.TestError("torn record left in the log")
+
+		print("[test_resumepoints] benchmark: %d updates, %.6fs per update" % (updates, elapsed))
+	finally:
+		shutil.rmtree(workdir)
+
+test_resume_points()
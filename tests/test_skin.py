@@ -0,0 +1,71 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+import xml.etree.cElementTree
+import tests
+
+from Tools.SkinCache import ScreenDict, SkinCache
+
+def compareElements(a, b):
+	return a.tag == b.tag and a.attrib == b.attrib and a.text == b.text and len(a) == len(b) and all([compareElements(x, y) for (x, y) in zip(a, b)])
+
+# Measures loading skin files without (cold) and with (warm) an up to date
+# compiled skin cache, and checks that the screens come back unchanged.
+def test_skin_cache_benchmark(screens = 3000, widgets = 20, runs = 5):
+	workdir = tempfile.mkdtemp()
+	try:
+		filename = os.path.join(workdir, "skin.xml")
+		with open(filename, "w") as f:
+			f.write('<?xml version="1.0" ?>\n<skin>\n<colors>\n<color name="white" value="#ffffff" />\n</colors>\n')
+			for i in range(screens):
+				f.write('<screen name="Screen%d" position="center,center" size="1280,720" title="Screen %d">\n' % (i, i))
+				for j in range(widgets):
+					f.write('\t<widget source="Source%d" render="Label" position="%d,%d" size="400,30" font="Regular;22" foregroundColor="white">\n' % (j, j, j * 30))
+					f.write('\t\t<convert type="StringList">%d</convert>\n\t</widget>\n' % j)
+				f.write('</screen>\n')
+			f.write('</skin>\n')
+		cachename = os.path.join(workdir, "skin.cache")
+
+		def load():
+			cache = SkinCache(cachename)
+			domScreens = ScreenDict()
+			start = time.time()
+			with open(filename, "r") as fd:
+				root, compiled = cache.get(fd, filename)
+			for name, scrnID, element in compiled:
+				domScreens.setCompiled(name, element, workdir)
+			domScreens.get("Screen0")  # A few screens are used at startup.
+			domScreens.get("Screen1")
+			elapsed = time.time() - start
+			cache.write()  # save() would write it in a thread later on
+			return elapsed, domScreens
+
+		cold = warm = 0
+		for run in range(runs):
+			if os.path.exists(cachename):
+				os.remove(cachename)
+			cold += load()[0]
+			elapsed, domScreens = load()
+			warm += elapsed
+		start = time.time()
+		with open(filename, "r") as fd:
+			parsed = xml.etree.cElementTree.parse(fd).getroot()
+		plain = time.time() - start
+		print("[test_skin] benchmark: %d screens, plain parse %.3fs, cold %.3fs, warm %.3fs" % (screens, plain, cold / runs, warm / runs))
+		if cold / runs > plain * 1.5 + 0.05:
+			raise tests.TestError("loading a skin that is not cached is slower than parsing it")
+
+		original = parsed.findall("screen")[screens // 2]
+		cached = domScreens[original.attrib["name"]][0]
+		if not compareElements(original, cached):
+			raise tests.TestError("cached screen differs from the skin file")
+		if len(domScreens) != screens:
+			raise tests.TestError("screens missing from cached skin")
+	finally:
+		shutil.rmtree(workdir)
+
+test_skin_cache_benchmark()
@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+import tests
+
+from Components.SystemState import SystemState, parseMounts, parseCpuTimes, parseNetDev
+
+MOUNTS = "/dev/sda1 /media/hdd ext4 rw,relatime 0 0\n//nas/movies /media/net/my\\040movies cifs rw 0 0\n"
+STAT = "cpu  100 0 50 800 50 0 0 0 0 0\ncpu0 100 0 50 800 50 0 0 0 0 0\nintr 1 2 3\n"
+NETDEV = "Inter-|   Receive\n face |bytes    packets\n  eth0: 1000 10 0 0 0 0 0 0 2000 20 0 0 0 0 0 0\n"
+
+# Many consumers asking for the same files within a tick share one read, the
+# file is read again after the tick or when invalidated.
+def test_system_state(consumers = 50):
+	workdir = tempfile.mkdtemp()
+	try:
+		mounts = os.path.join(workdir, "mounts")
+		with open(mounts, "w") as f:
+			f.write(MOUNTS)
+		state = SystemState()
+		state.setTick(3600)
+		results = [state.read(mounts, parseMounts) for i in range(consumers)]
+		if [x for x in results if x is not results[0]]:
+			raise tests.TestError("consumers did not share the parsed mounts")
+		if results[0][1][:3] != ["//nas/movies", "/media/net/my movies", "cifs"]:
+			raise tests.TestError("mounts parsed wrong: %s" % results[0])
+		if state.getStats() != [(mounts, consumers, 1)]:
+			raise tests.TestError("read counts wrong: %s" % state.getStats())
+
+		with open(mounts, "a") as f:
+			f.write("/dev/sdb1 /media/usb vfat rw 0 0\n")
+		if len(state.read(mounts, parseMounts)) != 2:
+			raise tests.TestError("snapshot not kept for the tick")
+		state.invalidate(mounts)
+		if len(state.read(mounts, parseMounts)) != 3:
+			raise tests.TestError("invalidated snapshot not read again")
+
+		state.setTick(0.05)
+		state.read(mounts)
+		time.sleep(0.1)
+		state.read(mounts)
+		if state.getStats()[0][2] != 3:
+			raise tests.TestError("snapshot not read again after the tick")
+	finally:
+		shutil.rmtree(workdir)
+
+	if parseCpuTimes(STAT) != [["cpu", 1000, 150], ["cpu0", 1000, 150]]:
+		raise tests.TestError("cpu times parsed wrong: %s" % parseCpuTimes(STAT))
+	if parseNetDev(NETDEV)["eth0"][8] != 2000:
+		raise tests.TestError("network counters parsed wrong: %s" % parseNetDev(NETDEV))
+
+test_system_state()
@@ -72,6 +72,82 @@ def test_timer(repeat = 0, timer_start = 3600, timer_length = 1000, sim_length =
 	if t_initial[3:6] != t_repeated[3:6]:
 		raise tests.TestError("repeated timer time of day does not match")
 
+def test_is_in_timer_order():
+	# isInTimer() reports the time match of the first matching timer in the
+	# order of getAllTimersList(), where fallback timers follow the local ones.
+	import NavigationInstance
+	import xml.etree.cElementTree
+	import RecordTimer
+
+	service = "1:0:1:6DD2:44D:1:C00000:0:0:0:"
+	def create(begin, end):
+		return RecordTimer.createTimer(xml.etree.cElementTree.fromstring(
+		"""<timer begin="%d" end="%d" serviceref="%s" repeated="0" name="Test Event Name"
+			description="Test Event Description" afterevent="nothing" eit="56422" disabled="0" justplay="0">
+		</timer>""" % (begin, end, service)))
+
+	t = NavigationInstance.instance.RecordTimer
+	at = int(time.time()) + 86400
+	local = create(at + 2000, at + 4000)  # records the last part of the event
+	fallback = create(at - 500, at + 1000)  # records the first part of the event
+	t.record(local)
+	t.setFallbackTimerList([fallback])
+	try:
+		result = t.isInTimer(56422, at, 3600, service)
+	finally:
+		t.setFallbackTimerList([])
+		t.removeEntry(local)
+	if result != (1600, [1, 4]):
+		raise tests.TestError("isInTimer() returned %s instead of (1600, [1, 4])" % (result,))
+
+def test_timer_benchmark(entries = 5000, sim_length = 86400):
+	# Drive a bare timer.Timer with many entries through fake time and report
+	# the scheduling overhead (processActivation/calcNextActivation only).
+	import random
+	import fake_time
+	import timer
+
+	class BenchmarkEntry(timer.TimerEntry):
+		def getNextActivation(self):
+			if self.state == self.StateWaiting:
+				return self.begin - self.prepare_time
+			elif self.state == self.StatePrepared:
+				return self.begin
+			return self.end
+
+		def activate(self):
+			return True
+
+	real_time = timer.time
+	timer.time = time.time
+	try:
+		fake_time.setTime(calendar.timegm((2007, 3, 1, 12, 0, 0)))
+		at = time.time()
+		random.seed(entries)
+		t = timer.Timer()
+		for x in range(entries):
+			begin = at + random.randint(timer.Timer.MaxWaitTime, sim_length)
+			entry = BenchmarkEntry(begin, begin + random.randint(60, 7200))
+			if x % 10 == 0:
+				entry.repeated = 0x7f
+				entry.repeatedbegindate = begin
+			t.addTimerEntry(entry, noRecalc = 1)
+		t.timer_list[0].disable()
+
+		cpu = os.times()[0]
+		wakeups = 0
+		while time.time() < at + sim_length + 7200:
+			t.calcNextActivation()
+			wakeups += 1
+			fake_time.setTime(max(time.time() + 1, t.next))
+		cpu = os.times()[0] - cpu
+	finally:
+		timer.time = real_time
+
+	print("[test_timer] benchmark: %d entries, %d wakeups, %.3fs cpu" % (entries, wakeups, cpu))
+	if len(t.processed_timers) < entries * 8 // 10:
+		raise tests.TestError("not all benchmark timers were processed")
+
 # required stuff for timer (we try to keep this minimal)
 enigma.init_nav()
 enigma.init_record_config()
@@ -91,3 +167,6 @@ time.tzset()
 #log(test_timer, test_name = "test_timer_repeating", base_time = calendar.timegm((2007, 3, 1, 12, 0, 0)), repeat=0x7f, sim_length = 86400 * 7)
 log(test_timer, test_name = "test_timer_repeating_dst_skip", base_time = calendar.timegm((2007, 03, 20, 0, 0, 0)), timer_start = 3600, repeat=0x7f, sim_length = 86400 * 7)
 #log(test_timer, test_name = "test_timer_repeating_dst_start", base_time = calendar.timegm((2007, 03, 20, 0, 0, 0)), timer_start = 10000, repeat=0x7f, sim_length = 86400 * 7)
+
+test_is_in_timer_order()
+test_timer_benchmark()
@@ -0,0 +1,167 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import tests
+
+import NavigationInstance
+from Components.config import config, ConfigSubsection, ConfigYesNo
+import RecordTimer  # imports Components.TimerSanityCheck, which imports RecordTimer
+import Components.TimerSanityCheck
+from Components.TimerSanityCheck import TimerSanityCheck, TimerOverlapIndex
+
+class FakeRef:
+	flags = 0
+
+	def __init__(self, sid):
+		self.sid = sid
+
+	def valid(self):
+		return True
+
+	def toString(self):
+		return "1:0:1:%X:1:1:C00000:0:0:0:" % self.sid
+
+	def getPath(self):
+		return ""
+
+	def getUnsignedData(self, x):
+		return x == 1 and self.sid or 1
+
+class FakeServiceRef:
+	def __init__(self, sid):
+		self.ref = FakeRef(sid)
+
+class FakeTimer:
+	def __init__(self, name, begin, end, repeated=0):
+		self.name = name
+		self.begin = begin
+		self.end = end
+		self.repeated = repeated
+		self.disabled = False
+		self.conflict_detection = True
+		self.justplay = False
+		self.record_ecm = False
+		self.descramble = True
+		self.state = 0
+		self.service_ref = FakeServiceRef(len(name))
+
+	def isRunning(self):
+		return False
+
+	def __repr__(self):
+		return self.name
+
+class FakeFrontendData:
+	# All services are on DVB-S tuners.
+	def getFrontendData(self):
+		return {"tuner_type": "DVB-S"}
+
+	def getInfoObject(self, ref, what):
+		return self.getFrontendData()
+
+class FakeServiceCenter:
+	@staticmethod
+	def getInstance():
+		return FakeServiceCenter()
+
+	def info(self, ref):
+		return FakeFrontendData()
+
+class FakeRecording:
+	def __init__(self, navigation):
+		self.navigation = navigation
+
+	def start(self, simulate):
+		self.navigation.recordings += 1
+		return self.navigation.recordings > self.navigation.tuners and -6 or 0
+
+	def frontendInfo(self):
+		return FakeFrontendData()
+
+class FakeNavigation:
+	# Every service needs a tuner of its own.
+	def __init__(self, tuners):
+		self.tuners = tuners
+		self.recordings = 0
+
+	def recordService(self, ref, simulate):
+		return FakeRecording(self)
+
+	def stopRecordService(self, recording):
+		self.recordings -= 1
+
+# Checks a batch of new timers against overlapping, repeated and removed
+# timers with checkBatch() and compares the result with check() of every timer
+# against the full timer list, each accepted timer being added to the list.
+# Then checks that the occurrences of a repeating timer link timers and that
+# only conflicts linked to the new timer are reported with an index.
+def test_timer_sanity_check():
+	if not hasattr(config, "misc"):
+		config.misc = ConfigSubsection()
+	if not hasattr(config.misc, "use_ci_assignment"):
+		config.misc.use_ci_assignment = ConfigYesNo(default=False)
+	NavigationInstance.instance = FakeNavigation(tuners=2)
+	Components.TimerSanityCheck.eServiceCenter = FakeServiceCenter
+
+	day = 86400 * ((2000000000 // 86400) + 1)  # some day in the future
+	hour = 3600
+	timerlist = [
+		FakeTimer("a", day + 20 * hour, day + 21 * hour),
+		FakeTimer("bb", day + 20 * hour + 1800, day + 22 * hour),
+		FakeTimer("ccc", day + 2 * hour, day + 3 * hour, repeated=127),  # daily
+		FakeTimer("dddd", day + 10 * hour, day + 30 * hour),  # long, removed below
+	]
+	index = TimerOverlapIndex(timerlist)
+	longest = index.longest
+	removed = timerlist.pop()
+	index.remove(removed)
+	if index.longest >= longest or index.getOverlapping(day + 25 * hour, day + 26 * hour):
+		raise tests.TestError("index still uses the removed timer")
+
+	newtimers = [
+		FakeTimer("eeeee", day + 20 * hour + 900, day + 20 * hour + 2700),  # third tuner, conflict
+		FakeTimer("ffffff", day + 21 * hour + 1800, day + 23 * hour),  # overlaps only "bb"
+		FakeTimer("ggggggg", day + 22 * hour + 1800, day + 23 * hour + 1800),  # overlaps "ffffff"
+		FakeTimer("hhhhhhhh", day + 22 * hour + 2700, day + 23 * hour),  # third tuner with the new ones
+		FakeTimer("iiiiiiiii", day + 7 * 86400 + 2 * hour, day + 7 * 86400 + 3 * hour),  # with the daily one
+		FakeTimer("jjjjjjjjjj", day + 7 * 86400 + 2 * hour + 600, day + 7 * 86400 + 2 * hour + 1200),  # third tuner with the daily one
+	]
+	conflicts = TimerSanityCheck(timerlist, timerindex=index).checkBatch(newtimers)
+	batch = dict([(timer.name, sorted([x.name for x in simultimer])) for (timer, simultimer) in conflicts])
+
+	single = {}
+	checklist = list(timerlist)
+	for timer in newtimers:
+		check = TimerSanityCheck(checklist, timer)
+		if check.check():
+			checklist.append(timer)
+		else:
+			single[timer.name] = sorted([x.name for x in check.getSimulTimerList()])
+	if batch != single:
+		raise tests.TestError("checkBatch() found %s instead of %s" % (batch, single))
+	if sorted(batch.keys()) != ["eeeee", "hhhhhhhh", "jjjjjjjjjj"]:
+		raise tests.TestError("unexpected conflicts %s" % batch)
+	if len(index) != len(timerlist):
+		raise tests.TestError("checkBatch() changed the index")
+
+	slot = 1800
+	timerlist = [
+		FakeTimer("kkkkkkkkkkk", day + 50 * slot, day + 58 * slot),
+		FakeTimer("kkkkkkkkkkkk", day + 52 * slot, day + 60 * slot),
+		FakeTimer("kkkkkkkkkkkkk", day + 9 * slot, day + 17 * slot, repeated=60),  # also at 57 * slot, third tuner
+		FakeTimer("kkkkkkkkkkkkkk", day + 32 * slot, day + 38 * slot),
+	]
+	newtimer = FakeTimer("kkkkkkkkkkkkkkk", day + 3 * slot, day + 9 * slot)
+	full = TimerSanityCheck(timerlist, newtimer)
+	indexed = TimerSanityCheck(timerlist, newtimer, timerindex=TimerOverlapIndex(timerlist))
+	if full.check() or indexed.check() or full.getSimulTimerList() != indexed.getSimulTimerList():
+		raise tests.TestError("timers linked by a repeating timer not checked")
+	if len(indexed.getCheckTimerlist()) != 3:
+		raise tests.TestError("unlinked timer checked: %s" % indexed.getCheckTimerlist())
+	timerlist[2] = FakeTimer("kkkkkkkkkkkkk", day + 54 * slot, day + 56 * slot)  # third tuner, not linked
+	newtimer = FakeTimer("kkkkkkkkkkkkkkk", day + 3 * slot, day + 9 * slot)
+	if TimerSanityCheck(timerlist, newtimer).check() or not TimerSanityCheck(timerlist, newtimer, timerindex=TimerOverlapIndex(timerlist)).check():
+		raise tests.TestError("unlinked conflict reported with an index")
+	print("[test_timersanitycheck] conflicts:", batch)
+
+test_timer_sanity_check()
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import tests
+
+from Tools.TimerStore import TimerStore
+
+class Timer:
+	def __init__(self, name):
+		self.name = name
+
+def fragment(name, begin):
+	return '\t<timer begin="%d" name="%s">\n\t\t<log code="0" time="%d">%s log</log>\n\t</timer>\n' % (begin, name, begin, name)
+
+def loaded(filename):
+	return [(x.get("name"), x.get("begin"), [log.text for log in x.findall("log")]) for x in TimerStore(filename).load()]
+
+# Adds, modifies and deletes timers through the journal and reloads them with
+# a new store, then checks that a deleted or replaced timer file is written
+# again and that a stale cache or journal of a replaced timer file is ignored.
+def test_timer_store():
+	directory = tempfile.mkdtemp()
+	filename = os.path.join(directory, "timers.xml")
+	try:
+		store = TimerStore(filename)
+		(a, b, c) = (Timer("a"), Timer("b"), Timer("c"))
+		store.save([(a, fragment("a", 100)), (b, fragment("b", 200))], journal=True)
+		written = open(filename).read()
+		store.save([(a, fragment("a", 100)), (b, fragment("b", 250)), (c, fragment("c", 300))], journal=True)
+		store.save([(b, fragment("b", 250)), (c, fragment("c", 300))], journal=True)
+		if open(filename).read() != written or not os.path.exists(filename + ".journal"):
+			raise tests.TestError("changes not journaled")
+		expected = [("b", "250", ["b log"]), ("c", "300", ["c log"])]
+		if loaded(filename) != expected:
+			raise tests.TestError("journal not applied: %s" % loaded(filename))
+		if loaded(filename) != expected or not os.path.exists(filename + ".cache"):
+			raise tests.TestError("cached timers differ: %s" % loaded(filename))
+
+		# Nothing changed, but the timer file is gone.
+		os.remove(filename)
+		store.save([(b, fragment("b", 250)), (c, fragment("c", 300))], journal=True)
+		if loaded(filename) != expected or os.path.exists(filename + ".journal"):
+			raise tests.TestError("deleted timer file not written again")
+
+		# The timer file is replaced (e.g. restored from a backup) while the
+		# cache and journal of the old one are still there.
+		store.save([(b, fragment("b", 250)), (c, fragment("c", 350))], journal=True)
+		loaded(filename)  # refreshes the cache
+		with open(filename, "w") as f:
+			f.write('<?xml version="1.0" ?>\n<timers>\n%s</timers>\n' % fragment("d", 400))
+		st = os.stat(filename)
+		os.utime(filename, (st.st_atime, st.st_mtime + 10))
+		if loaded(filename) != [("d", "400", ["d log"])]:
+			raise tests.TestError("stale cache or journal used: %s" % loaded(filename))
+		store.save([(b, fragment("b", 250)), (c, fragment("c", 350))], journal=True)
+		if loaded(filename) != [("b", "250", ["b log"]), ("c", "350", ["c log"])]:
+			raise tests.TestError("replaced timer file not written again")
+	finally:
+		shutil.rmtree(directory)
+
+test_timer_store()
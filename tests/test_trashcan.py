@@ -0,0 +1,104 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+import tests
+
+from Tools.TrashIndex import TrashIndex
+
+def waitForCtime(path, ctime):
+	# Touches path until its ctime is past ctime, returns the new ctime.
+	while True:
+		with open(path, "wb") as f:
+			pass
+		if os.stat(path).st_ctime > ctime:
+			return os.stat(path).st_ctime
+		time.sleep(0.001)
+
+# Builds a trash folder with many recordings (and their side files) spread
+# over a few folders, deleted at different times, and checks that reserve
+# space purges erase the oldest files first and keep the size up to date,
+# without crawling the trash again. Then checks that files put into the trash
+# behind the back of the index are found and that emptied folders are removed.
+def test_trash_index(recordings = 5000, purges = 100):
+	workdir = tempfile.mkdtemp()
+	try:
+		trash = os.path.join(workdir, ".Trash")
+		os.mkdir(trash)
+		probe = os.path.join(workdir, "probe")
+		ctime = waitForCtime(probe, 0)
+		total = 0
+		for i in range(recordings):
+			if i % 50 == 0:
+				ctime = waitForCtime(probe, ctime)
+			folder = trash
+			if i % 10 == 0:
+				folder = os.path.join(trash, "folder%d" % (i // 1000))
+				if not os.path.isdir(folder):
+					os.mkdir(folder)
+			base = os.path.join(folder, "recording%d.ts" % i)
+			for (ext, size) in (("", 1000 + i), (".ap", 100), (".sc", 50), (".cuts", 12), (".meta", 0), (".eit", 200)):
+				with open(base + ext, "wb") as f:
+					f.truncate(size)
+				total += size
+
+		start = time.time()
+		index = TrashIndex(trash)
+		if index.getSize() != total:
+			raise tests.TestError("trash size %d instead of %d" % (index.getSize(), total))
+		scan = time.time() - start
+
+		erased = []
+
+		def erase(path):
+			st = os.lstat(path)
+			erased.append((st.st_ctime, path))
+			os.remove(path)
+
+		start = time.time()
+		for i in range(purges):
+			size = index.purge(0, 10000, erase)
+		elapsed = (time.time() - start) / purges
+		remaining = 0
+		ctimes = []
+		for root, dirs, files in os.walk(trash):
+			for name in files:
+				remaining += os.path.getsize(os.path.join(root, name))
+				ctimes.append(os.stat(os.path.join(root, name)).st_ctime)
+		if len(set([x[0] for x in erased])) < 2:
+			raise tests.TestError("erased files were all deleted at the same time")
+		if [x[0] for x in erased] != sorted([x[0] for x in erased]) or erased[-1][0] > min(ctimes):
+			raise tests.TestError("purge did not erase the oldest files first")
+		if size != remaining:
+			raise tests.TestError("index size %d, trash size %d" % (size, remaining))
+
+		# A recording moved into the trash, one deleted from it and a folder
+		# put into it without telling the index.
+		moved = os.path.join(trash, "moved.ts")
+		with open(moved, "wb") as f:
+			f.truncate(12345)
+		index.add(moved)
+		deleted = os.path.join(trash, "recording%d.ts" % (recordings - 1))
+		for ext in ("", ".ap", ".sc", ".cuts", ".meta", ".eit"):
+			os.remove(deleted + ext)
+		index.remove(deleted)
+		os.mkdir(os.path.join(trash, "copied"))
+		with open(os.path.join(trash, "copied", "copied.ts"), "wb") as f:
+			f.truncate(54321)
+		remaining += 12345 + 54321 - (1000 + recordings - 1) - 100 - 50 - 12 - 0 - 200
+		if index.getSize() != remaining:
+			raise tests.TestError("index size %d after move and delete, expected %d" % (index.getSize(), remaining))
+		if index.purge(0, 10 ** 12, erase) != 0 or os.path.exists(moved):
+			raise tests.TestError("trash not emptied")
+		index.getSize()
+		if os.listdir(trash):
+			raise tests.TestError("emptied folders not removed: %s" % os.listdir(trash))
+
+		print("[test_trashcan] benchmark: %d files, scan %.3fs, reserve purge %.6fs" % (recordings * 6, scan, elapsed))
+	finally:
+		shutil.rmtree(workdir)
+
+test_trash_index()
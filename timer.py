@@ -2,10 +2,92 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 from bisect import insort
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
 from time import time, localtime, mktime
 from enigma import eTimer, eActionMap
 import datetime
 
+try:
+	from sys import intern
+except ImportError:
+	pass # python 2, intern is a builtin
+
+class TimerLog(object):
+	"""The log of a timer entry, a list like ring buffer of (time, code, msg)
+	tuples which keeps only the last MaxEntries entries. Message texts are
+	interned, as the same few messages get logged over and over again.
+
+	Log entries loaded from the timer file are only decoded when the log is
+	actually used (e.g. by the timer log screen or when saving with logs).
+	"""
+	MaxEntries = 100
+
+	def __init__(self, entries=()):
+		self.entries = deque(maxlen=self.MaxEntries)
+		self.elements = None
+		self.extend(entries)
+
+	def setElements(self, elements):
+		# keep the <log> elements of the timer file, decoded on first use
+		self.entries.clear()
+		self.elements = elements[-self.MaxEntries:] or None
+
+	def getEntries(self):
+		if self.elements is not None:
+			elements = self.elements
+			self.elements = None
+			entries = list(self.entries)
+			self.entries.clear()
+			for log in elements:
+				self.append((int(log.get("time")), int(log.get("code")), log.text.strip().encode("utf-8")))
+			self.extend(entries)
+		return self.entries
+
+	def append(self, entry):
+		(time, code, msg) = entry
+		if isinstance(msg, str):
+			msg = intern(msg)
+		if self.elements is not None:
+			self.getEntries()
+		self.entries.append((time, code, msg))
+
+	def extend(self, entries):
+		for entry in entries:
+			self.append(entry)
+
+	def remove(self, entry):
+		self.getEntries().remove(entry)
+
+	def __iter__(self):
+		return iter(self.getEntries())
+
+	def __len__(self):
+		if self.elements is not None:
+			return min(len(self.elements) + len(self.entries), self.MaxEntries)
+		return len(self.entries)
+
+	def __getitem__(self, index):
+		entries = self.getEntries()
+		if isinstance(index, slice):
+			return list(entries)[index]
+		return entries[index]
+
+	def __getslice__(self, i, j):
+		return self.__getitem__(slice(max(0, i), max(0, j)))
+
+	def __eq__(self, other):
+		return list(self) == list(other)
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	__hash__ = None
+
+	def __repr__(self):
+		return "TimerLog(%r)" % list(self)
+
 class TimerEntry:
 	StateWaiting  = 0
 	StatePrepared = 1
@@ -29,6 +111,16 @@ class TimerEntry:
 		self.disabled = False
 		self.failed = False
 
+	def getLogEntries(self):
+		return self.__dict__.setdefault("_log_entries", TimerLog())
+
+	def setLogEntries(self, entries):
+		if not isinstance(entries, TimerLog):
+			entries = TimerLog(entries)
+		self._log_entries = entries
+
+	log_entries = property(getLogEntries, setLogEntries)
+
 	def resetState(self):
 		self.state = self.StateWaiting
 		self.cancelled = False
@@ -149,6 +241,147 @@ class TimerEntry:
 	def enable(self):
 		self.disabled = False
 
+class TimerQueue(list):
+	"""The sorted list of waiting timer entries (Timer.timer_list).
+
+	Next to the list itself a heap of (nextActivation, sequence, entry)
+	tuples is kept, so the scheduler can find the next due entry without
+	filtering or re-sorting the whole list on every wake-up. Heap items are
+	invalidated lazily: items of entries which have left the list are
+	dropped, items with an outdated activation time are re-pushed and
+	disabled entries are parked until they get enabled again.
+	"""
+
+	def __init__(self, entries=()):
+		list.__init__(self, entries)
+		self.sequence = count()
+		self.rebuild()
+
+	def rebuild(self):
+		# members maps id(entry) to [references in the list, sequence of its live heap item]
+		self.members = {}
+		self.positions = None
+		self.parked = []
+		self.heap = []
+		for entry in self:
+			self.push(entry)
+
+	def push(self, entry, refs=1):
+		seq = next(self.sequence)
+		member = self.members.setdefault(id(entry), [0, seq])
+		member[0] += refs
+		member[1] = seq
+		heappush(self.heap, (entry.getNextActivation(), seq, entry))
+
+	def forget(self, entry):
+		self.positions = None
+		member = self.members.get(id(entry))
+		if member:
+			member[0] -= 1
+			if member[0] <= 0:
+				del self.members[id(entry)]
+
+	def __contains__(self, entry):
+		return id(entry) in self.members
+
+	def position(self, entry):
+		# index of entry (by identity) in the list, rebuilt after the list changed
+		if self.positions is None:
+			self.positions = {}
+			for index, x in enumerate(self):
+				self.positions.setdefault(id(x), index)
+		return self.positions[id(entry)]
+
+	def append(self, entry):
+		list.append(self, entry)
+		self.positions = None
+		self.push(entry)
+
+	def insert(self, index, entry):
+		list.insert(self, index, entry)
+		self.positions = None
+		self.push(entry)
+
+	def extend(self, entries):
+		for entry in entries:
+			self.append(entry)
+
+	def __iadd__(self, entries):
+		self.extend(entries)
+		return self
+
+	def remove(self, entry):
+		list.remove(self, entry)
+		self.forget(entry)
+
+	def pop(self, index=-1):
+		entry = list.pop(self, index)
+		self.forget(entry)
+		return entry
+
+	def sort(self, *args, **kwargs):
+		list.sort(self, *args, **kwargs)
+		self.rebuild()
+
+	# Rarely used mutators simply rebuild the heap.
+	def __setitem__(self, index, value):
+		list.__setitem__(self, index, value)
+		self.rebuild()
+
+	def __delitem__(self, index):
+		list.__delitem__(self, index)
+		self.rebuild()
+
+	def __setslice__(self, i, j, value):
+		self.__setitem__(slice(max(0, i), max(0, j)), value)
+
+	def __delslice__(self, i, j):
+		self.__delitem__(slice(max(0, i), max(0, j)))
+
+	def isLive(self, item):
+		member = self.members.get(id(item[2]))
+		return member is not None and member[1] == item[1]
+
+	def unpark(self):
+		parked = self.parked
+		self.parked = []
+		for item in parked:
+			if not self.isLive(item):
+				continue
+			if item[2].disabled:
+				self.parked.append(item)
+			else:
+				self.push(item[2], refs=0)
+
+	def peek(self, skip=None):
+		"""Return (nextActivation, entry) of the first enabled entry in
+		activation order for which skip(entry) is false, or (None, None)."""
+		self.unpark()
+		heap = self.heap
+		skipped = []
+		result = (None, None)
+		while heap:
+			item = heap[0]
+			entry = item[2]
+			if not self.isLive(item):
+				heappop(heap)
+			elif entry.disabled:
+				self.parked.append(heappop(heap))
+			elif entry.getNextActivation() != item[0]:
+				heappop(heap)
+				self.push(entry, refs=0)
+			elif skip is not None and skip(entry):
+				skipped.append(heappop(heap))
+			else:
+				result = (item[0], entry)
+				break
+		for item in skipped:
+			heappush(heap, item)
+		if len(heap) > 2 * len(self) + 64:
+			# too many stale items (e.g. after many remove/insort pairs), compact
+			self.rebuild()
+		return result
+
 class Timer:
 	# the time between "polls". We do this because
 	# we want to account for time jumps etc.
@@ -161,7 +394,12 @@ class Timer:
 	# anyway, so why don't make it a bit more fool-proof?
 	MaxWaitTime = 100
 
+	# The waiting list is fully re-sorted (and the activation heap rebuilt)
+	# at most this often, to catch entries changed without timeChanged().
+	ResortInterval = 900
+
 	def __init__(self):
+		self.lastResort = 0
 		self.timer_list = [ ]
 		self.processed_timers = [ ]
 
@@ -172,6 +410,12 @@ class Timer:
 		self.calcNextActivation()
 		self.on_state_change = [ ]
 
+	def __setattr__(self, name, value):
+		# keep timer_list a TimerQueue, even when a caller assigns a plain list
+		if name == "timer_list" and not isinstance(value, TimerQueue):
+			value = TimerQueue(value)
+		self.__dict__[name] = value
+
 	def stateChanged(self, entry):
 		for f in self.on_state_change:
 			f(entry)
@@ -232,6 +476,7 @@ class Timer:
 		now = time()
 		if self.lastActivation > now:
 			print("[timer] timewarp - re-evaluating all processed timers.")
+			self.lastResort = 0
 			tl = self.processed_timers
 			self.processed_timers = [ ]
 			for x in tl:
@@ -244,14 +489,14 @@ class Timer:
 
 		min = int(now) + self.MaxWaitTime
 
-		self.timer_list and self.timer_list.sort() #  resort/refresh list, try to fix hanging timers
+		if not self.lastResort <= now < self.lastResort + self.ResortInterval:
+			self.timer_list.sort() #  resort/refresh list, try to fix hanging timers
+			self.lastResort = now
 
 		# calculate next activation point
-		timer_list = [ t for t in self.timer_list if not t.disabled ]
-		if timer_list:
-			w = timer_list[0].getNextActivation()
-			if w < min:
-				min = w
+		w = self.timer_list.peek()[0]
+		if w is not None and w < min:
+			min = w
 
 		if int(now) < 1072224000 and min > now + 5:
 			# system time has not yet been set (before 01.01.2004), keep a short poll interval
@@ -325,10 +570,10 @@ class Timer:
 # Since this tag is only for use here, we remove it after use.
 #
 		while True:
-			timer_list = [ tmr for tmr in self.timer_list if (not tmr.disabled and not getattr(tmr, "currentlyActivated", False)) ]
-			if timer_list and timer_list[0].getNextActivation() < t:
-				timer_list[0].currentlyActivated = True
-				self.doActivate(timer_list[0])
-				del timer_list[0].currentlyActivated
+			(when, tmr) = self.timer_list.peek(lambda tmr: getattr(tmr, "currentlyActivated", False))
+			if tmr is not None and when < t:
+				tmr.currentlyActivated = True
+				self.doActivate(tmr)
+				del tmr.currentlyActivated
 			else:
 				break